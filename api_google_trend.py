@@ -1,27 +1,34 @@
 from flask import Flask, request, jsonify
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import time
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_pool import WebDriverPool
 
 app = Flask(__name__)
 
+# theqoo 크롤링용 크롬 옵션
+theqoo_options = Options()
+theqoo_options.add_argument("--headless")
+theqoo_options.add_argument("--disable-gpu")
+theqoo_options.add_argument("--no-sandbox")
 
-def crawl_theqoo(url, max_comments=20):
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
+# Google Trends 크롤링용 크롬 옵션
+trends_options = webdriver.ChromeOptions()
+trends_options.add_argument("--headless")
+trends_options.add_argument("--disable-blink-features=AutomationControlled")
+trends_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36")
+
+# 요청마다 크롬을 새로 띄우지 않도록 드라이버 풀 사용
+theqoo_driver_pool = WebDriverPool(theqoo_options, max_size=4)
+trends_driver_pool = WebDriverPool(trends_options, max_size=1, driver_path='/opt/homebrew/bin/chromedriver')
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=chrome_options
-    )
+
+def crawl_theqoo(url, max_comments=20):
+    driver = theqoo_driver_pool.acquire()
 
     try:
         driver.get(url)
@@ -76,7 +83,7 @@ def crawl_theqoo(url, max_comments=20):
 
         return article_content, comment_texts, span.text, title
     finally:
-        driver.quit()
+        theqoo_driver_pool.release(driver)
 
 
 @app.route('/theqoo-crawl', methods=['POST'])
@@ -107,15 +114,7 @@ def theqoo_crawl():
 
 @app.route('/trends', methods=['GET'])
 def get_trends():
-    # Chrome 옵션 설정
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36")
-
-    # WebDriver 설정
-    service = Service('/opt/homebrew/bin/chromedriver')
-    driver = webdriver.Chrome(service=service, options=options)
+    driver = trends_driver_pool.acquire()
 
     try:
         driver.get("https://trends.google.co.kr/trending?geo=KR&sort=recency")
@@ -144,7 +143,7 @@ def get_trends():
         return jsonify(trends)
 
     finally:
-        driver.quit()
+        trends_driver_pool.release(driver)
 
 if __name__ == '__main__':
     app.run(debug=True)
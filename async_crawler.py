@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+asyncio 기반 theqoo 동시 수집기
+호스트별 토큰 버킷 속도 제한, 전체 동시 요청 수 제한, 무작위 지연으로 서버 부하를 조절
+"""
+
+import asyncio
+import logging
+import random
+import time
+from urllib.parse import urlparse
+from theqoo_http import (
+    BASE_URL, CommentPager, TheqooHttpClient, has_more_comments, parse_hot_titles, parse_post
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate=2.0, capacity=2):
+        """
+        Args:
+            rate (float): 초당 채워지는 토큰 수 (초당 허용 요청 수)
+            capacity (int): 한 번에 몰아서 보낼 수 있는 최대 요청 수
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncTheqooCrawler:
+    def __init__(self, http_client=None, max_concurrency=4, rate_per_host=2.0, burst=2,
+                 jitter=(0.1, 0.5), post_fallback=None, hot_titles_fallback=None):
+        """
+        Args:
+            http_client: 페이지를 가져올 TheqooHttpClient (없으면 새로 생성)
+            max_concurrency (int): 전체 동시 요청 수 상한
+            rate_per_host (float): 호스트별 초당 요청 수
+            burst (int): 호스트별 토큰 버킷 크기
+            jitter (tuple): 요청 전 무작위 지연 범위(초)
+            post_fallback: HTTP 파싱이 비었을 때 호출할 게시글 수집 함수 (url, max_comments)
+            hot_titles_fallback: HTTP 파싱이 비었을 때 호출할 목록 수집 함수 (page_num)
+        """
+        self.http_client = http_client or TheqooHttpClient()
+        self.max_concurrency = max_concurrency
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.jitter = jitter
+        self.post_fallback = post_fallback
+        self.hot_titles_fallback = hot_titles_fallback
+
+        self._semaphore = None
+        self._buckets = {}
+
+    def _reset_limits(self):
+        """현재 이벤트 루프에서 사용할 세마포어와 토큰 버킷 준비"""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._buckets = {}
+
+    def _bucket_for(self, url):
+        """호스트별 토큰 버킷"""
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return self._buckets[host]
+
+    async def _fetch_html(self, url):
+        """속도 제한과 동시 요청 수 제한을 지키며 HTML 가져오기"""
+        async with self._semaphore:
+            await self._bucket_for(url).acquire()
+            if self.jitter:
+                await asyncio.sleep(random.uniform(*self.jitter))
+            return await asyncio.to_thread(self.http_client.fetch_html, url)
+
+    async def _run_fallback(self, fallback, *args):
+        """Selenium fallback을 스레드에서 실행 (실패하면 None, 한 건의 브라우저 오류가 전체 수집을 멈추지 않게 함)"""
+        try:
+            return await asyncio.to_thread(fallback, *args)
+        except Exception as e:
+            logger.error(f"fallback 수집 실패: {args[0]} - {e}")
+            return None
+
+    async def _crawl_hot_page(self, page_num):
+        """핫 게시판 목록 한 페이지 수집"""
+        url = f"{BASE_URL}/hot?filter_mode=normal&page={page_num}"
+        try:
+            titles = parse_hot_titles(await self._fetch_html(url), base_url=url)
+        except Exception as e:
+            logger.warning(f"페이지 {page_num} HTTP 수집 실패: {e}")
+            titles = []
+
+        if not titles and self.hot_titles_fallback:
+            logger.info(f"페이지 {page_num} HTTP 파싱 결과 없음 - fallback 사용")
+            titles = await self._run_fallback(self.hot_titles_fallback, page_num) or []
+
+        return titles
+
+    async def _crawl_comments(self, url, max_comments, max_pages=50):
+        """댓글 목록을 페이지 단위로 직접 조회하여 max_comments개까지 수집"""
+        comments = []
+        pager = CommentPager(url, max_pages)
+
+        for cpage, page_url in pager:
+            try:
+                comments.extend(pager.add_page(await self._fetch_html(page_url)))
+            except Exception as e:
+                logger.warning(f"댓글 {cpage}페이지 수집 실패: {url} - {e}")
+                break
+            if len(comments) >= max_comments:
+                break
+
+        return comments[:max_comments]
+
+    async def _crawl_post(self, url, max_comments):
+        """게시글 하나 수집"""
+        try:
+            page_html = await self._fetch_html(url)
+            post_data = parse_post(page_html, max_comments=max_comments)
+        except Exception as e:
+            logger.warning(f"게시글 HTTP 수집 실패: {url} - {e}")
+            post_data = None
+
+        # 본문 페이지에 보이는 댓글보다 더 필요하면 댓글 목록 페이지를 직접 조회
+        if post_data and len(post_data['comments']) < max_comments and has_more_comments(page_html):
+            comments = await self._crawl_comments(url, max_comments)
+            if len(comments) > len(post_data['comments']):
+                post_data['comments'] = comments
+
+        if (not post_data or not (post_data['content'] or post_data['post_datetime'])) and self.post_fallback:
+            logger.info(f"게시글 HTTP 파싱 결과 없음 - fallback 사용: {url}")
+            post_data = await self._run_fallback(self.post_fallback, url, max_comments)
+
+        return post_data
+
+    async def crawl_hot_pages(self, page_nums):
+        """여러 목록 페이지를 동시에 수집하여 {페이지 번호: 제목 리스트} 반환"""
+        self._reset_limits()
+        page_nums = list(page_nums)
+        results = await asyncio.gather(
+            *(self._crawl_hot_page(page_num) for page_num in page_nums), return_exceptions=True
+        )
+        # 예상하지 못한 예외도 그 페이지만 빈 결과로 처리
+        pages = {}
+        for page_num, result in zip(page_nums, results):
+            if isinstance(result, Exception):
+                logger.error(f"페이지 {page_num} 수집 실패: {result}")
+                result = []
+            pages[page_num] = result
+        return pages
+
+    async def crawl_posts(self, urls, max_comments=30):
+        """여러 게시글을 동시에 수집하여 입력 순서대로 반환 (실패한 게시글은 None)"""
+        self._reset_limits()
+        urls = list(urls)
+        results = await asyncio.gather(
+            *(self._crawl_post(url, max_comments) for url in urls), return_exceptions=True
+        )
+        posts = []
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                logger.error(f"게시글 수집 실패: {url} - {result}")
+                result = None
+            posts.append(result)
+        return posts
+
+    def run_hot_pages(self, page_nums):
+        """crawl_hot_pages의 동기 실행용 래퍼"""
+        return asyncio.run(self.crawl_hot_pages(page_nums))
+
+    def run_posts(self, urls, max_comments=30):
+        """crawl_posts의 동기 실행용 래퍼"""
+        return asyncio.run(self.crawl_posts(urls, max_comments=max_comments))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+OpenAI 임베딩 차원 축소 벤치마크
+text-embedding-3 계열은 dimensions로 줄인 벡터가 전체 벡터의 앞부분을 잘라 다시 정규화한 것과 같으므로
+저장된 1536차원 벡터를 잘라서 차원별 recall@k (1536차원 정확 검색 대비)와 저장 크기를 비교
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+from openai import OpenAI
+from dotenv import load_dotenv
+from benchmark_quantization import exact_top_k, make_queries
+from openai_qdrant_storage import EMBEDDING_MODEL, FULL_EMBEDDING_DIMENSIONS
+from qdrant_common import dense_vector, get_qdrant_client, iter_scroll
+
+# 환경변수 로드
+load_dotenv()
+
+DEFAULT_DIMENSIONS = [256, 512, 768, 1024, 1536]
+
+
+def load_corpus(client, collection_name, max_points=None):
+    """저장된 1536차원 벡터와 제목 로드"""
+    titles, vectors = [], []
+    for points, _ in iter_scroll(client, collection_name, with_payload=["title"], with_vectors=True):
+        for point in points:
+            vector = dense_vector(point.vector)
+            if vector is not None and len(vector) == FULL_EMBEDDING_DIMENSIONS:
+                titles.append((point.payload or {}).get("title", ""))
+                vectors.append(vector)
+        if max_points and len(vectors) >= max_points:
+            break
+
+    if max_points:
+        titles, vectors = titles[:max_points], vectors[:max_points]
+    return titles, np.asarray(vectors, dtype=np.float32)
+
+
+def reduce_dimensions(vectors, dimensions):
+    """앞 dimensions개 성분만 남기고 다시 정규화 (API의 dimensions 출력과 동일)"""
+    reduced = vectors[:, :dimensions]
+    return reduced / np.linalg.norm(reduced, axis=1, keepdims=True)
+
+
+def embed_queries(openai_client, texts):
+    """질문 대신 게시글 제목을 전체 차원으로 임베딩"""
+    response = openai_client.embeddings.create(input=texts, model=EMBEDDING_MODEL)
+    vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def verify_truncation(openai_client, texts, dimensions):
+    """API의 dimensions 출력과 잘라낸 벡터의 코사인 유사도 (1에 가까워야 함)"""
+    full = embed_queries(openai_client, texts)
+    response = openai_client.embeddings.create(input=texts, model=EMBEDDING_MODEL, dimensions=dimensions)
+    reduced = np.asarray(
+        [item.embedding for item in sorted(response.data, key=lambda item: item.index)], dtype=np.float32
+    )
+    return float(np.mean(np.sum(reduce_dimensions(full, dimensions) * reduced, axis=1)))
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='OpenAI 임베딩 차원별 recall@k 벤치마크')
+    parser.add_argument('--source', default='theqoo_documents_openai', help='1536차원 벡터가 저장된 컬렉션')
+    parser.add_argument('--dimensions', type=int, nargs='+', default=DEFAULT_DIMENSIONS, help='비교할 차원')
+    parser.add_argument('--max-points', type=int, default=None, help='사용할 최대 포인트 수')
+    parser.add_argument('--queries', type=int, default=200, help='쿼리 수')
+    parser.add_argument('--k', type=int, default=10, help='recall@k의 k')
+    parser.add_argument('--verify', action='store_true', help='API dimensions 출력과 잘라낸 벡터가 같은지 확인')
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+
+    print(f"=== 컬렉션 '{args.source}' 벡터 로드 중 ===")
+    titles, vectors = load_corpus(client, args.source, max_points=args.max_points)
+    if len(vectors) <= args.k:
+        print(f"❌ 벤치마크에 필요한 포인트가 부족합니다: {len(vectors)}개")
+        return
+    print(f"✅ {len(vectors)}개 벡터 로드 ({FULL_EMBEDDING_DIMENSIONS}차원)")
+
+    # 쿼리: API 키가 있으면 게시글 제목 임베딩, 없으면 저장된 벡터에 잡음을 섞어 사용
+    openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY")) if os.getenv("OPENAI_API_KEY") else None
+    if openai_client:
+        rng = np.random.default_rng(42)
+        picked = rng.choice(len(titles), size=min(args.queries, len(titles)), replace=False)
+        queries = embed_queries(openai_client, [titles[idx] or "theqoo" for idx in picked])
+        print(f"🔍 게시글 제목 {len(queries)}개를 쿼리로 사용")
+    else:
+        queries = make_queries(vectors, args.queries)
+        print(f"🔍 OPENAI_API_KEY가 없어 저장된 벡터 {len(queries)}개를 쿼리로 사용")
+
+    truth = exact_top_k(vectors, reduce_dimensions(queries, FULL_EMBEDDING_DIMENSIONS), args.k)
+
+    print(f"\n{'차원':>6} {f'recall@{args.k}':>10} {'검색/쿼리':>10} {'벡터 크기':>10} {'전체 크기':>10}")
+    for dimensions in sorted(args.dimensions):
+        reduced_vectors = reduce_dimensions(vectors, dimensions)
+        reduced_queries = reduce_dimensions(queries, dimensions)
+
+        started = time.perf_counter()
+        found = exact_top_k(reduced_vectors, reduced_queries, args.k)
+        search_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        recall = np.mean([len(a & b) / args.k for a, b in zip(found, truth)])
+        vector_bytes = dimensions * 4
+        print(
+            f"{dimensions:>6} {recall:>10.3f} {search_ms:>8.3f}ms {vector_bytes:>8}B "
+            f"{vector_bytes * len(vectors) / (1024 * 1024):>8.1f}MB"
+        )
+
+    if args.verify:
+        if not openai_client:
+            print("\n❌ --verify에는 OPENAI_API_KEY가 필요합니다.")
+            return
+        sample = [title for title in titles[:20] if title]
+        for dimensions in sorted(args.dimensions):
+            if dimensions < FULL_EMBEDDING_DIMENSIONS:
+                similarity = verify_truncation(openai_client, sample, dimensions)
+                print(f"✅ {dimensions}차원: API 출력과 잘라낸 벡터의 평균 코사인 유사도 {similarity:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Qdrant REST / gRPC 전송 방식 벤치마크
+1536차원 벡터와 실제 문서와 비슷한 크기의 페이로드로 업서트/검색 지연 시간을 비교
+"""
+
+import argparse
+import time
+import uuid
+import numpy as np
+from qdrant_client.models import Distance, VectorParams, PointStruct
+from dotenv import load_dotenv
+from qdrant_common import get_qdrant_client, iter_batches
+
+# 환경변수 로드
+load_dotenv()
+
+
+def make_points(count, dim, seed=42):
+    """정규화된 랜덤 벡터와 게시글 크기의 페이로드로 포인트 생성"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    points = []
+    for idx, vector in enumerate(vectors):
+        points.append(PointStruct(
+            id=str(uuid.uuid4()),
+            vector=vector.tolist(),
+            payload={
+                "title": f"벤치마크 게시글 {idx}",
+                "link": f"https://theqoo.net/hot/{1000000 + idx}",
+                "post_datetime": "2024-12-01 10:30:00",
+                "content": "본문 내용 " * 100,
+                "comments": [f"댓글 {n} 내용입니다" for n in range(20)],
+                "comments_count": 20,
+                "analysis": "분석 결과 " * 80,
+                "collected_date": "2024-12-01"
+            }
+        ))
+    return points
+
+
+def percentile_ms(samples, q):
+    """초 단위 측정값의 백분위수를 밀리초로 반환"""
+    return float(np.percentile(samples, q) * 1000) if samples else 0.0
+
+
+def run_benchmark(prefer_grpc, points, queries, batch_size, dim, limit):
+    """한 가지 전송 방식으로 업서트/검색 시간 측정"""
+    name = "gRPC" if prefer_grpc else "REST"
+    client = get_qdrant_client(prefer_grpc=prefer_grpc)
+    collection_name = f"benchmark_transport_{name.lower()}"
+
+    if collection_name in [col.name for col in client.get_collections().collections]:
+        client.delete_collection(collection_name)
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=VectorParams(size=dim, distance=Distance.COSINE)
+    )
+
+    try:
+        # 업서트: 묶음마다 wait=True로 서버 반영까지의 시간을 측정
+        upsert_times = []
+        started = time.perf_counter()
+        for batch in iter_batches(points, batch_size):
+            batch_started = time.perf_counter()
+            client.upsert(collection_name=collection_name, points=batch, wait=True)
+            upsert_times.append(time.perf_counter() - batch_started)
+        upsert_seconds = time.perf_counter() - started
+
+        # 검색: 페이로드 포함 top-k 조회 지연 시간
+        search_times = []
+        for query_vector in queries:
+            search_started = time.perf_counter()
+            client.search(
+                collection_name=collection_name,
+                query_vector=query_vector,
+                limit=limit,
+                with_payload=True
+            )
+            search_times.append(time.perf_counter() - search_started)
+    finally:
+        client.delete_collection(collection_name)
+
+    return {
+        "name": name,
+        "upsert_points_per_sec": len(points) / upsert_seconds if upsert_seconds else 0.0,
+        "upsert_p50_ms": percentile_ms(upsert_times, 50),
+        "upsert_p95_ms": percentile_ms(upsert_times, 95),
+        "search_p50_ms": percentile_ms(search_times, 50),
+        "search_p95_ms": percentile_ms(search_times, 95)
+    }
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Qdrant REST / gRPC 벤치마크')
+    parser.add_argument('--points', type=int, default=2000, help='업서트할 포인트 수')
+    parser.add_argument('--dim', type=int, default=1536, help='벡터 차원 (text-embedding-3-small)')
+    parser.add_argument('--batch-size', type=int, default=256, help='업서트 묶음 크기')
+    parser.add_argument('--queries', type=int, default=200, help='검색 요청 수')
+    parser.add_argument('--limit', type=int, default=5, help='검색 결과 수')
+    args = parser.parse_args()
+
+    print(f"=== Qdrant 전송 방식 벤치마크 ({args.points}개 포인트, {args.dim}차원) ===")
+    points = make_points(args.points, args.dim)
+    queries = [point.vector for point in make_points(args.queries, args.dim, seed=7)]
+
+    results = []
+    for prefer_grpc in (False, True):
+        try:
+            results.append(run_benchmark(prefer_grpc, points, queries, args.batch_size, args.dim, args.limit))
+        except Exception as e:
+            print(f"❌ {'gRPC' if prefer_grpc else 'REST'} 벤치마크 실패: {e}")
+
+    print(f"\n{'방식':<6} {'업서트 points/s':>16} {'업서트 p50':>11} {'업서트 p95':>11} {'검색 p50':>10} {'검색 p95':>10}")
+    for result in results:
+        print(
+            f"{result['name']:<6} {result['upsert_points_per_sec']:>16.1f} "
+            f"{result['upsert_p50_ms']:>9.1f}ms {result['upsert_p95_ms']:>9.1f}ms "
+            f"{result['search_p50_ms']:>8.2f}ms {result['search_p95_ms']:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
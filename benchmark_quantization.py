@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Qdrant 양자화 벤치마크
+저장된 OpenAI 컬렉션의 벡터를 양자화 설정별 임시 컬렉션에 복사한 뒤
+정확한 brute-force 결과 대비 recall@k와 검색 지연 시간, 예상 RAM 사용량을 비교
+"""
+
+import argparse
+import time
+import numpy as np
+from qdrant_client.models import PointStruct
+from dotenv import load_dotenv
+from qdrant_common import (
+    ChunkedUpserter, collection_params, dense_vector, get_qdrant_client, iter_scroll, quantized_search_params,
+    wait_until_indexed
+)
+
+# 환경변수 로드
+load_dotenv()
+
+# (이름, 양자화 방식, 원본 벡터 디스크 저장)
+BENCHMARK_CONFIGS = [
+    ("float32", None, False),
+    ("scalar", "scalar", True),
+    ("binary", "binary", True)
+]
+
+
+def load_vectors(client, collection_name, max_points=None):
+    """컬렉션의 포인트 ID와 벡터를 scroll로 읽어옴"""
+    ids, vectors = [], []
+    for points, _ in iter_scroll(client, collection_name, with_payload=False, with_vectors=True):
+        for point in points:
+            vector = dense_vector(point.vector)
+            if vector is not None:
+                ids.append(point.id)
+                vectors.append(vector)
+        if max_points and len(ids) >= max_points:
+            break
+
+    if max_points:
+        ids, vectors = ids[:max_points], vectors[:max_points]
+    return ids, np.asarray(vectors, dtype=np.float32)
+
+
+def make_queries(vectors, count, noise=0.05, seed=42):
+    """저장된 벡터에 잡음을 섞어 실제 질문과 비슷한 쿼리 벡터 생성"""
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.choice(len(vectors), size=min(count, len(vectors)), replace=False)]
+    queries = picked + rng.standard_normal(picked.shape).astype(np.float32) * noise
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors, queries, k):
+    """코사인 유사도 brute-force 정답 (행 인덱스)"""
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = queries @ normalized.T
+    top = np.argpartition(-scores, min(k, len(vectors) - 1), axis=1)[:, :k]
+    return [set(row) for row in top]
+
+
+def estimated_ram_bytes(count, dim, quantization, on_disk):
+    """벡터가 차지하는 대략적인 RAM (HNSW 그래프 제외)"""
+    original = 0 if on_disk else count * dim * 4
+    if quantization == "scalar":
+        return original + count * dim
+    if quantization == "binary":
+        return original + count * dim // 8
+    return original
+
+
+def run_config(client, name, quantization, on_disk, ids, vectors, queries, truth, args):
+    """설정 하나로 임시 컬렉션을 만들고 recall/지연 시간 측정"""
+    collection_name = f"{args.source}_bench_{name}"
+    if collection_name in [col.name for col in client.get_collections().collections]:
+        client.delete_collection(collection_name)
+
+    client.create_collection(
+        collection_name=collection_name,
+        **collection_params(
+            vectors.shape[1],
+            quantization=quantization,
+            on_disk=on_disk,
+            hnsw_m=args.hnsw_m,
+            hnsw_ef_construct=args.hnsw_ef_construct
+        )
+    )
+
+    try:
+        upserter = ChunkedUpserter(client, collection_name)
+        upserter.add([
+            PointStruct(id=point_id, vector=vector.tolist())
+            for point_id, vector in zip(ids, vectors)
+        ])
+        upserter.finish()
+        wait_until_indexed(client, collection_name)
+
+        id_to_row = {str(point_id): row for row, point_id in enumerate(ids)}
+        search_params = quantized_search_params(quantization, args.oversampling, args.hnsw_ef)
+        latencies, recalls = [], []
+
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            results = client.search(
+                collection_name=collection_name,
+                query_vector=query.tolist(),
+                limit=args.k,
+                search_params=search_params,
+                with_payload=False
+            )
+            latencies.append(time.perf_counter() - started)
+            found = {id_to_row.get(str(result.id)) for result in results}
+            recalls.append(len(found & expected) / len(expected))
+    finally:
+        if not args.keep:
+            client.delete_collection(collection_name)
+
+    return {
+        "name": name,
+        "recall": float(np.mean(recalls)),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "ram_mb": estimated_ram_bytes(len(ids), vectors.shape[1], quantization, on_disk) / (1024 * 1024)
+    }
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Qdrant 양자화 recall / 지연 시간 벤치마크')
+    parser.add_argument('--source', default='theqoo_documents_openai', help='벡터를 읽어올 컬렉션')
+    parser.add_argument('--max-points', type=int, default=None, help='사용할 최대 포인트 수')
+    parser.add_argument('--queries', type=int, default=200, help='쿼리 수')
+    parser.add_argument('--k', type=int, default=10, help='recall@k의 k')
+    parser.add_argument('--oversampling', type=float, default=2.0, help='양자화 검색 후보 배수 (재채점용)')
+    parser.add_argument('--hnsw-m', type=int, default=None, help='HNSW m')
+    parser.add_argument('--hnsw-ef-construct', type=int, default=None, help='HNSW ef_construct')
+    parser.add_argument('--hnsw-ef', type=int, default=None, help='검색 시 HNSW ef')
+    parser.add_argument('--keep', action='store_true', help='벤치마크 컬렉션을 삭제하지 않음')
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+
+    print(f"=== 컬렉션 '{args.source}' 벡터 로드 중 ===")
+    ids, vectors = load_vectors(client, args.source, max_points=args.max_points)
+    if len(ids) <= args.k:
+        print(f"❌ 벤치마크에 필요한 포인트가 부족합니다: {len(ids)}개")
+        return
+    print(f"✅ {len(ids)}개 벡터 로드 ({vectors.shape[1]}차원)")
+
+    queries = make_queries(vectors, args.queries)
+    truth = exact_top_k(vectors, queries, args.k)
+
+    results = []
+    for name, quantization, on_disk in BENCHMARK_CONFIGS:
+        print(f"🔧 {name} 측정 중...")
+        try:
+            results.append(run_config(client, name, quantization, on_disk, ids, vectors, queries, truth, args))
+        except Exception as e:
+            print(f"❌ {name} 벤치마크 실패: {e}")
+
+    print(f"\n{'설정':<8} {f'recall@{args.k}':>10} {'p50':>9} {'p95':>9} {'벡터 RAM':>10}")
+    for result in results:
+        print(
+            f"{result['name']:<8} {result['recall']:>10.3f} {result['p50_ms']:>7.2f}ms "
+            f"{result['p95_ms']:>7.2f}ms {result['ram_mb']:>8.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
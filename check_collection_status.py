@@ -3,10 +3,9 @@
 Qdrant 컬렉션 상태 확인 스크립트
 """
 
-import os
 import logging
-from qdrant_client import QdrantClient
 from dotenv import load_dotenv
+from qdrant_common import collection_exists, count_points, get_qdrant_client
 
 # 환경변수 로드
 load_dotenv()
@@ -16,34 +15,8 @@ logger = logging.getLogger(__name__)
 def check_collection_status(collection_name="theqoo_documents_openai"):
     """컬렉션 상태를 자세히 확인"""
     
-    # Qdrant 설정
-    qdrant_url = os.getenv("QDRANT_URL")
-    qdrant_key = os.getenv("QDRANT_KEY")
-    
-    # URL에서 호스트와 포트 추출
-    if qdrant_url:
-        if qdrant_url.startswith("http://"):
-            host = qdrant_url[7:]  # "http://" 제거
-        elif qdrant_url.startswith("https://"):
-            host = qdrant_url[8:]  # "https://" 제거
-        else:
-            host = qdrant_url
-        
-        # 포트가 URL에 포함되어 있으면 추출
-        if ":" in host:
-            host, port_str = host.split(":", 1)
-            port = int(port_str)
-        else:
-            port = 6333
-    else:
-        host = "localhost"
-        port = 6333
-    
-    # Qdrant 클라이언트 초기화
-    if qdrant_key:
-        client = QdrantClient(host=host, port=port, api_key=qdrant_key)
-    else:
-        client = QdrantClient(host=host, port=port)
+    # Qdrant 클라이언트 (QDRANT_URL/QDRANT_KEY/QDRANT_PREFER_GRPC 환경변수 사용)
+    client = get_qdrant_client()
     
     try:
         print(f"=== 컬렉션 '{collection_name}' 상태 확인 ===")
@@ -53,36 +26,25 @@ def check_collection_status(collection_name="theqoo_documents_openai"):
         collection_names = [col.name for col in collections.collections]
         print(f"전체 컬렉션 목록: {collection_names}")
         
-        if collection_name in collection_names:
+        if collection_exists(client, collection_name):
             print(f"✅ 컬렉션 '{collection_name}' 존재함")
             
             # 컬렉션 상세 정보 확인
             info = client.get_collection(collection_name)
             print(f"컬렉션 정보:")
-            print(f"  - 벡터 수: {info.vectors_count}")
             print(f"  - 포인트 수: {info.points_count}")
             print(f"  - 세그먼트 수: {info.segments_count}")
             print(f"  - 설정: {info.config}")
             
-            # 실제 포인트 수 확인
-            try:
-                points = client.scroll(
-                    collection_name=collection_name,
-                    limit=1,
-                    with_payload=False,
-                    with_vectors=False
-                )
-                print(f"  - 실제 포인트 수: {len(points[0])}")
-                
-                if len(points[0]) > 0:
-                    print("✅ 컬렉션에 데이터가 있습니다!")
-                    return True, info.vectors_count
-                else:
-                    print("❌ 컬렉션에 데이터가 없습니다.")
-                    return False, 0
-                    
-            except Exception as e:
-                print(f"포인트 조회 실패: {e}")
+            # 정확한 포인트 수 (vectors_count는 None일 수 있어 count API 한 번으로 확인)
+            points_count = count_points(client, collection_name)
+            print(f"  - 실제 포인트 수: {points_count}")
+            
+            if points_count > 0:
+                print("✅ 컬렉션에 데이터가 있습니다!")
+                return True, points_count
+            else:
+                print("❌ 컬렉션에 데이터가 없습니다.")
                 return False, 0
         else:
             print(f"❌ 컬렉션 '{collection_name}'이 존재하지 않습니다.")
@@ -6,7 +6,6 @@ Hot 게시판 2~10페이지 데이터 수집 스크립트
 
 import logging
 import json
-import time
 from datetime import datetime
 from main_workflow import TheqooWorkflow
 
@@ -29,33 +28,25 @@ def collect_hot_pages_data():
         all_titles = []
         current_date = datetime.now().strftime("%Y-%m-%d")
         
-        # 2~10페이지 순회
-        for page_num in range(2, 11):
-            print(f"\n📄 페이지 {page_num} 수집 중...")
+        # 2~10페이지 동시 수집 (호스트별 속도 제한은 크롤러가 처리)
+        print("\n📄 페이지 2~10 동시 수집 중...")
+        pages = workflow.get_hot_titles_pages(range(2, 11))
+        
+        for page_num, titles in pages.items():
+            # 각 페이지의 상위 20개 제목 사용
+            titles = titles[:20]
             
-            try:
-                # 각 페이지에서 모든 제목 수집 (start_idx=0, end_idx=20으로 설정하여 모든 제목 가져오기)
-                titles = workflow.get_hot_titles(page_num=page_num, start_idx=0, end_idx=20)
-                
-                if not titles:
-                    print(f"⚠️ 페이지 {page_num}에서 제목을 가져올 수 없습니다.")
-                    continue
-                
-                # 페이지 정보 추가
-                for title in titles:
-                    title['page_num'] = page_num
-                    title['collected_date'] = current_date
-                
-                all_titles.extend(titles)
-                print(f"✅ 페이지 {page_num}: {len(titles)}개 제목 수집 완료")
-                
-                # 페이지 간 간격 조절 (서버 부하 방지)
-                time.sleep(3)
-                
-            except Exception as e:
-                logger.error(f"페이지 {page_num} 수집 실패: {e}")
-                print(f"❌ 페이지 {page_num} 수집 실패: {e}")
+            if not titles:
+                print(f"⚠️ 페이지 {page_num}에서 제목을 가져올 수 없습니다.")
                 continue
+            
+            # 페이지 정보 추가
+            for title in titles:
+                title['page_num'] = page_num
+                title['collected_date'] = current_date
+            
+            all_titles.extend(titles)
+            print(f"✅ 페이지 {page_num}: {len(titles)}개 제목 수집 완료")
         
         # 결과 출력
         print(f"\n=== 수집 완료 ===")
@@ -124,22 +115,21 @@ def create_test_documents(titles_data, max_documents=50):
             print("⚠️ 이슈로 분류된 제목이 없습니다. 모든 제목을 처리합니다.")
             issue_titles = classified_titles
         
-        # 각 이슈에 대해 상세 정보 수집
-        print(f"\n2단계: 상세 정보 수집 (최대 {min(max_documents, len(issue_titles))}개)...")
+        # 각 이슈의 상세 정보를 동시에 수집 (호스트별 속도 제한은 크롤러가 처리)
+        target_titles = issue_titles[:max_documents]
+        print(f"\n2단계: 상세 정보 동시 수집 ({len(target_titles)}개)...")
+        posts = workflow.get_posts_details([item['link'] for item in target_titles], max_comments=20)
         
-        for idx, item in enumerate(issue_titles[:max_documents], 1):
-            print(f"\n--- 처리 중: {idx}/{min(max_documents, len(issue_titles))} ---")
+        for idx, (item, post_data) in enumerate(zip(target_titles, posts), 1):
+            print(f"\n--- 처리 중: {idx}/{len(target_titles)} ---")
             print(f"제목: {item['title'][:50]}...")
             
+            if not post_data:
+                print("  ❌ 게시글 수집 실패")
+                continue
+            
             try:
-                # 작성일시 추출
-                print("  - 작성일시 추출 중...")
-                post_datetime = workflow.get_post_datetime(item['link'])
-                print(f"    작성일시: {post_datetime}")
-                
-                # 게시글 내용과 댓글 수집
-                print("  - 게시글 내용 및 댓글 수집 중...")
-                post_data = workflow.get_post_content_and_comments(item['link'], max_comments=20)
+                print(f"    작성일시: {post_data['post_datetime']}")
                 print(f"    댓글 수: {len(post_data['comments'])}개")
                 
                 # Perplexity 분석
@@ -156,7 +146,7 @@ def create_test_documents(titles_data, max_documents=50):
                     "title": item['title'],
                     "link": item['link'],
                     "page_num": item.get('page_num', 'unknown'),
-                    "post_datetime": post_datetime,
+                    "post_datetime": post_data['post_datetime'],
                     "content": post_data['content'],
                     "comments": post_data['comments'],
                     "comments_count": len(post_data['comments']),
@@ -168,9 +158,6 @@ def create_test_documents(titles_data, max_documents=50):
                 documents.append(document)
                 print(f"  ✅ 문서 생성 완료: {document['id']}")
                 
-                # API 호출 간격 조절
-                time.sleep(2)
-                
             except Exception as e:
                 logger.error(f"문서 처리 실패: {e}")
                 print(f"  ❌ 오류: {e}")
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Qdrant 컬렉션 관리 CLI
+- count: count API로 정확한 포인트 수 (vectors_count/scroll 대신)
+- status: get_collection 한 번으로 상태, 최적화, 세그먼트, 인덱스 정보
+- histogram: 포인트 ID 구간별 병렬 scroll로 페이로드 필드 값 분포 계산
+- export: 모든 포인트를 JSONL(ID+페이로드)과 NumPy(.npy, 같은 순서의 dense 벡터)로 내보내기
+헬스 체크/대시보드에서 쓰도록 --json이면 결과를 JSON으로 출력하고, 상태가 나쁘면 종료 코드 1
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from dotenv import load_dotenv
+from qdrant_common import (
+    count_points, dense_vector, dense_vector_params, get_qdrant_client, has_sparse_vectors, iter_scroll, iter_scroll_partition,
+    scroll_partitions
+)
+
+# 환경변수 로드
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def collection_status(client, collection_name):
+    """컬렉션 상태 요약 (get_collection 한 번)"""
+    info = client.get_collection(collection_name)
+    vectors = dense_vector_params(info)
+
+    return {
+        "collection": collection_name,
+        "status": str(info.status).split(".")[-1].lower(),
+        "optimizer_status": str(info.optimizer_status),
+        "points_count": info.points_count,
+        "indexed_vectors_count": info.indexed_vectors_count,
+        "segments_count": info.segments_count,
+        "vector_size": getattr(vectors, "size", None),
+        "distance": str(getattr(vectors, "distance", "")),
+        "vectors_on_disk": bool(getattr(vectors, "on_disk", False)),
+        "quantization": type(info.config.quantization_config).__name__ if info.config.quantization_config else None,
+        "sparse_vectors": has_sparse_vectors(info),
+        "indexing_threshold": info.config.optimizer_config.indexing_threshold,
+        "hnsw": {"m": info.config.hnsw_config.m, "ef_construct": info.config.hnsw_config.ef_construct},
+        "payload_indexes": {
+            field: {"type": str(schema.data_type), "points": schema.points}
+            for field, schema in (info.payload_schema or {}).items()
+        }
+    }
+
+
+def _value_keys(value):
+    """히스토그램에 셀 값 목록 (리스트는 원소마다, 값이 없으면 "(없음)")"""
+    if value is None or value == "":
+        return ["(없음)"]
+    if isinstance(value, list):
+        return [str(item) for item in value] or ["(없음)"]
+    return [str(value)]
+
+
+def payload_histogram(client, collection_name, fields, partitions=8, page_size=1024):
+    """
+    페이로드 필드별 값 분포 (ID 구간마다 스레드 하나가 scroll)
+
+    Returns:
+        dict: {필드: Counter}
+    """
+    def count_partition(bounds):
+        start, end = bounds
+        counters = {field: Counter() for field in fields}
+        for points in iter_scroll_partition(client, collection_name, start, end, page_size=page_size,
+                                            with_payload=list(fields)):
+            for point in points:
+                payload = point.payload or {}
+                for field in fields:
+                    counters[field].update(_value_keys(payload.get(field)))
+        return counters
+
+    totals = {field: Counter() for field in fields}
+    with ThreadPoolExecutor(max_workers=partitions) as executor:
+        for counters in executor.map(count_partition, scroll_partitions(partitions)):
+            for field, counter in counters.items():
+                totals[field].update(counter)
+    return totals
+
+
+def export_points(client, collection_name, output_prefix, with_vectors=True, page_size=1024):
+    """
+    모든 포인트를 <output_prefix>.jsonl (한 줄에 {"id", "payload"})과
+    <output_prefix>.npy (같은 순서의 float32 dense 벡터)로 내보냄
+    벡터를 함께 내보낼 때 dense 벡터가 없는 포인트는 두 파일 순서를 맞추기 위해 건너뜀
+
+    Returns:
+        int: 내보낸 포인트 수
+    """
+    expected = count_points(client, collection_name)
+    jsonl_path = f"{output_prefix}.jsonl"
+    npy_path = f"{output_prefix}.npy"
+    vectors = None
+    written = 0
+    skipped = 0
+    # 벡터 파일 너비는 첫 포인트가 아니라 컬렉션 설정에서 (설정에 없으면 처음 만난 dense 벡터 길이)
+    vector_size = None
+    if with_vectors:
+        vector_size = getattr(dense_vector_params(client.get_collection(collection_name)), "size", None)
+
+    with open(jsonl_path, 'w', encoding='utf-8') as f:
+        for points, _ in iter_scroll(client, collection_name, page_size=page_size, with_payload=True,
+                                     with_vectors=with_vectors):
+            if with_vectors and written + len(points) > expected:
+                # 미리 잡은 벡터 파일 크기를 넘지 않도록 시작할 때의 포인트 수까지만 내보냄
+                logger.warning("내보내는 중에 포인트가 늘어 나머지는 건너뜁니다")
+                points = points[:expected - written]
+
+            for point in points:
+                if with_vectors:
+                    vector = dense_vector(point.vector)
+                    if vector is None:
+                        skipped += 1
+                        continue
+                    if vectors is None:
+                        # 포인트 수만큼 미리 잡은 파일에 바로 써서 전체 벡터를 메모리에 올리지 않음
+                        vectors = np.lib.format.open_memmap(
+                            npy_path, mode="w+", dtype=np.float32, shape=(expected, vector_size or len(vector))
+                        )
+                    vectors[written] = vector
+                f.write(json.dumps({"id": point.id, "payload": point.payload}, ensure_ascii=False) + "\n")
+                written += 1
+            logger.info(f"{written}/{expected}개 내보내는 중...")
+
+            if with_vectors and written >= expected:
+                break
+
+    if skipped:
+        logger.warning(f"dense 벡터가 없는 포인트 {skipped}개는 내보내지 않았습니다")
+
+    if vectors is not None:
+        vectors.flush()
+        if written < len(vectors):
+            # 내보내는 중에 포인트가 줄었으면 실제 개수만 남김
+            trimmed = np.array(vectors[:written])
+            del vectors
+            np.save(npy_path, trimmed)
+        else:
+            del vectors
+
+    return written
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Qdrant 컬렉션 관리 CLI')
+    parser.add_argument('--collection', default='theqoo_documents_openai', help='대상 컬렉션 (별칭 가능)')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력 (헬스 체크/대시보드용)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('count', help='정확한 포인트 수')
+    subparsers.add_parser('status', help='상태/최적화/세그먼트/인덱스 정보')
+
+    histogram_parser = subparsers.add_parser('histogram', help='페이로드 필드 값 분포')
+    histogram_parser.add_argument('--field', nargs='+', default=['collected_date'], help='분포를 셀 페이로드 필드')
+    histogram_parser.add_argument('--partitions', type=int, default=8, help='병렬 scroll 구간 수')
+    histogram_parser.add_argument('--top', type=int, default=20, help='필드마다 출력할 상위 값 수 (0이면 전체)')
+
+    export_parser = subparsers.add_parser('export', help='JSONL/NumPy로 내보내기')
+    export_parser.add_argument('--output', default=None, help='출력 파일 경로 앞부분 (기본: 컬렉션 이름)')
+    export_parser.add_argument('--no-vectors', action='store_true', help='벡터 없이 JSONL만 내보냄')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING if args.json else logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    client = get_qdrant_client()
+    started = time.perf_counter()
+
+    try:
+        if args.command == 'count':
+            result = {"collection": args.collection, "points_count": count_points(client, args.collection)}
+            healthy = result["points_count"] > 0
+            text = f"포인트 수: {result['points_count']}개"
+
+        elif args.command == 'status':
+            result = collection_status(client, args.collection)
+            healthy = result["status"] == "green"
+            text = "\n".join(f"{key}: {value}" for key, value in result.items())
+
+        elif args.command == 'histogram':
+            totals = payload_histogram(client, args.collection, args.field, partitions=args.partitions)
+            result = {
+                field: dict(counter.most_common(args.top or None))
+                for field, counter in totals.items()
+            }
+            healthy = True
+            lines = []
+            for field, counter in totals.items():
+                lines.append(f"[{field}] 값 {len(counter)}종, 포인트 {sum(counter.values())}개")
+                lines.extend(f"  {value}: {count}" for value, count in counter.most_common(args.top or None))
+            text = "\n".join(lines)
+
+        else:
+            output_prefix = args.output or args.collection
+            exported = export_points(client, args.collection, output_prefix, with_vectors=not args.no_vectors)
+            result = {"collection": args.collection, "exported": exported, "output": output_prefix}
+            healthy = True
+            files = f"{output_prefix}.jsonl" + ("" if args.no_vectors else f", {output_prefix}.npy")
+            text = f"{exported}개 포인트 내보냄: {files}"
+
+    except Exception as e:
+        logger.error(f"{args.command} 실패: {e}")
+        if args.json:
+            print(json.dumps({"collection": args.collection, "error": str(e)}, ensure_ascii=False))
+        sys.exit(1)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, default=str))
+    else:
+        print(text)
+        print(f"({elapsed_ms:.0f}ms)")
+
+    sys.exit(0 if healthy else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+댓글 단위 벡터 인덱스
+게시글 페이로드 안의 댓글 목록을 댓글 하나당 가벼운 포인트(게시글 ID + 댓글 위치 + 원문)로
+별도 컬렉션(<컬렉션>_comments)에 저장하고, 게시글 ID로 묶어(group_by) 검색하여
+채팅 답변에서 질문과 맞는 댓글을 정확히 인용할 수 있게 함
+"ㅋㅋㅋ"처럼 반복되는 짧은 댓글이 많으므로 같은 텍스트는 한 번만 임베딩
+"""
+
+import argparse
+import logging
+import re
+import uuid
+from qdrant_client.models import PointStruct
+from dotenv import load_dotenv
+from qdrant_common import (
+    PARENT_ID_FIELD, ChunkedUpserter, collection_exists, collection_params, delete_document_chunks,
+    documents_from_points, ensure_payload_indexes, grouped_search, iter_batches, iter_scroll,
+    point_id_for_document, timestamp_fields
+)
+
+# 환경변수 로드
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 본 컬렉션 이름 뒤에 붙는 댓글 컬렉션 접미사
+COMMENT_COLLECTION_SUFFIX = "_comments"
+
+
+def normalize_comment(text):
+    """공백을 정리한 댓글 텍스트 (같은 댓글 판단 및 임베딩 입력)"""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def post_comments(doc, min_chars=1):
+    """
+    게시글의 (댓글 위치, 댓글) 목록
+    한 게시글 안에서 같은 댓글이 반복되면 처음 것만 남김 (위치는 원래 댓글 목록 기준)
+    """
+    comments, seen = [], set()
+    for position, comment in enumerate(doc.get('comments') or []):
+        text = normalize_comment(comment)
+        if len(text) < min_chars or text in seen:
+            continue
+        seen.add(text)
+        comments.append((position, text))
+    return comments
+
+
+def comment_point_id(parent_id, position):
+    """댓글 포인트 ID (게시글 ID + 댓글 위치로 정해져 재저장 시 같은 포인트를 덮어씀)"""
+    return str(uuid.uuid5(uuid.UUID(str(parent_id)), f"comment:{position}"))
+
+
+class CommentIndex:
+    def __init__(self, client, collection_name, embed_texts, vector_size, min_chars=1):
+        """
+        댓글 단위 컬렉션 (임베딩은 본 컬렉션 스토리지와 같은 모델/캐시 사용)
+
+        Args:
+            client: QdrantClient
+            collection_name (str): 댓글 컬렉션 이름
+            embed_texts: 텍스트 목록을 벡터 목록으로 바꾸는 함수 (실패한 항목은 None)
+            vector_size (int): 임베딩 차원
+            min_chars (int): 이보다 짧은 댓글은 저장하지 않음
+        """
+        self.client = client
+        self.collection_name = collection_name
+        self.embed_texts = embed_texts
+        self.vector_size = vector_size
+        self.min_chars = min_chars
+
+        self._create_collection_if_not_exists()
+
+    def _create_collection_if_not_exists(self):
+        """댓글 컬렉션이 없으면 생성 (dense 벡터만, 게시글 ID/날짜 필터용 페이로드 인덱스)"""
+        try:
+            if not collection_exists(self.client, self.collection_name):
+                self.client.create_collection(
+                    collection_name=self.collection_name,
+                    **collection_params(self.vector_size)
+                )
+                logger.info(f"댓글 컬렉션 '{self.collection_name}' 생성됨")
+            ensure_payload_indexes(self.client, self.collection_name)
+        except Exception as e:
+            logger.error(f"댓글 컬렉션 생성/확인 실패: {e}")
+
+    def store_documents(self, documents, upsert_chunk_size=512, upsert_parallel=4):
+        """
+        게시글들의 댓글을 댓글 단위 포인트로 저장 (새 포인트를 올린 뒤 게시글의 남는 댓글 포인트만 삭제)
+        게시글 포인트보다 먼저 호출해야 댓글 저장이 실패한 글이 다음 수집 때 다시 저장됨
+
+        Returns:
+            int: 저장한 댓글 포인트 수 (임베딩/저장이 하나라도 실패하면 -1)
+        """
+        try:
+            post_rows = [(doc, point_id_for_document(doc), post_comments(doc, self.min_chars)) for doc in documents]
+            if not post_rows:
+                return 0
+            texts = [text for _, _, comments in post_rows for _, text in comments]
+
+            # 같은 텍스트는 게시글이 달라도 한 번만 임베딩 (배치 사이 반복은 임베딩 캐시가 처리)
+            unique_texts = list(dict.fromkeys(texts))
+            vectors = dict(zip(unique_texts, self.embed_texts(unique_texts))) if unique_texts else {}
+
+            points, failed = [], 0
+            for doc, parent_id, comments in post_rows:
+                post_payload = {
+                    PARENT_ID_FIELD: parent_id,
+                    "title": doc['title'],
+                    "link": doc['link'],
+                    **timestamp_fields(doc)
+                }
+                for position, text in comments:
+                    vector = vectors.get(text)
+                    if vector is None:
+                        failed += 1
+                        continue
+                    points.append(PointStruct(
+                        id=comment_point_id(parent_id, position),
+                        vector=list(vector),
+                        payload={**post_payload, "position": position, "text": text}
+                    ))
+
+            upserter = ChunkedUpserter(
+                self.client, self.collection_name,
+                chunk_size=upsert_chunk_size, parallel=upsert_parallel
+            )
+            upserter.add(points)
+            upsert_result = upserter.finish()
+
+            logger.info(
+                f"댓글 {len(texts)}개 중 고유 텍스트 {len(unique_texts)}개 임베딩, "
+                f"{len(points)}개 저장 (임베딩 실패 {failed}개)"
+            )
+            if failed or upsert_result['failed']:
+                logger.error(f"댓글 저장 일부 실패: 임베딩 {failed}개, 업서트 {upsert_result['failed']}개")
+                return -1
+
+            # 수정된 글은 댓글 위치가 바뀔 수 있어 새 포인트에 없는 기존 댓글 포인트만 삭제
+            delete_document_chunks(
+                self.client, self.collection_name, [parent_id for _, parent_id, _ in post_rows],
+                keep_ids=[point.id for point in points]
+            )
+            return len(points)
+
+        except Exception as e:
+            logger.error(f"댓글 저장 실패: {e}")
+            return -1
+
+    def search(self, query_vector, limit=5, comments_per_post=3, query_filter=None):
+        """
+        게시글마다 질문과 가장 잘 맞는 댓글 comments_per_post개씩 검색
+
+        Returns:
+            list: PointGroup 목록 (group.id = 게시글 포인트 ID, group.hits = 점수 순 댓글)
+        """
+        try:
+            return grouped_search(
+                self.client, self.collection_name, query_vector,
+                limit=limit, group_size=comments_per_post, query_filter=query_filter,
+                with_payload=[PARENT_ID_FIELD, "title", "link", "position", "text"]
+            )
+        except Exception as e:
+            logger.error(f"댓글 검색 실패: {e}")
+            return []
+
+
+def comment_context(groups):
+    """댓글 검색 결과를 LLM 컨텍스트 문자열로 (게시글마다 댓글 번호와 원문)"""
+    parts = []
+    for group in groups:
+        if not group.hits:
+            continue
+        payload = group.hits[0].payload
+        lines = [f"게시글: {payload['title']} ({payload['link']})"]
+        lines.extend(
+            f"- 댓글 #{hit.payload['position'] + 1} (유사도 {hit.score:.3f}): {hit.payload['text']}"
+            for hit in group.hits
+        )
+        parts.append("\n".join(lines))
+    return "\n\n".join(parts)
+
+
+def main():
+    """기존 컬렉션의 게시글 댓글을 댓글 컬렉션에 채움 (재수집 없이)"""
+    parser = argparse.ArgumentParser(description='기존 컬렉션 게시글의 댓글을 댓글 단위 컬렉션으로 색인')
+    parser.add_argument('--collection', default='theqoo_documents_openai', help='게시글 컬렉션 (별칭 가능)')
+    parser.add_argument('--embedding', choices=['openai', 'local'], default='openai',
+                        help='게시글 컬렉션 임베딩 (openai: text-embedding-3-small, local: MiniLM)')
+    parser.add_argument('--page-size', type=int, default=256, help='scroll 페이지 크기')
+    parser.add_argument('--batch-size', type=int, default=1024, help='한 번에 댓글을 임베딩할 게시글 수')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.embedding == "openai":
+        from openai_qdrant_storage import OpenAIQdrantStorage
+        storage = OpenAIQdrantStorage(collection_name=args.collection, index_comments=True)
+    else:
+        from qdrant_storage import QdrantStorage
+        storage = QdrantStorage(collection_name=args.collection, index_comments=True)
+
+    documents = (
+        document
+        for points, _ in iter_scroll(storage.client, args.collection, page_size=args.page_size)
+        for document in documents_from_points(points, storage.document_store)
+    )
+
+    stored = 0
+    for batch in iter_batches(documents, args.batch_size):
+        count = storage.comment_index.store_documents(batch)
+        if count < 0:
+            print(f"\n❌ 댓글 색인 실패! ({stored}개까지 저장됨)")
+            return
+        stored += count
+
+    print(f"\n✅ '{storage.comment_index.collection_name}'에 댓글 {stored}개 색인 완료!")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,50 +3,41 @@
 Qdrant 컬렉션 삭제 및 재생성 스크립트
 """
 
-import os
 import logging
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
 from dotenv import load_dotenv
+from qdrant_common import (
+    QUANTIZATION_TYPES, collection_params, ensure_payload_indexes, get_qdrant_client, resolve_alias
+)
 
 # 환경변수 로드
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-def delete_and_recreate_collection(collection_name="theqoo_documents_openai"):
-    """컬렉션을 삭제하고 다시 생성"""
+def delete_and_recreate_collection(collection_name="theqoo_documents_openai", quantization=None,
+                                   on_disk=False, hnsw_m=None, hnsw_ef_construct=None, dimensions=1536,
+                                   hybrid=True):
+    """
+    컬렉션을 삭제하고 다시 생성
     
-    # Qdrant 설정
-    qdrant_url = os.getenv("QDRANT_URL")
-    qdrant_key = os.getenv("QDRANT_KEY")
+    Args:
+        quantization (str): None, "scalar"(int8) 또는 "binary"
+        on_disk (bool): 원본 벡터를 디스크에 저장 (양자화 벡터만 RAM에 유지)
+        hnsw_m, hnsw_ef_construct (int): HNSW 파라미터 (None이면 서버 기본값)
+        dimensions (int): 벡터 차원 (OpenAIQdrantStorage의 embedding_dimensions와 같아야 함)
+        hybrid (bool): 키워드 검색용 BM25 희소 벡터 추가
+    """
     
-    # URL에서 호스트와 포트 추출
-    if qdrant_url:
-        if qdrant_url.startswith("http://"):
-            host = qdrant_url[7:]  # "http://" 제거
-        elif qdrant_url.startswith("https://"):
-            host = qdrant_url[8:]  # "https://" 제거
-        else:
-            host = qdrant_url
-        
-        # 포트가 URL에 포함되어 있으면 추출
-        if ":" in host:
-            host, port_str = host.split(":", 1)
-            port = int(port_str)
-        else:
-            port = 6333
-    else:
-        host = "localhost"
-        port = 6333
-    
-    # Qdrant 클라이언트 초기화
-    if qdrant_key:
-        client = QdrantClient(host=host, port=port, api_key=qdrant_key)
-    else:
-        client = QdrantClient(host=host, port=port)
+    # Qdrant 클라이언트 (QDRANT_URL/QDRANT_KEY/QDRANT_PREFER_GRPC 환경변수 사용)
+    client = get_qdrant_client()
     
     try:
+        # 별칭이면 삭제하지 않음 (읽는 중인 컬렉션은 reindex_collection.py로 무중단 교체)
+        target = resolve_alias(client, collection_name)
+        if target:
+            print(f"'{collection_name}'은 컬렉션 '{target}'을 가리키는 별칭입니다. reindex_collection.py로 교체하세요.")
+            return False
+        
         # 기존 컬렉션 확인
         collections = client.get_collections()
         collection_names = [col.name for col in collections.collections]
@@ -62,13 +53,23 @@ def delete_and_recreate_collection(collection_name="theqoo_documents_openai"):
         print(f"새 컬렉션 '{collection_name}' 생성 중...")
         client.create_collection(
             collection_name=collection_name,
-            vectors_config=VectorParams(size=1536, distance=Distance.COSINE)  # text-embedding-3-small 차원
+            **collection_params(
+                dimensions,  # text-embedding-3-small 출력 차원
+                quantization=quantization,
+                on_disk=on_disk,
+                hnsw_m=hnsw_m,
+                hnsw_ef_construct=hnsw_ef_construct,
+                sparse=hybrid
+            )
         )
-        print(f"컬렉션 '{collection_name}' 생성 완료 (text-embedding-3-small)")
+        print(f"컬렉션 '{collection_name}' 생성 완료 (text-embedding-3-small {dimensions}차원, 양자화: {quantization or '없음'}, 원본 디스크 저장: {on_disk})")
+        
+        # 날짜/링크 필터용 페이로드 인덱스 생성
+        ensure_payload_indexes(client, collection_name)
         
         # 컬렉션 정보 확인
         info = client.get_collection(collection_name)
-        print(f"컬렉션 벡터 수: {info.vectors_count}")
+        print(f"컬렉션 포인트 수: {info.points_count}")
         
         return True
         
@@ -88,6 +89,17 @@ def main():
     if user_input:
         collection_name = user_input
     
+    # 저장 방식 설정
+    dimensions = input("벡터 차원을 입력하세요 (예: 256, 512, 기본값: 1536): ").strip()
+    quantization = input(f"양자화 방식을 입력하세요 ({'/'.join(QUANTIZATION_TYPES)}, 기본값: 없음): ").strip().lower() or None
+    if quantization and quantization not in QUANTIZATION_TYPES:
+        print(f"지원하지 않는 양자화 방식입니다: {quantization}")
+        return
+    on_disk = input("원본 벡터를 디스크에 저장하시겠습니까? (y/N): ").strip().lower() == 'y'
+    hnsw_m = input("HNSW m 값을 입력하세요 (기본값: 서버 설정): ").strip()
+    hnsw_ef_construct = input("HNSW ef_construct 값을 입력하세요 (기본값: 서버 설정): ").strip()
+    hybrid = input("키워드(BM25) 하이브리드 검색을 사용하시겠습니까? (Y/n): ").strip().lower() != 'n'
+    
     # 확인
     confirm = input(f"컬렉션 '{collection_name}'을 삭제하고 다시 생성하시겠습니까? (y/N): ").strip().lower()
     if confirm != 'y':
@@ -95,7 +107,15 @@ def main():
         return
     
     # 삭제 및 재생성
-    success = delete_and_recreate_collection(collection_name)
+    success = delete_and_recreate_collection(
+        collection_name,
+        quantization=quantization,
+        on_disk=on_disk,
+        hnsw_m=int(hnsw_m) if hnsw_m else None,
+        hnsw_ef_construct=int(hnsw_ef_construct) if hnsw_ef_construct else None,
+        dimensions=int(dimensions) if dimensions else 1536,
+        hybrid=hybrid
+    )
     
     if success:
         print("\n✅ 컬렉션 삭제 및 재생성 완료!")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+게시글을 여러 벡터로 나누는 청크 분할기
+본문/분석은 겹치는 글자 구간으로, 댓글은 겹치는 댓글 묶음(window)으로 나눠
+500자에서 잘리던 긴 글과 6번째 이후 댓글도 검색되도록 함
+청크마다 게시글 포인트 ID(parent_id)를 페이로드에 넣어 검색 시 게시글 단위로 묶음
+"""
+
+import uuid
+from qdrant_common import PARENT_ID_FIELD, point_id_for_document
+
+# 청크를 자를 위치 우선순위 (문단 > 문장 > 단어)
+BREAK_CHARS = ("\n", ". ", "! ", "? ", " ")
+
+
+def split_text(text, chunk_chars=500, overlap=100):
+    """
+    글을 chunk_chars 길이 구간으로 나눔 (앞 구간과 overlap자 겹침, 가능하면 문장/단어 경계에서 자름)
+    """
+    text = (text or "").strip()
+    if len(text) <= chunk_chars:
+        return [text] if text else []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            # 구간 뒤쪽 절반 안에서 가장 늦은 경계를 찾아 단어/문장이 잘리지 않게 함
+            window = text[start + chunk_chars // 2:end]
+            for marker in BREAK_CHARS:
+                cut = window.rfind(marker)
+                if cut >= 0:
+                    end = start + chunk_chars // 2 + cut + len(marker)
+                    break
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return [chunk for chunk in chunks if chunk]
+
+
+def comment_windows(comments, max_chars=800, overlap=2):
+    """
+    댓글을 max_chars 안에 들어가는 만큼 묶은 겹치는 묶음 생성
+    다음 묶음은 앞 묶음에 실제로 들어간 마지막 댓글 overlap개부터 시작하여 모든 댓글이 어느 묶음엔가 포함됨
+    한 댓글이 max_chars보다 길면 그 댓글만 split_text로 나눔
+    """
+    comments = [comment.strip() for comment in comments or [] if comment and comment.strip()]
+    windows = []
+    start = 0
+    while start < len(comments):
+        if len(comments[start]) > max_chars:
+            windows.extend(split_text(comments[start], max_chars, max_chars // 5))
+            start += 1
+            continue
+
+        # 글자 수 한도 안에 들어가는 데까지 댓글을 붙임 (줄바꿈 1자 포함)
+        end, length = start, -1
+        while end < len(comments) and length + 1 + len(comments[end]) <= max_chars:
+            length += 1 + len(comments[end])
+            end += 1
+        windows.append("\n".join(comments[start:end]))
+
+        if end >= len(comments):
+            break
+        # 겹치는 댓글은 묶음의 절반까지만 (짧은 묶음이 한 댓글씩만 밀리며 청크가 불어나지 않게)
+        start = max(end - min(overlap, (end - start) // 2), start + 1)
+    return windows
+
+
+def document_chunks(doc, chunk_chars=500, overlap=100, comment_chars=800, comment_overlap=2):
+    """
+    게시글 청크 목록 [{"kind", "index", "text"}]
+    body 0번 청크는 본문이 없어도 항상 만들어 게시글마다 ID가 정해진 청크가 하나 있게 함
+    (변경 감지에 사용, first_chunk_point_id 참고)
+    각 청크 앞에 제목을 붙여 짧은 청크도 어떤 글의 일부인지 임베딩에 반영
+    """
+    title = doc.get('title', '')
+    chunks = []
+
+    body = split_text(doc.get('content'), chunk_chars, overlap) or [""]
+    for index, text in enumerate(body):
+        chunks.append({"kind": "body", "index": index, "text": f"{title}\n{text}".strip()})
+
+    for index, text in enumerate(split_text(doc.get('analysis'), chunk_chars, overlap)):
+        chunks.append({"kind": "analysis", "index": index, "text": f"{title}\n{text}"})
+
+    for index, text in enumerate(comment_windows(doc.get('comments'), comment_chars, comment_overlap)):
+        chunks.append({"kind": "comments", "index": index, "text": f"{title}\n{text}"})
+
+    return chunks
+
+
+def chunk_point_id(parent_id, kind, index):
+    """청크 포인트 ID (게시글 ID + 종류 + 순번으로 정해져 재저장 시 같은 청크를 덮어씀)"""
+    return str(uuid.uuid5(uuid.UUID(str(parent_id)), f"{kind}:{index}"))
+
+
+def first_chunk_point_id(doc):
+    """게시글마다 항상 있는 body 0번 청크 ID (저장된 doc_hash 확인용)"""
+    return chunk_point_id(point_id_for_document(doc), "body", 0)
+
+
+def chunk_payload(document_payload, parent_id, chunk):
+    """게시글 페이로드에 청크 정보를 더한 청크 포인트 페이로드"""
+    return {
+        **document_payload,
+        PARENT_ID_FIELD: str(parent_id),
+        "chunk_kind": chunk["kind"],
+        "chunk_index": chunk["index"],
+        "chunk_text": chunk["text"]
+    }
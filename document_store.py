@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+게시글 본문/댓글/분석 전문을 포인트 ID로 보관하는 SQLite 문서 저장소
+Qdrant 페이로드에는 검색 결과 표시에 필요한 짧은 필드만 두고, 전문은 화면에 보여줄 때만 여기서 조회
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentStore:
+    def __init__(self, db_path="document_store.db"):
+        """
+        Args:
+            db_path (str): SQLite 파일 경로 (":memory:"이면 메모리에만 저장)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    point_id TEXT PRIMARY KEY,
+                    link TEXT,
+                    title TEXT,
+                    content TEXT,
+                    comments TEXT,
+                    analysis TEXT,
+                    updated_at TEXT
+                )
+            """)
+
+    def put_many(self, items):
+        """(포인트 ID, 문서) 목록 저장 (이미 있으면 덮어씀)"""
+        now = datetime.now().isoformat(timespec="seconds")
+        rows = [
+            (
+                str(point_id),
+                doc.get('link', ''),
+                doc.get('title', ''),
+                doc.get('content', ''),
+                json.dumps(doc.get('comments', []), ensure_ascii=False),
+                doc.get('analysis', ''),
+                now
+            )
+            for point_id, doc in items
+        ]
+        if not rows:
+            return
+
+        with self._lock, self.conn:
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO documents (point_id, link, title, content, comments, analysis, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+    def get_many(self, point_ids):
+        """{포인트 ID: 문서 전문} 반환 (없는 ID는 빠짐)"""
+        ids = [str(point_id) for point_id in point_ids]
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT * FROM documents WHERE point_id IN ({placeholders})", chunk
+                ).fetchall()
+                for row in rows:
+                    document = dict(row)
+                    document['comments'] = json.loads(document['comments'] or "[]")
+                    found[document.pop('point_id')] = document
+
+        return found
+
+    def existing_ids(self, point_ids):
+        """point_ids 중 저장소에 있는 ID 집합 (전문 없이 ID만 조회)"""
+        ids = [str(point_id) for point_id in point_ids]
+        found = set()
+
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT point_id FROM documents WHERE point_id IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(row['point_id'] for row in rows)
+
+        return found
+
+    def get(self, point_id):
+        """문서 전문 조회 (없으면 None)"""
+        return self.get_many([point_id]).get(str(point_id))
+
+    def close(self):
+        """DB 연결 종료"""
+        self.conn.close()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+임베딩 디스크 캐시
+(모델 이름, 텍스트 해시)를 키로 float32 벡터를 SQLite에 저장하여
+JSON 재로드/재실행 시 같은 텍스트를 다시 임베딩하지 않도록 함
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def text_digest(text):
+    """캐시 키용 텍스트 해시"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, db_path="embedding_cache.db", max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            db_path (str): SQLite 파일 경로 (":memory:"이면 메모리에만 저장)
+            max_bytes (int): 저장할 벡터의 최대 총 크기, 넘으면 오래 안 쓴 항목부터 삭제
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, digest)
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        # 총 크기는 열 때 한 번 세고 이후 저장 때 증감으로 관리 (정리할 때만 다시 셈)
+        self._total_bytes = self._count_bytes()
+
+    def _count_bytes(self):
+        """DB에 저장된 벡터의 실제 총 크기 (전체 스캔)"""
+        return self.conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def get_many(self, model, texts):
+        """캐시에 있는 벡터를 {입력 인덱스: numpy 벡터}로 반환"""
+        digests = [text_digest(text) for text in texts]
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(digests), 500):
+                chunk = list(set(digests[start:start + 500]))
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE model = ? AND digest IN ({placeholders})",
+                    [model] + chunk
+                ).fetchall()
+                found.update({digest: np.frombuffer(blob, dtype=np.float32) for digest, blob in rows})
+
+            if found:
+                with self.conn:
+                    self.conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE model = ? AND digest = ?",
+                        [(time.time(), model, digest) for digest in found]
+                    )
+
+            result = {idx: found[digest] for idx, digest in enumerate(digests) if digest in found}
+            self.hits += len(result)
+            self.misses += len(texts) - len(result)
+
+        return result
+
+    def put_many(self, model, texts, vectors):
+        """벡터 저장 (None인 벡터는 건너뜀)"""
+        now = time.time()
+        # 같은 텍스트가 여러 번 있으면 마지막 벡터만 저장
+        blobs = {
+            text_digest(text): np.asarray(vector, dtype=np.float32).tobytes()
+            for text, vector in zip(texts, vectors)
+            if vector is not None
+        }
+        if not blobs:
+            return
+
+        with self._lock:
+            # 덮어쓰는 항목의 기존 크기 (기본 키 조회라 전체 스캔 없음)
+            replaced_bytes = 0
+            digests = list(blobs)
+            for start in range(0, len(digests), 500):
+                chunk = digests[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                replaced_bytes += self.conn.execute(
+                    f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                    f"WHERE model = ? AND digest IN ({placeholders})",
+                    [model] + chunk
+                ).fetchone()[0]
+
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, digest, vector, last_used) VALUES (?, ?, ?, ?)",
+                    [(model, digest, blob, now) for digest, blob in blobs.items()]
+                )
+            self._total_bytes += sum(len(blob) for blob in blobs.values()) - replaced_bytes
+            self._evict_if_needed()
+
+    def _evict_if_needed(self):
+        """최대 크기를 넘으면 오래 안 쓴 항목부터 삭제하여 90% 이하로 줄임"""
+        if not self.max_bytes or self._total_bytes <= self.max_bytes:
+            return
+
+        # 스케줄러/Streamlit 등 여러 프로세스가 같은 파일을 쓰면 프로세스 안의 합계가 어긋나므로
+        # 삭제하기 전에 실제 크기를 다시 셈 (한도를 넘었을 때만 실행되어 부담이 적음)
+        self._total_bytes = self._count_bytes()
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        target = self.max_bytes * 0.9
+        removed = 0
+        with self.conn:
+            while self._total_bytes > target:
+                rows = self.conn.execute(
+                    "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used LIMIT 500"
+                ).fetchall()
+                if not rows:
+                    break
+
+                # 목표 크기까지 필요한 만큼만 삭제
+                to_delete = []
+                for rowid, size in rows:
+                    if self._total_bytes <= target:
+                        break
+                    to_delete.append((rowid,))
+                    self._total_bytes -= size
+                self.conn.executemany("DELETE FROM embeddings WHERE rowid = ?", to_delete)
+                removed += len(to_delete)
+        logger.info(f"임베딩 캐시 정리: {removed}개 삭제, 현재 {self._total_bytes / (1024 * 1024):.1f}MB")
+
+    def stats(self):
+        """캐시 적중/미스 통계"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "bytes": self._total_bytes
+        }
+
+    def close(self):
+        """DB 연결 종료"""
+        self.conn.close()
+
+
+def normalize_query(query):
+    """공백/대소문자 차이를 없앤 쿼리 캐시 키"""
+    return " ".join(query.split()).lower()
+
+
+class QueryVectorCache:
+    def __init__(self, max_size=1024, ttl_seconds=3600):
+        """
+        검색 쿼리 벡터용 메모리 LRU 캐시 (같은 프로세스의 모든 세션이 공유)
+
+        Args:
+            max_size (int): 최대 보관 쿼리 수
+            ttl_seconds (int): 쿼리 벡터 유효 시간(초)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model, query):
+        """캐시된 쿼리 벡터 (없거나 만료되면 None)"""
+        key = (model, normalize_query(query))
+        with self._lock:
+            item = self._items.get(key)
+            if item and time.monotonic() - item[1] < self.ttl_seconds:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[0]
+
+            if item:
+                del self._items[key]
+            self.misses += 1
+            return None
+
+    def put(self, model, query, vector):
+        """쿼리 벡터 저장 (가장 오래 안 쓴 항목부터 밀어냄)"""
+        key = (model, normalize_query(query))
+        with self._lock:
+            self._items[key] = (vector, time.monotonic())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def get_or_compute(self, model, query, compute):
+        """캐시에 있으면 반환, 없으면 compute(query)로 만들어 저장"""
+        vector = self.get(model, query)
+        if vector is None:
+            vector = compute(query)
+            self.put(model, query, vector)
+        return vector
+
+    def stats(self):
+        """캐시 적중/미스 통계"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._items)
+        }
+
+
+# 프로세스 전체(모든 Streamlit 세션)가 공유하는 쿼리 벡터 캐시
+query_vector_cache = QueryVectorCache()
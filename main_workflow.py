@@ -3,13 +3,14 @@ import json
 import time
 import requests
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_pool import WebDriverPool
+from theqoo_http import TheqooHttpClient
+from async_crawler import AsyncTheqooCrawler
+from post_index import PostIndex
 import logging
 from dotenv import load_dotenv
 
@@ -20,22 +21,71 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Perplexity 분석이 실패했을 때 analysis에 들어가는 문구 (perplexity.py / analyze_with_perplexity)
+ANALYSIS_FAILURE_PREFIXES = ("분석 중 오류 발생", "분석 결과를 가져올 수 없습니다")
+
+
+def is_analysis_failed(analysis):
+    """분석 결과가 실패 문구인지 확인 (실패한 게시글은 다음 실행에서 다시 분석)"""
+    return not analysis or analysis.startswith(ANALYSIS_FAILURE_PREFIXES)
+
+
 class TheqooWorkflow:
-    def __init__(self):
+    def __init__(self, use_http=True, post_index_path="theqoo_post_index.db"):
+        self.use_http = use_http
+        self.http_client = TheqooHttpClient()
+        
+        # 이미 처리한 게시글 기록 (None이면 매번 전체 수집)
+        self.post_index = PostIndex(post_index_path) if post_index_path else None
+        # 이번 실행에서 수집한 게시글 (link, title, content, comments, reply_count), 저장 성공 후에만 기록
+        self.pending_crawls = []
+        
         self.chrome_options = Options()
         self.chrome_options.add_argument("--headless")
         self.chrome_options.add_argument("--disable-gpu")
         self.chrome_options.add_argument("--no-sandbox")
         self.chrome_options.add_argument("--window-size=1920,1080")
         
+        # 크롬 세션을 매번 새로 띄우지 않고 풀에서 빌려 씀
+        self.driver_pool = WebDriverPool(self.chrome_options)
+        
+        # 목록/게시글을 동시에 수집하는 asyncio 크롤러 (HTTP 실패 시 Selenium fallback)
+        self.crawler = AsyncTheqooCrawler(
+            http_client=self.http_client,
+            post_fallback=self._get_post_details_selenium,
+            hot_titles_fallback=self._get_hot_titles_selenium
+        )
+        
     def get_hot_titles(self, page_num=2, start_idx=5, end_idx=20):
         """theqoo에서 핫타이틀 수집"""
         logger.info(f"페이지 {page_num}에서 핫타이틀 수집 시작")
         
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=self.chrome_options)
+        # 브라우저 없이 먼저 시도하고, 결과가 없을 때만 Selenium 사용
+        result = self.http_client.get_hot_titles(page_num) if self.use_http else []
+        if not result:
+            logger.info("HTTP 파싱 결과 없음 - Selenium으로 재시도")
+            result = self._get_hot_titles_selenium(page_num)
+        
+        # 지정된 범위의 결과만 반환
+        return result[start_idx:end_idx]
+    
+    def get_hot_titles_pages(self, page_nums):
+        """여러 페이지의 핫타이틀을 동시에 수집하여 {페이지 번호: 제목 리스트} 반환"""
+        logger.info(f"페이지 {list(page_nums)} 핫타이틀 동시 수집 시작")
+        
+        if not self.use_http:
+            return {page_num: self._get_hot_titles_selenium(page_num) for page_num in page_nums}
+        
+        return self.crawler.run_hot_pages(page_nums)
+    
+    def _get_hot_titles_selenium(self, page_num):
+        """Selenium으로 핫타이틀 목록 전체 수집"""
+        driver = None
         result = []
         
         try:
+            # 크롬 실행 실패도 이 페이지만 실패로 처리
+            driver = self.driver_pool.acquire()
             url = f"https://theqoo.net/hot?filter_mode=normal&page={page_num}"
             driver.get(url)
             time.sleep(3)
@@ -54,14 +104,14 @@ class TheqooWorkflow:
                     logger.debug(f"제목 추출 실패: {e}")
                     continue
             
-            # 지정된 범위의 결과만 반환
-            return result[start_idx:end_idx]
+            return result
             
         except Exception as e:
             logger.error(f"핫타이틀 수집 실패: {e}")
             return []
         finally:
-            driver.quit()
+            if driver is not None:
+                self.driver_pool.release(driver)
     
     def classify_titles(self, titles_data):
         """Perplexity API를 사용하여 정치 관련 여부 분류"""
@@ -127,80 +177,104 @@ class TheqooWorkflow:
     
     def get_post_datetime(self, url):
         """게시글 작성일시 추출"""
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=self.chrome_options)
-        
-        try:
-            driver.get(url)
-            wait = WebDriverWait(driver, 10)
-            container = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.side.fr")))
-            span = container.find_element(By.TAG_NAME, "span")
-            return span.text
-        except Exception as e:
-            logger.error(f"작성일시 추출 실패: {e}")
-            return None
-        finally:
-            driver.quit()
+        return self.get_post_details(url, max_comments=0)['post_datetime']
     
     def get_post_content_and_comments(self, url, max_comments=30):
         """게시글 내용과 댓글 수집"""
-        logger.info(f"게시글 내용 및 댓글 수집: {url}")
+        post_data = self.get_post_details(url, max_comments=max_comments)
+        return {
+            "content": post_data['content'],
+            "comments": post_data['comments']
+        }
+    
+    def get_post_details(self, url, max_comments=30):
+        """게시글을 한 번만 열어서 작성일시, 제목, 본문, 댓글을 함께 수집"""
+        logger.info(f"게시글 상세 정보 수집: {url}")
         
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=self.chrome_options)
+        # 브라우저 없이 먼저 시도하고, 본문/작성일시를 못 찾았을 때만 Selenium 사용
+        if self.use_http:
+            post_data = self.http_client.get_post_details(url, max_comments=max_comments)
+            if post_data and (post_data['content'] or post_data['post_datetime']):
+                return post_data
+            logger.info("HTTP 파싱 결과 없음 - Selenium으로 재시도")
+        
+        return self._get_post_details_selenium(url, max_comments)
+    
+    def get_posts_details(self, urls, max_comments=30):
+        """여러 게시글의 상세 정보를 동시에 수집 (입력 순서 유지, 실패한 게시글은 None)"""
+        logger.info(f"게시글 {len(urls)}개 동시 수집 시작")
+        
+        if not self.use_http:
+            return [self._get_post_details_selenium(url, max_comments) for url in urls]
+        
+        return self.crawler.run_posts(urls, max_comments=max_comments)
+    
+    def _get_post_details_selenium(self, url, max_comments=30):
+        """Selenium으로 게시글 상세 정보 수집"""
+        post_data = {
+            "post_datetime": None,
+            "title": "",
+            "content": "",
+            "comments": []
+        }
+        
+        driver = None
         
         try:
+            # 크롬 실행 실패도 이 게시글만 실패로 처리
+            driver = self.driver_pool.acquire()
             driver.get(url)
             
+            # 작성일시 추출
+            try:
+                container = WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.side.fr"))
+                )
+                post_data['post_datetime'] = container.find_element(By.TAG_NAME, "span").text
+            except Exception as e:
+                logger.error(f"작성일시 추출 실패: {e}")
+            
+            # 제목 추출
+            try:
+                post_data['title'] = driver.find_element(By.CSS_SELECTOR, "span.title").text.strip()
+            except Exception as e:
+                logger.debug(f"제목 추출 실패: {e}")
+            
             # 본문 내용 추출
             try:
                 WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, 'xe_content')))
                 content_element = driver.find_element(By.CLASS_NAME, 'xe_content')
-                article_content = content_element.text.strip()
+                post_data['content'] = content_element.text.strip()
             except Exception as e:
                 logger.warning(f"본문 추출 실패: {e}")
-                article_content = ""
             
-            # 댓글 더보기 클릭
-            try:
-                more_button = WebDriverWait(driver, 3).until(
-                    EC.element_to_be_clickable((By.CLASS_NAME, "show_more"))
-                )
-                more_button.click()
-                time.sleep(1)
-                
-                # 두 번째 클릭 시도
-                try:
-                    more_button = WebDriverWait(driver, 2).until(
-                        EC.element_to_be_clickable((By.CLASS_NAME, "show_more"))
-                    )
-                    more_button.click()
-                    time.sleep(1)
-                except:
-                    pass
-            except Exception as e:
-                logger.debug(f"댓글 더보기 버튼 클릭 실패: {e}")
+            # 댓글이 필요 없으면 여기서 종료
+            if max_comments <= 0:
+                return post_data
             
-            # 댓글 추출
-            comments = []
-            comment_elements = driver.find_elements(By.CSS_SELECTOR, "ul.fdb_lst_ul > li")
+            # 댓글은 더보기 버튼을 누르지 않고 댓글 목록 페이지를 직접 조회
+            post_data['comments'] = self.http_client.get_comments(url, max_comments=max_comments)
             
-            for idx, comment in enumerate(comment_elements[:max_comments], 1):
-                try:
-                    comment_text = comment.find_element(By.CSS_SELECTOR, "div.xe_content").text.strip()
-                    if comment_text and "비회원" not in comment_text:
-                        comments.append(comment_text)
-                except Exception as e:
-                    logger.debug(f"댓글 {idx} 추출 실패: {e}")
+            # 댓글 목록 조회가 실패하면 현재 화면에 보이는 댓글 사용
+            if not post_data['comments']:
+                comment_elements = driver.find_elements(By.CSS_SELECTOR, "ul.fdb_lst_ul > li")
+                
+                for idx, comment in enumerate(comment_elements[:max_comments], 1):
+                    try:
+                        comment_text = comment.find_element(By.CSS_SELECTOR, "div.xe_content").text.strip()
+                        if comment_text and "비회원" not in comment_text:
+                            post_data['comments'].append(comment_text)
+                    except Exception as e:
+                        logger.debug(f"댓글 {idx} 추출 실패: {e}")
             
-            return {
-                "content": article_content,
-                "comments": comments
-            }
+            return post_data
             
         except Exception as e:
             logger.error(f"게시글 수집 실패: {e}")
-            return {"content": "", "comments": []}
+            return post_data
         finally:
-            driver.quit()
+            if driver is not None:
+                self.driver_pool.release(driver)
     
     def analyze_with_perplexity(self, title, content, comments):
         """Perplexity API로 제목과 댓글 분석"""
@@ -215,41 +289,87 @@ class TheqooWorkflow:
             return f"분석 중 오류 발생: {e}"
     
     def run_workflow(self, page_num=2, start_idx=5, end_idx=15):
-        """전체 워크플로우 실행"""
+        """
+        전체 워크플로우 실행
+        
+        Returns:
+            list | None: 새로 수집되었거나 변경된 문서 목록 (새 문서가 없으면 [], 수집/분류가 실패하면 None)
+        """
         logger.info("=== Theqoo 워크플로우 시작 ===")
+        self.pending_crawls = []
         
         # 1. 핫타이틀 수집
         titles = self.get_hot_titles(page_num, start_idx, end_idx)
         if not titles:
             logger.error("핫타이틀 수집 실패")
-            return []
+            return None
         
         logger.info(f"수집된 제목 수: {len(titles)}")
         
-        # 2. 정치 관련 여부 분류
-        classified_titles = self.classify_titles(titles)
-        if not classified_titles:
-            logger.error("제목 분류 실패")
-            return []
+        # 2. 정치 관련 여부 분류 (이미 분류한 게시글은 기록된 결과 재사용)
+        classified_titles, new_titles = [], []
+        for item in titles:
+            record = self.post_index.get(item['link']) if self.post_index else None
+            if record and record.get('is_issue') in ("Y", "N"):
+                classified_titles.append({**item, "is_issue": record['is_issue']})
+            else:
+                new_titles.append(item)
+        
+        if new_titles:
+            newly_classified = self.classify_titles(new_titles)
+            if not newly_classified:
+                logger.error("제목 분류 실패")
+                return None
+            
+            titles_by_link = {item['link']: item for item in new_titles}
+            for item in newly_classified:
+                item = {**titles_by_link.get(item.get('link'), {}), **item}
+                classified_titles.append(item)
+                if self.post_index and item.get('link'):
+                    self.post_index.record_classification(
+                        item['link'], item.get('title', ''), item.get('is_issue'), item.get('reply_count')
+                    )
+        
+        logger.info(f"분류 결과 재사용: {len(titles) - len(new_titles)}개, 새로 분류: {len(new_titles)}개")
         
         # 3. 정치가 아닌 이슈만 필터링
         issue_titles = [item for item in classified_titles if item.get("is_issue") == "Y"]
         logger.info(f"이슈로 분류된 제목 수: {len(issue_titles)}")
         
-        # 4. 각 이슈에 대해 상세 정보 수집
+        # 4. 새 게시글과 댓글 수가 바뀐 게시글만 동시에 수집
+        if self.post_index:
+            fetch_titles = []
+            for item in issue_titles:
+                if self.post_index.needs_fetch(item['link'], item.get('reply_count')):
+                    fetch_titles.append(item)
+                else:
+                    self.post_index.touch(item['link'])
+            logger.info(f"변경 없는 게시글 {len(issue_titles) - len(fetch_titles)}개 건너뜀")
+        else:
+            fetch_titles = issue_titles
+        
+        posts = self.get_posts_details([item['link'] for item in fetch_titles])
+        
+        # 5. 각 이슈에 대해 분석 및 문서 생성
         documents = []
+        failed_count = 0
         current_date = datetime.now().strftime("%Y-%m-%d")
         
-        for idx, item in enumerate(issue_titles, 1):
-            logger.info(f"처리 중: {idx}/{len(issue_titles)} - {item['title'][:30]}...")
+        for idx, (item, post_data) in enumerate(zip(fetch_titles, posts), 1):
+            logger.info(f"처리 중: {idx}/{len(fetch_titles)} - {item['title'][:30]}...")
+            
+            if not post_data:
+                logger.error(f"게시글 수집 실패: {item['link']}")
+                failed_count += 1
+                continue
+            
+            # 본문과 댓글이 이전 수집 때와 같으면 분석/저장 생략
+            if self.post_index and not self.post_index.is_changed(item['link'], post_data['content'], post_data['comments']):
+                logger.info(f"내용 변경 없음 - 건너뜀: {item['link']}")
+                self.post_index.touch(item['link'])
+                continue
             
             try:
-                # 작성일시 추출
-                post_datetime = self.get_post_datetime(item['link'])
-                
-                # 게시글 내용과 댓글 수집
-                post_data = self.get_post_content_and_comments(item['link'])
-                
                 # Perplexity 분석
                 analysis = self.analyze_with_perplexity(
                     item['title'], 
@@ -261,7 +381,7 @@ class TheqooWorkflow:
                 document = {
                     "title": item['title'],
                     "link": item['link'],
-                    "post_datetime": post_datetime,
+                    "post_datetime": post_data['post_datetime'],
                     "content": post_data['content'],
                     "comments": post_data['comments'],
                     "comments_count": len(post_data['comments']),
@@ -273,16 +393,42 @@ class TheqooWorkflow:
                 documents.append(document)
                 logger.info(f"문서 생성 완료: {document['id']}")
                 
-                # API 호출 간격 조절
-                time.sleep(2)
+                # 처리한 게시글은 저장이 끝난 뒤 commit_pending_crawls에서 기록 (분석 실패한 글은 다음에 다시 분석)
+                if is_analysis_failed(analysis):
+                    logger.warning(f"분석 실패 - 게시글 기록 생략: {item['link']}")
+                else:
+                    self.pending_crawls.append((
+                        item['link'], item['title'], post_data['content'],
+                        post_data['comments'], item.get('reply_count')
+                    ))
                 
             except Exception as e:
                 logger.error(f"문서 처리 실패: {e}")
+                failed_count += 1
                 continue
         
+        # 수집하려던 게시글이 모두 실패한 경우는 "새 문서 없음"이 아니라 실패
+        if failed_count and not documents:
+            logger.error(f"게시글 {failed_count}개 모두 수집/처리 실패")
+            return None
+        
         logger.info(f"=== 워크플로우 완료: {len(documents)}개 문서 생성 ===")
         return documents
     
+    def commit_pending_crawls(self):
+        """
+        run_workflow에서 수집한 게시글을 게시글 기록에 반영 (문서 저장이 성공한 뒤 호출)
+        저장 전에 기록하면 저장이 실패해도 다음 실행에서 변경 없음으로 건너뛰어 영영 저장되지 않음
+
+        Returns:
+            int: 기록한 게시글 수
+        """
+        pending, self.pending_crawls = self.pending_crawls, []
+        if self.post_index:
+            for link, title, content, comments, reply_count in pending:
+                self.post_index.record_crawl(link, title, content, comments, reply_count)
+        return len(pending)
+    
     def save_documents(self, documents, filename=None):
         """문서를 JSON 파일로 저장"""
         if not filename:
@@ -306,10 +452,15 @@ def main():
     # 워크플로우 실행
     documents = workflow.run_workflow(page_num=2, start_idx=5, end_idx=15)
     
-    if documents:
+    if documents is None:
+        print("문서 생성에 실패했습니다.")
+    elif not documents:
+        print("새로 수집되었거나 변경된 문서가 없습니다.")
+    else:
         # 문서 저장
         saved_file = workflow.save_documents(documents)
         if saved_file:
+            workflow.commit_pending_crawls()
             print(f"\n=== 완료 ===")
             print(f"생성된 문서 수: {len(documents)}")
             print(f"저장된 파일: {saved_file}")
@@ -321,8 +472,6 @@ def main():
                 print(f"제목: {sample['title']}")
                 print(f"댓글 수: {sample['comments_count']}")
                 print(f"분석 길이: {len(sample['analysis'])} 문자")
-    else:
-        print("문서 생성에 실패했습니다.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
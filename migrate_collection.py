@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+컬렉션 간 백필(backfill) 마이그레이션 스크립트
+원본 컬렉션의 포인트를 scroll로 페이지 단위로 읽어 페이로드/문서 저장소의 텍스트로 문서를 복원하고,
+대상 컬렉션의 임베딩 모델로 다시 임베딩해서 저장 (theqoo 재수집 없이 임베딩 모델 교체)
+여러 페이지를 동시에 처리하고, 끝난 위치(scroll offset)를 파일에 저장해 중단 후 이어서 실행 가능
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from dotenv import load_dotenv
+from document_store import DocumentStore
+from qdrant_common import documents_from_points, get_qdrant_client, iter_scroll
+
+# 환경변수 로드
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationState:
+    def __init__(self, path):
+        """
+        마이그레이션 진행 상태 파일 (다음에 읽을 scroll offset과 처리한 포인트 수)
+
+        Args:
+            path (str): JSON 상태 파일 경로
+        """
+        self.path = path
+        self.offset = None
+        self.migrated = 0
+        self.finished = False
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.offset = state.get('offset')
+            self.migrated = state.get('migrated', 0)
+            self.finished = state.get('finished', False)
+
+    def save(self, offset, migrated, finished=False):
+        """상태 저장 (임시 파일에 쓴 뒤 교체하여 중간에 끊겨도 파일이 깨지지 않음)"""
+        self.offset, self.migrated, self.finished = offset, migrated, finished
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'offset': offset,
+                'migrated': migrated,
+                'finished': finished,
+                'updated_at': datetime.now().isoformat(timespec="seconds")
+            }, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+
+def create_target_storage(embedding, collection_name, document_store_path):
+    """대상 컬렉션 스토리지 (embedding: "openai" 또는 "local"(MiniLM))"""
+    if embedding == "openai":
+        from openai_qdrant_storage import OpenAIQdrantStorage
+        return OpenAIQdrantStorage(collection_name=collection_name, document_store_path=document_store_path)
+    from qdrant_storage import QdrantStorage
+    return QdrantStorage(collection_name=collection_name, document_store_path=document_store_path)
+
+
+def migrate_page(storage, document_store, points, skip_unchanged=True):
+    """
+    한 페이지를 문서로 복원해서 대상 모델로 저장
+
+    Returns:
+        bool: 성공 여부 (청크 컬렉션에서 body 0번 청크가 없는 페이지는 복원할 문서가 없으므로 성공)
+    """
+    documents = documents_from_points(points, document_store)
+    if not documents:
+        return True
+    return storage.store_documents(documents, skip_unchanged=skip_unchanged)
+
+
+def migrate_collection(source, target, embedding="openai", page_size=256, workers=4,
+                       state_path=None, restart=False, skip_unchanged=True,
+                       document_store_path="document_store.db"):
+    """
+    원본 컬렉션의 문서를 대상 컬렉션 모델로 다시 임베딩하여 저장
+
+    Args:
+        source (str): 읽을 컬렉션
+        target (str): 저장할 컬렉션 (없으면 스토리지가 생성)
+        embedding (str): 대상 컬렉션 임베딩 ("openai" 또는 "local")
+        page_size (int): scroll 한 페이지의 포인트 수 (한 작업 단위)
+        workers (int): 동시에 임베딩/저장할 페이지 수
+        state_path (str): 진행 상태 파일 (None이면 migrate_<원본>_to_<대상>.json)
+        restart (bool): 저장된 진행 상태를 무시하고 처음부터 실행
+        skip_unchanged (bool): 대상에 같은 내용으로 이미 있는 문서는 임베딩 생략
+
+    Returns:
+        bool: 끝까지 성공했는지 여부
+    """
+    client = get_qdrant_client()
+    state = MigrationState(state_path or f"migrate_{source}_to_{target}.json")
+    if restart:
+        state.save(None, 0)
+    elif state.finished:
+        logger.info(f"이미 완료된 마이그레이션입니다 ({state.migrated}개). 다시 하려면 --restart")
+        return True
+
+    try:
+        storage = create_target_storage(embedding, target, document_store_path)
+        document_store = storage.document_store or DocumentStore(document_store_path)
+        total = client.count(source, exact=True).count
+    except Exception as e:
+        logger.error(f"마이그레이션 준비 실패: {e}")
+        return False
+
+    logger.info(
+        f"'{source}' -> '{target}' ({embedding}) 마이그레이션 시작: 전체 {total}개, "
+        f"{'처음부터' if state.offset is None else f'{state.migrated}개 이후부터'}"
+    )
+
+    started = time.monotonic()
+    migrated = resumed_from = state.migrated
+    checkpoint = state.offset
+    # (페이지 작업, 페이지 포인트 수, 다음 offset)을 읽은 순서대로 보관하고 앞에서부터 끝난 만큼만 진행 위치 저장
+    pending = []
+    failed = False
+
+    def advance(block):
+        """앞쪽부터 끝난 페이지를 반영해 진행 위치 저장 (block=True면 맨 앞 페이지가 끝날 때까지 대기)"""
+        nonlocal migrated, checkpoint, failed
+        while pending and (block or pending[0][0].done()):
+            future, count, next_offset = pending.pop(0)
+            try:
+                success = future.result()
+            except Exception as e:
+                logger.error(f"페이지 저장 실패: {e}")
+                success = False
+            if not success:
+                failed = True
+                return
+            migrated += count
+            checkpoint = next_offset
+            state.save(checkpoint, migrated)
+
+            elapsed = time.monotonic() - started
+            rate = (migrated - resumed_from) / elapsed if elapsed else 0
+            remaining = max(total - migrated, 0) / rate if rate else 0
+            logger.info(
+                f"진행: {migrated}/{total}개 ({migrated / max(total, 1):.1%}), "
+                f"{rate:.1f} points/sec, 남은 시간 약 {remaining / 60:.1f}분"
+            )
+            block = False
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for points, next_offset in iter_scroll(client, source, page_size=page_size, offset=checkpoint):
+            future = executor.submit(migrate_page, storage, document_store, points, skip_unchanged)
+            pending.append((future, len(points), next_offset))
+            advance(block=len(pending) >= workers * 2)
+            if failed:
+                break
+        while pending and not failed:
+            advance(block=True)
+        # 실패 후 남은 작업은 기다리기만 하고 진행 위치에는 반영하지 않음 (다음 실행에서 다시 처리)
+        for future, _, _ in pending:
+            future.cancel()
+
+    if failed:
+        logger.error(f"마이그레이션 중단: {migrated}개까지 저장됨. 다시 실행하면 이어서 진행합니다")
+        return False
+
+    state.save(None, migrated, finished=True)
+    logger.info(f"마이그레이션 완료: {migrated}개 ({time.monotonic() - started:.1f}초)")
+    return True
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='재수집 없이 다른 임베딩 모델 컬렉션으로 백필')
+    parser.add_argument('--source', default='theqoo_documents', help='읽을 컬렉션')
+    parser.add_argument('--target', default='theqoo_documents_openai', help='저장할 컬렉션')
+    parser.add_argument('--embedding', choices=['openai', 'local'], default='openai',
+                        help='대상 컬렉션 임베딩 (openai: text-embedding-3-small, local: MiniLM)')
+    parser.add_argument('--page-size', type=int, default=256, help='scroll 페이지 크기')
+    parser.add_argument('--workers', type=int, default=4, help='동시에 처리할 페이지 수')
+    parser.add_argument('--state-file', default=None, help='진행 상태 파일 경로')
+    parser.add_argument('--restart', action='store_true', help='저장된 진행 위치를 무시하고 처음부터')
+    parser.add_argument('--force', action='store_true', help='대상에 같은 내용이 있어도 다시 임베딩')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    success = migrate_collection(
+        args.source,
+        args.target,
+        embedding=args.embedding,
+        page_size=args.page_size,
+        workers=args.workers,
+        state_path=args.state_file,
+        restart=args.restart,
+        skip_unchanged=not args.force
+    )
+
+    if success:
+        print(f"\n✅ '{args.source}' -> '{args.target}' 마이그레이션 완료!")
+    else:
+        print("\n❌ 마이그레이션 실패! 같은 명령으로 다시 실행하면 이어서 진행합니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,22 +6,83 @@ OpenAI Embedding을 사용하는 Qdrant Storage
 import json
 import os
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import PointStruct
 from openai import OpenAI
 from dotenv import load_dotenv
+from comment_index import COMMENT_COLLECTION_SUFFIX, CommentIndex
+from document_chunker import chunk_payload, chunk_point_id, document_chunks, first_chunk_point_id
+from document_store import DocumentStore
+from embedding_cache import EmbeddingCache, query_vector_cache
+from qdrant_common import (
+    SEARCH_PAYLOAD_FIELDS, ChunkedUpserter, best_chunk_hits, best_hit_per_group, build_payload,
+    build_search_filter, collection_exists, collection_params, dedupe_documents, delete_document_chunks,
+    dense_vector, dense_vector_params, ensure_payload_indexes, fetch_full_documents, filter_unchanged_documents,
+    get_qdrant_client, grouped_search, has_chunk_points, has_sparse_vectors, hybrid_search, iter_batches,
+    parse_qdrant_url, point_id_for_document, point_vector, quantized_search_params, search_text
+)
+from sparse_encoder import SparseTextEncoder
+from vector_index import VectorIndex
 
 # 환경변수 로드
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+
+# text-embedding-3-small 기본 출력 차원 (dimensions로 더 작게 줄일 수 있음)
+EMBEDDING_MODEL = "text-embedding-3-small"
+FULL_EMBEDDING_DIMENSIONS = 1536
+# 입력 하나당 최대 토큰 수 (넘으면 그 입력이 든 묶음 요청 전체가 실패)
+MAX_TOKENS_PER_INPUT = 8191
+
+
+def estimate_tokens(text):
+    """tiktoken 없이 토큰 수를 넉넉하게 추정 (한글은 UTF-8 3바이트가 대략 1~2토큰)"""
+    return len(text.encode("utf-8")) // 2 + 1
+
+
+def truncate_for_embedding(text, max_tokens=MAX_TOKENS_PER_INPUT):
+    """
+    입력 하나가 토큰 한도를 넘지 않도록 자름
+    토큰은 최소 1바이트라 UTF-8 바이트 수가 토큰 수의 상한이므로 max_tokens 바이트까지만 남김 (글자 중간은 버림)
+    """
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_tokens:
+        return text
+    return encoded[:max_tokens].decode("utf-8", errors="ignore")
+
+
+class RateLimiter:
+    def __init__(self, max_requests_per_minute=500):
+        """여러 스레드가 함께 쓰는 분당 요청 수 제한기"""
+        self.interval = 60.0 / max_requests_per_minute if max_requests_per_minute else 0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+    
+    def wait(self):
+        """다음 요청 가능 시각까지 대기"""
+        with self._lock:
+            now = time.monotonic()
+            wait_time = max(0.0, self._next_time - now)
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait_time:
+            time.sleep(wait_time)
+
 class OpenAIQdrantStorage:
-    def __init__(self, collection_name="theqoo_documents_openai", host=None, port=6333):
+    def __init__(self, collection_name="theqoo_documents_openai", host=None, port=6333,
+                 max_inputs_per_request=256, max_tokens_per_request=100000,
+                 max_tokens_per_input=MAX_TOKENS_PER_INPUT, embedding_concurrency=4, max_requests_per_minute=500,
+                 embedding_cache_path="embedding_cache.db", prefer_grpc=None,
+                 quantization=None, on_disk_vectors=False, hnsw_m=None, hnsw_ef_construct=None,
+                 rescore_oversampling=2.0, search_hnsw_ef=None,
+                 embedding_dimensions=FULL_EMBEDDING_DIMENSIONS, document_store_path="document_store.db",
+                 hybrid=True, location=None, vector_index_path=None, chunked=False,
+                 index_comments=False):
         # 환경변수에서 Qdrant 설정 가져오기
-        self.qdrant_url = os.getenv("QDRANT_URL")
-        self.qdrant_key = os.getenv("QDRANT_KEY")
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         
         if not self.openai_api_key:
@@ -30,55 +91,132 @@ class OpenAIQdrantStorage:
         # OpenAI 클라이언트 설정 (새로운 API)
         self.openai_client = OpenAI(api_key=self.openai_api_key)
         
-        # URL에서 호스트와 포트 추출
-        if self.qdrant_url:
-            if self.qdrant_url.startswith("http://"):
-                host = self.qdrant_url[7:]  # "http://" 제거
-            elif self.qdrant_url.startswith("https://"):
-                host = self.qdrant_url[8:]  # "https://" 제거
-            else:
-                host = self.qdrant_url
-            
-            # 포트가 URL에 포함되어 있으면 추출
-            if ":" in host:
-                host, port_str = host.split(":", 1)
-                port = int(port_str)
+        # 임베딩 출력 차원 (256, 512 등으로 줄이면 저장/검색/업로드 비용 감소, 컬렉션 크기도 이 값을 따름)
+        self.embedding_model = EMBEDDING_MODEL
+        self.embedding_dimensions = embedding_dimensions
+        if embedding_dimensions == FULL_EMBEDDING_DIMENSIONS:
+            self.embedding_cache_key = EMBEDDING_MODEL
         else:
-            host = host or "localhost"
+            self.embedding_cache_key = f"{EMBEDDING_MODEL}:{embedding_dimensions}"
+        
+        # 임베딩 묶음 요청 설정 (요청당 입력 수/토큰 수 한도, 동시 요청 수, 분당 요청 수)
+        self.max_inputs_per_request = max_inputs_per_request
+        self.max_tokens_per_request = max_tokens_per_request
+        self.max_tokens_per_input = max_tokens_per_input
+        self.embedding_concurrency = embedding_concurrency
+        self.rate_limiter = RateLimiter(max_requests_per_minute)
+        
+        # 임베딩 디스크 캐시 (None이면 사용 안 함)
+        self.embedding_cache = EmbeddingCache(embedding_cache_path) if embedding_cache_path else None
+        self.query_cache = query_vector_cache
+        
+        # 본문/댓글 전문 저장소 (None이면 예전처럼 전문을 페이로드에 저장)
+        self.document_store = DocumentStore(document_store_path) if document_store_path else None
+        
+        # dense + BM25 희소 벡터 하이브리드 검색 (희소 벡터가 없는 기존 컬렉션이면 dense만 사용)
+        self.hybrid = hybrid
+        self.sparse_encoder = SparseTextEncoder()
+        
+        # 게시글을 겹치는 청크 여러 개로 저장하고 게시글 단위로 묶어 검색 (청크로 저장된 컬렉션이면 자동으로 켜짐)
+        self.chunked = chunked
+        
+        # URL에서 호스트와 포트 추출
+        host, port = parse_qdrant_url(os.getenv("QDRANT_URL"), host, port)
         
         self.collection_name = collection_name
         self.host = host
         self.port = port
         
-        # Qdrant 클라이언트 초기화
-        if self.qdrant_key:
-            self.client = QdrantClient(host=host, port=port, api_key=self.qdrant_key)
-        else:
-            self.client = QdrantClient(host=host, port=port)
+        # 새 컬렉션 생성 설정 (quantization: None/"scalar"/"binary", 원본 벡터 디스크 저장, HNSW 파라미터)
+        self.quantization = quantization
+        self.on_disk_vectors = on_disk_vectors
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        
+        # 양자화 검색 설정 (후보를 oversampling배 뽑아 원본 벡터로 재채점)
+        self.rescore_oversampling = rescore_oversampling
+        self.search_hnsw_ef = search_hnsw_ef
+        
+        # Qdrant 클라이언트 초기화 (같은 설정이면 연결 재사용, prefer_grpc면 gRPC 사용)
+        # location(경로 또는 ":memory:")을 주면 서버 없이 로컬 모드로 동작
+        self.location = location
+        self.client = get_qdrant_client(host, port, prefer_grpc=prefer_grpc, location=location)
         
-        # 컬렉션이 없으면 생성 (text-embedding-3-small은 1536차원)
+        # 컬렉션이 없으면 생성 (벡터 크기는 embedding_dimensions)
         self._create_collection_if_not_exists()
+        
+        # Qdrant 대신 검색할 NumPy 정확 검색 인덱스
+        # 다른 프로세스(스케줄러 등)의 저장은 반영되지 않으므로 포인트 수가 컬렉션과 다르면 다시 가져옴
+        self.vector_index = VectorIndex(vector_index_path) if vector_index_path else None
+        if self.vector_index is not None:
+            self.vector_index.sync_collection(self.client, self.collection_name)
+        
+        # 댓글 하나당 포인트 하나로 저장하는 댓글 컬렉션 (<컬렉션>_comments, 게시글 ID로 묶어 검색)
+        self.comment_index = None
+        if index_comments:
+            self.comment_index = CommentIndex(
+                self.client, f"{collection_name}{COMMENT_COLLECTION_SUFFIX}",
+                embed_texts=self._embed_texts, vector_size=self.embedding_dimensions
+            )
     
     def _create_collection_if_not_exists(self):
         """컬렉션이 없으면 생성"""
         try:
-            collections = self.client.get_collections()
-            collection_names = [col.name for col in collections.collections]
-            
-            if self.collection_name not in collection_names:
+            # 재색인 후 읽기용 별칭도 있는 컬렉션으로 취급 (get_collections에는 별칭이 나오지 않음)
+            if not collection_exists(self.client, self.collection_name):
                 self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(size=1536, distance=Distance.COSINE)  # text-embedding-3-small 차원
+                    **collection_params(
+                        self.embedding_dimensions,
+                        quantization=self.quantization,
+                        on_disk=self.on_disk_vectors,
+                        hnsw_m=self.hnsw_m,
+                        hnsw_ef_construct=self.hnsw_ef_construct,
+                        sparse=self.hybrid
+                    )
+                )
+                logger.info(
+                    f"컬렉션 '{self.collection_name}' 생성됨 ({EMBEDDING_MODEL}, {self.embedding_dimensions}차원, "
+                    f"양자화: {self.quantization or '없음'}, 원본 디스크 저장: {self.on_disk_vectors}, "
+                    f"하이브리드 검색: {self.hybrid})"
                 )
-                logger.info(f"컬렉션 '{self.collection_name}' 생성됨 (text-embedding-3-small)")
             else:
                 logger.info(f"컬렉션 '{self.collection_name}' 이미 존재함")
                 
+                # 기존 컬렉션의 벡터 크기가 설정한 차원과 다르면 이후 저장/검색이 모두 실패하므로 바로 중단
+                collection_info = self.client.get_collection(self.collection_name)
+                collection_config = collection_info.config
+                vector_size = getattr(dense_vector_params(collection_info), "size", None)
+                if vector_size and vector_size != self.embedding_dimensions:
+                    raise ValueError(
+                        f"컬렉션 '{self.collection_name}' 벡터 크기({vector_size})가 "
+                        f"임베딩 차원({self.embedding_dimensions})과 다릅니다"
+                    )
+                
+                # 기존 컬렉션이 양자화되어 있으면 검색 시 재채점 사용
+                quantization_config = collection_config.quantization_config
+                if self.quantization is None and quantization_config is not None:
+                    self.quantization = "binary" if getattr(quantization_config, "binary", None) else "scalar"
+                
+                if self.hybrid and not has_sparse_vectors(collection_info):
+                    logger.info("희소 벡터 설정이 없는 컬렉션이라 dense 검색만 사용합니다")
+                    self.hybrid = False
+            
+            # 날짜/링크 필터를 서버에서 처리하도록 페이로드 인덱스 생성
+            ensure_payload_indexes(self.client, self.collection_name)
+            
+            # parent_id 인덱스를 만든 뒤 청크 포인트가 실제로 있을 때만 청크 모드로 전환
+            if not self.chunked and has_chunk_points(self.client, self.collection_name):
+                logger.info("청크로 저장된 컬렉션이라 청크 단위로 저장/검색합니다")
+                self.chunked = True
+                
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"컬렉션 생성/확인 실패: {e}")
     
-    def _create_document_vector_openai(self, document):
-        """OpenAI 임베딩을 사용하여 문서를 벡터로 변환"""
+    def _document_text(self, document):
+        """벡터화할 문서 텍스트 생성"""
         # 제목을 기본으로 사용
         text_for_vector = document['title']
         
@@ -104,119 +242,272 @@ class OpenAIQdrantStorage:
         if len(text_for_vector.strip()) < 10:
             text_for_vector = f"theqoo 게시판: {text_for_vector}"
         
-        logger.info(f"임베딩 생성 텍스트 길이: {len(text_for_vector)}자")
-        logger.info(f"임베딩 생성 텍스트 미리보기: {text_for_vector[:100]}...")
+        return text_for_vector
+    
+    def _pack_embedding_batches(self, texts):
+        """
+        요청당 입력 수/토큰 수 한도를 넘지 않도록 (인덱스, 텍스트) 묶음 생성
+        긴 게시글 하나 때문에 묶음 전체가 실패하지 않도록 각 입력은 입력당 토큰 한도로 먼저 자름
+        """
+        batches = []
+        current, current_tokens = [], 0
         
+        for idx, text in enumerate(texts):
+            text = truncate_for_embedding(text, self.max_tokens_per_input)
+            tokens = estimate_tokens(text)
+            if current and (len(current) >= self.max_inputs_per_request
+                            or current_tokens + tokens > self.max_tokens_per_request):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append((idx, text))
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _embedding_kwargs(self):
+        """embeddings.create 모델/차원 인자 (기본 차원이면 dimensions 생략)"""
+        kwargs = {"model": self.embedding_model}
+        if self.embedding_dimensions != FULL_EMBEDDING_DIMENSIONS:
+            kwargs["dimensions"] = self.embedding_dimensions
+        return kwargs
+    
+    def _embed_batch(self, batch):
+        """한 번의 embeddings 요청으로 여러 텍스트 임베딩 (실패 시 모두 None)"""
+        self.rate_limiter.wait()
         try:
-            # OpenAI 임베딩 생성 (text-embedding-3-small 사용)
             response = self.openai_client.embeddings.create(
-                input=text_for_vector,
-                model="text-embedding-3-small"
+                input=[text for _, text in batch],
+                **self._embedding_kwargs()
             )
-            vector = response.data[0].embedding
+        except Exception as e:
+            logger.error(f"OpenAI 임베딩 요청 실패 ({len(batch)}개 입력): {e}")
+            return [(idx, None) for idx, _ in batch]
+        
+        # 응답의 index로 원래 문서 위치에 매핑
+        results = []
+        for item in response.data:
+            idx = batch[item.index][0]
+            vector = item.embedding
             
             # 벡터 검증
-            if not vector or len(vector) != 1536:
-                logger.error(f"벡터 생성 실패: 길이={len(vector) if vector else 0}, 예상=1536")
-                raise ValueError("벡터 길이가 올바르지 않습니다")
-            
-            # 벡터가 모두 0인지 확인
-            if all(v == 0.0 for v in vector):
+            if not vector or len(vector) != self.embedding_dimensions:
+                logger.error(f"벡터 생성 실패: 길이={len(vector) if vector else 0}, 예상={self.embedding_dimensions}")
+                vector = None
+            elif all(v == 0.0 for v in vector):
                 logger.error("생성된 벡터가 모두 0입니다")
-                raise ValueError("벡터가 모두 0입니다")
+                vector = None
             
-            logger.info(f"벡터 생성 성공: 길이={len(vector)}, 첫 번째 값={vector[0]}")
-            return vector
+            results.append((idx, vector))
+        return results
+    
+    def _embed_texts(self, texts):
+        """여러 텍스트를 묶음 요청으로 동시에 임베딩 (입력 순서대로, 실패한 항목은 None)"""
+        vectors = [None] * len(texts)
+        
+        # 캐시에 있는 벡터는 재사용
+        if self.embedding_cache:
+            for idx, vector in self.embedding_cache.get_many(self.embedding_cache_key, texts).items():
+                vectors[idx] = vector.tolist()
+        
+        missing = [idx for idx in range(len(texts)) if vectors[idx] is None]
+        if not missing:
+            return vectors
+        
+        batches = self._pack_embedding_batches([texts[idx] for idx in missing])
+        logger.info(f"임베딩 요청 {len(batches)}회로 {len(missing)}개 텍스트 처리 (캐시 적중 {len(texts) - len(missing)}개)")
+        
+        with ThreadPoolExecutor(max_workers=self.embedding_concurrency) as executor:
+            for results in executor.map(self._embed_batch, batches):
+                for batch_idx, vector in results:
+                    vectors[missing[batch_idx]] = vector
+        
+        if self.embedding_cache:
+            self.embedding_cache.put_many(
+                self.embedding_cache_key,
+                [texts[idx] for idx in missing],
+                [vectors[idx] for idx in missing]
+            )
+        
+        return vectors
+    
+    def _create_document_vector_openai(self, document):
+        """OpenAI 임베딩을 사용하여 문서를 벡터로 변환"""
+        text_for_vector = self._document_text(document)
+        
+        logger.info(f"임베딩 생성 텍스트 길이: {len(text_for_vector)}자")
+        logger.info(f"임베딩 생성 텍스트 미리보기: {text_for_vector[:100]}...")
+        
+        # 실패 시 None 반환 (0 벡터 대신)
+        return self._embed_texts([text_for_vector])[0]
+    
+    def _sparse_document_vector(self, doc):
+        """키워드 검색용 BM25 희소 벡터 (하이브리드가 꺼져 있으면 None)"""
+        return self.sparse_encoder.encode_document(search_text(doc)) if self.hybrid else None
+    
+    def _build_payload(self, doc):
+        """문서 메타데이터 준비 (문서 저장소가 있으면 짧은 페이로드)"""
+        payload = build_payload(doc, lean=self.document_store is not None)
+        payload["embedding_model"] = self.embedding_model
+        payload["embedding_dimensions"] = self.embedding_dimensions
+        return payload
+    
+    def _chunk_points(self, docs):
+        """
+        게시글들을 청크 포인트로 변환 (모든 게시글의 청크를 묶음 요청으로 한 번에 임베딩)
+        
+        Returns:
+            tuple: (포인트 목록, 포인트를 만든 게시글 목록) - 청크 하나라도 임베딩에 실패한 게시글은 제외
+        """
+        doc_chunks = [(doc, document_chunks(doc)) for doc in docs]
+        vectors = iter(self._embed_texts([chunk["text"] for _, chunks in doc_chunks for chunk in chunks]))
+        
+        points, point_docs = [], []
+        for doc, chunks in doc_chunks:
+            chunk_vectors = [next(vectors) for _ in chunks]
+            if any(vector is None for vector in chunk_vectors):
+                continue
             
-        except Exception as e:
-            logger.error(f"OpenAI 임베딩 생성 실패: {e}")
-            logger.error(f"실패한 텍스트: {text_for_vector[:200]}...")
-            # 실패 시 None 반환 (0 벡터 대신)
-            return None
+            parent_id = point_id_for_document(doc)
+            payload = self._build_payload(doc)
+            for chunk, vector in zip(chunks, chunk_vectors):
+                sparse_vector = self.sparse_encoder.encode_document(chunk["text"]) if self.hybrid else None
+                points.append(PointStruct(
+                    id=chunk_point_id(parent_id, chunk["kind"], chunk["index"]),
+                    vector=point_vector(vector, sparse_vector),
+                    payload=chunk_payload(payload, parent_id, chunk)
+                ))
+            point_docs.append(doc)
+        return points, point_docs
     
-    def store_documents(self, documents):
-        """문서들을 Qdrant에 저장"""
-        if not documents:
-            logger.warning("저장할 문서가 없습니다.")
-            return False
+    def _remove_stale_chunks(self, docs, points):
+        """
+        새 청크를 올린 뒤 게시글의 더 이상 없는 청크만 삭제 (Qdrant와 NumPy 인덱스 모두)
+        새 청크 ID는 남기므로 다시 저장하는 동안에도 게시글이 검색에서 빠지지 않음
+        """
+        parent_ids = [point_id_for_document(doc) for doc in docs]
+        keep_ids = [point.id for point in points]
+        delete_document_chunks(self.client, self.collection_name, parent_ids, keep_ids=keep_ids)
+        if self.vector_index is not None:
+            keep = {str(point_id) for point_id in keep_ids}
+            self.vector_index.delete(
+                point_id for point_id in self.vector_index.point_ids_for_parents(parent_ids) if point_id not in keep
+            )
+    
+    def store_documents(self, documents, skip_unchanged=True, chunk_size=1024,
+                        upsert_chunk_size=256, upsert_parallel=4):
+        """
+        문서들을 Qdrant에 저장
         
-        logger.info(f"총 {len(documents)}개 문서 저장 시작")
+        Args:
+            documents: 문서 리스트 또는 문서를 하나씩 내주는 이터레이터
+            skip_unchanged (bool): 내용이 같은 문서는 임베딩/저장 생략
+            chunk_size (int): 한 번에 임베딩할 문서 수 (메모리 사용량 상한)
+            upsert_chunk_size (int): 업서트 요청 한 번에 보낼 포인트 수
+            upsert_parallel (int): 동시에 보낼 업서트 요청 수
+        """
+        total_count = 0
+        success_count = 0
+        error_count = 0
         
         try:
-            points = []
-            success_count = 0
-            error_count = 0
+            # 업서트는 백그라운드에서 묶음 단위로 병렬 전송 (임베딩과 겹쳐서 진행)
+            upserter = ChunkedUpserter(
+                self.client, self.collection_name,
+                chunk_size=upsert_chunk_size, parallel=upsert_parallel
+            )
             
-            for i, doc in enumerate(documents, 1):
-                try:
-                    logger.info(f"문서 {i}/{len(documents)} 처리 중: {doc.get('title', '제목 없음')[:50]}...")
-                    
-                    # OpenAI 임베딩으로 벡터 생성
-                    vector = self._create_document_vector_openai(doc)
-                    
-                    # 벡터 생성 실패 확인
-                    if vector is None:
-                        logger.warning(f"문서 {i}의 벡터 생성 실패")
-                        error_count += 1
-                        continue
-                    
-                    # 벡터가 0으로만 채워져 있는지 확인
-                    if all(v == 0.0 for v in vector):
-                        logger.warning(f"문서 {i}의 벡터가 0으로만 채워져 있음 - 임베딩 생성 실패")
-                        error_count += 1
-                        continue
-                    
-                    # 메타데이터 준비
-                    payload = {
-                        "title": doc['title'],
-                        "link": doc['link'],
-                        "post_datetime": doc.get('post_datetime', ''),
-                        "content": doc.get('content', ''),
-                        "comments": doc.get('comments', []),
-                        "comments_count": doc.get('comments_count', 0),
-                        "analysis": doc.get('analysis', ''),
-                        "collected_date": doc.get('collected_date', ''),
-                        "id": doc.get('id', f"doc_{hash(doc['title'])}"),
-                        "text_for_search": f"{doc['title']} {doc.get('content', '')} {doc.get('analysis', '')}",
-                        "embedding_model": "text-embedding-3-small"
-                    }
-                    
-                    # 벡터 최종 검증
-                    if len(vector) != 1536:
-                        logger.error(f"문서 {i}의 벡터 길이가 잘못됨: {len(vector)} (예상: 1536)")
-                        error_count += 1
-                        continue
-                    
-                    # Point 생성
-                    doc_id = doc.get('id', f"doc_{hash(doc['title'])}")
-                    point = PointStruct(
-                        id=hash(doc_id) % (2**63),  # 64비트 정수로 변환
-                        vector=vector,
-                        payload=payload
+            for chunk in iter_batches(documents, chunk_size):
+                total_count += len(chunk)
+                
+                # 같은 게시글은 하나만 남기고, 이미 같은 내용으로 저장된 문서는 건너뜀
+                chunk = dedupe_documents(chunk)
+                if skip_unchanged:
+                    # 청크 모드는 게시글마다 항상 있는 body 0번 청크의 doc_hash로 비교
+                    chunk = filter_unchanged_documents(
+                        self.client, self.collection_name, chunk,
+                        id_for_document=first_chunk_point_id if self.chunked else None,
+                        document_store=self.document_store
                     )
-                    points.append(point)
-                    success_count += 1
-                    logger.info(f"문서 {i} 포인트 생성 완료: 벡터 길이={len(vector)}")
+                if not chunk:
+                    continue
+                
+                logger.info(f"문서 {len(chunk)}개 임베딩 시작 (누적 입력 {total_count}개)")
+                
+                if self.chunked:
+                    points, point_docs = self._chunk_points(chunk)
+                    error_count += len(chunk) - len(point_docs)
+                else:
+                    # OpenAI 임베딩을 묶음 요청으로 생성
+                    vectors = self._embed_texts([self._document_text(doc) for doc in chunk])
                     
-                except Exception as doc_error:
-                    logger.error(f"문서 {i} 처리 실패: {doc_error}")
-                    error_count += 1
+                    points, point_docs = [], []
+                    for doc, vector in zip(chunk, vectors):
+                        # 벡터 생성 실패 확인
+                        if vector is None:
+                            logger.warning(f"문서 벡터 생성 실패: {doc.get('title', '제목 없음')[:50]}")
+                            error_count += 1
+                            continue
+                        
+                        # Point 생성 (게시글 URL 기반 UUID라 재저장 시 같은 포인트를 덮어씀)
+                        points.append(PointStruct(
+                            id=point_id_for_document(doc),
+                            vector=point_vector(vector, self._sparse_document_vector(doc)),
+                            payload=self._build_payload(doc)
+                        ))
+                        point_docs.append(doc)
+                
+                if not points:
                     continue
+                
+                # 댓글 포인트를 먼저 저장 (실패하면 게시글 포인트도 쓰지 않아 doc_hash가 남지 않고 다음에 재시도)
+                if self.comment_index is not None and self.comment_index.store_documents(point_docs) < 0:
+                    logger.error(f"댓글 저장 실패로 문서 {len(point_docs)}개 저장 생략")
+                    error_count += len(point_docs)
+                    continue
+                
+                # 본문/댓글 전문은 게시글 포인트 ID로 문서 저장소에 보관 (페이로드에는 미리보기만)
+                if self.document_store:
+                    self.document_store.put_many((point_id_for_document(doc), doc) for doc in point_docs)
+                
+                # 벡터 저장
+                logger.info(f"Qdrant에 {len(points)}개 포인트 저장 중...")
+                upserter.add(points)
+                if self.vector_index is not None:
+                    self.vector_index.upsert((point.id, dense_vector(point.vector), point.payload) for point in points)
+                if self.chunked:
+                    # 수정되어 청크 수가 줄어든 글의 남는 청크 정리 (임베딩/업서트 요청 뒤에 실행)
+                    self._remove_stale_chunks(point_docs, points)
+                success_count += len(point_docs)
+            
+            # 남은 업서트 완료 대기 (마지막 묶음은 wait=True로 일관성 확보)
+            upsert_result = upserter.finish()
             
             logger.info(f"벡터 생성 완료: 성공 {success_count}개, 실패 {error_count}개")
+            if self.embedding_cache:
+                stats = self.embedding_cache.stats()
+                logger.info(f"임베딩 캐시 적중률: {stats['hit_rate']:.1%} (적중 {stats['hits']}, 미스 {stats['misses']})")
             
-            if not points:
-                logger.error("저장할 포인트가 없습니다.")
+            if total_count == 0:
+                logger.warning("저장할 문서가 없습니다.")
                 return False
             
-            # 벡터 저장
-            logger.info(f"Qdrant에 {len(points)}개 포인트 저장 중...")
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points
-            )
+            if success_count == 0:
+                if error_count:
+                    logger.error("저장할 포인트가 없습니다.")
+                    return False
+                logger.info("새로 저장할 문서가 없습니다 (모두 변경 없음).")
+                return True
+            
+            if upsert_result['failed']:
+                logger.error(f"Qdrant 저장 일부 실패: {upsert_result['failed']}개")
+                return False
             
-            logger.info(f"{len(points)}개 문서를 text-embedding-3-small으로 Qdrant에 저장 완료")
+            logger.info(
+                f"{success_count}개 문서를 text-embedding-3-small으로 Qdrant에 저장 완료 "
+                f"({upsert_result['points_per_sec']:.1f} points/sec)"
+            )
             
             # 저장 후 검증
             logger.info("저장 후 벡터 검증 중...")
@@ -231,10 +522,11 @@ class OpenAIQdrantStorage:
                 
                 if test_points and len(test_points[0]) > 0:
                     for i, point in enumerate(test_points[0]):
-                        if point.vector is None:
+                        vector = dense_vector(point.vector)
+                        if vector is None:
                             logger.error(f"저장된 포인트 {i}의 벡터가 None입니다!")
                         else:
-                            logger.info(f"저장된 포인트 {i}의 벡터 길이: {len(point.vector)}")
+                            logger.info(f"저장된 포인트 {i}의 벡터 길이: {len(vector)}")
                 else:
                     logger.warning("저장 후 포인트 조회 실패")
                     
@@ -247,20 +539,80 @@ class OpenAIQdrantStorage:
             logger.error(f"Qdrant 저장 실패: {e}")
             return False
     
-    def search_similar_documents(self, query, limit=5):
-        """OpenAI 임베딩을 사용하여 유사한 문서 검색"""
+    def _embed_query(self, query):
+        """검색 쿼리 임베딩"""
+        response = self.openai_client.embeddings.create(
+            input=query,
+            **self._embedding_kwargs()
+        )
+        return response.data[0].embedding
+    
+    @property
+    def score_label(self):
+        """검색 결과 점수 이름 (하이브리드 검색은 RRF 순위 점수라 코사인 유사도가 아님)"""
+        return "순위 점수" if self.hybrid and self.vector_index is None else "유사도 점수"
+    
+    def search_similar_documents(self, query, limit=5, date_from=None, date_to=None, links=None,
+                                 date_field="post_timestamp", with_payload=SEARCH_PAYLOAD_FIELDS):
+        """
+        OpenAI 임베딩을 사용하여 유사한 문서 검색
+        
+        Args:
+            date_from, date_to: 작성일시(또는 date_field) 범위, 양 끝 포함
+            links (str | list): 이 링크의 게시글만 검색
+            with_payload: 가져올 페이로드 필드 (전문은 get_full_documents로 따로 조회, True면 전체)
+        """
         try:
-            # 쿼리를 OpenAI 임베딩으로 변환
-            response = self.openai_client.embeddings.create(
-                input=query,
-                model="text-embedding-3-small"
+            # 쿼리를 OpenAI 임베딩으로 변환 (같은 질문은 공유 캐시에서 재사용)
+            query_vector = self.query_cache.get_or_compute(
+                self.embedding_cache_key, query, self._embed_query
+            )
+            
+            # NumPy 인덱스가 있으면 Qdrant 대신 정확 검색 (dense만, 같은 날짜/링크 조건)
+            if self.vector_index is not None:
+                if self.chunked:
+                    # 한 게시글의 청크가 여러 개 나올 수 있어 넉넉히 뽑은 뒤 게시글마다 하나만 남김
+                    hits = self.vector_index.search(
+                        query_vector, limit * 8, date_from=date_from, date_to=date_to, links=links,
+                        date_field=date_field, with_payload=with_payload
+                    )
+                    return best_chunk_hits(hits, limit)
+                return self.vector_index.search(
+                    query_vector, limit, date_from=date_from, date_to=date_to, links=links,
+                    date_field=date_field, with_payload=with_payload
+                )
+            
+            query_filter = build_search_filter(date_from, date_to, links, date_field=date_field)
+            search_params = quantized_search_params(
+                self.quantization, self.rescore_oversampling, self.search_hnsw_ef
             )
-            query_vector = response.data[0].embedding
             
-            # 유사도 검색
+            # 청크 모드: 게시글(parent_id)마다 가장 잘 맞는 청크 하나씩 (하이브리드면 RRF로 합친 뒤 묶음)
+            if self.chunked:
+                groups = grouped_search(
+                    self.client, self.collection_name, query_vector,
+                    self.sparse_encoder.encode_query(query) if self.hybrid else None,
+                    limit=limit, query_filter=query_filter, search_params=search_params,
+                    with_payload=with_payload
+                )
+                return best_hit_per_group(groups)
+            
+            # 하이브리드: dense + 키워드 검색 결과를 서버에서 RRF로 합침
+            if self.hybrid:
+                return hybrid_search(
+                    self.client, self.collection_name, query_vector,
+                    self.sparse_encoder.encode_query(query),
+                    limit=limit, query_filter=query_filter, search_params=search_params,
+                    with_payload=with_payload
+                )
+            
+            # 유사도 검색 (날짜/링크 조건은 Qdrant에서 인덱스로 필터링)
             search_result = self.client.search(
                 collection_name=self.collection_name,
                 query_vector=query_vector,
+                query_filter=query_filter,
+                search_params=search_params,
+                with_payload=with_payload,
                 limit=limit
             )
             
@@ -270,6 +622,33 @@ class OpenAIQdrantStorage:
             logger.error(f"검색 실패: {e}")
             return []
     
+    def search_comments(self, query, limit=5, comments_per_post=3, date_from=None, date_to=None, links=None,
+                        date_field="post_timestamp"):
+        """
+        댓글 컬렉션에서 게시글마다 질문과 맞는 댓글 검색 (index_comments=True일 때만)
+        
+        Returns:
+            list: PointGroup 목록 (group.id = 게시글 포인트 ID, group.hits = 점수 순 댓글)
+        """
+        if self.comment_index is None:
+            return []
+        
+        try:
+            # 게시글 검색과 같은 임베딩이라 쿼리 벡터는 공유 캐시에서 재사용
+            query_vector = self.query_cache.get_or_compute(
+                self.embedding_cache_key, query, self._embed_query
+            )
+        except Exception as e:
+            logger.error(f"댓글 검색 실패: {e}")
+            return []
+        
+        query_filter = build_search_filter(date_from, date_to, links, date_field=date_field)
+        return self.comment_index.search(query_vector, limit, comments_per_post, query_filter=query_filter)
+    
+    def get_full_documents(self, point_ids):
+        """화면에 보여줄 문서의 본문/댓글/분석 전문 조회 ({포인트 ID: 문서})"""
+        return fetch_full_documents(self.client, self.collection_name, self.document_store, point_ids)
+    
     def get_collection_info(self):
         """컬렉션 정보 조회"""
         try:
@@ -315,7 +694,7 @@ def main():
         # 컬렉션 정보 출력
         info = storage.get_collection_info()
         if info:
-            print(f"컬렉션 벡터 수: {info.vectors_count}")
+            print(f"컬렉션 포인트 수: {info.points_count}")
         
         # 검색 테스트
         print("\n=== text-embedding-3-small 검색 테스트 ===")
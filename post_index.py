@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+이미 처리한 게시글을 기록하는 SQLite 인덱스
+일일 수집 시 새 게시글이나 변경된 게시글만 다시 수집/분석하도록 사용
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+POST_ID_PATTERN = re.compile(r"/(\d+)(?:[/?#]|$)")
+
+
+def post_id_from_link(link):
+    """게시글 링크에서 글 번호(document_srl) 추출 (없으면 링크 그대로 사용)"""
+    match = POST_ID_PATTERN.search(link or "")
+    return match.group(1) if match else link
+
+
+def content_hash(content, comments):
+    """본문과 댓글로 변경 여부 판단용 해시 생성"""
+    digest = hashlib.sha256()
+    digest.update((content or "").encode("utf-8"))
+    for comment in comments or []:
+        digest.update(b"\x00")
+        digest.update(comment.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PostIndex:
+    def __init__(self, db_path="theqoo_post_index.db"):
+        """
+        Args:
+            db_path (str): SQLite 파일 경로 (":memory:"이면 메모리에만 저장)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._create_table_if_not_exists()
+
+    def _create_table_if_not_exists(self):
+        """테이블이 없으면 생성"""
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS posts (
+                    post_id TEXT PRIMARY KEY,
+                    link TEXT,
+                    title TEXT,
+                    is_issue TEXT,
+                    reply_count INTEGER,
+                    comments_count INTEGER,
+                    content_hash TEXT,
+                    first_seen_at TEXT,
+                    last_crawled_at TEXT
+                )
+            """)
+
+    def get(self, link):
+        """게시글 기록 조회 (없으면 None)"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM posts WHERE post_id = ?", (post_id_from_link(link),)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def needs_fetch(self, link, reply_count=None):
+        """목록에서 본 댓글 수로 게시글을 다시 가져와야 하는지 판단"""
+        record = self.get(link)
+        if not record or not record.get('content_hash'):
+            return True
+        if reply_count is None or record.get('reply_count') is None:
+            return True
+        return reply_count != record['reply_count']
+
+    def is_changed(self, link, content, comments):
+        """저장된 해시와 비교하여 새 글이거나 내용이 바뀌었는지 판단"""
+        record = self.get(link)
+        if not record or not record.get('content_hash'):
+            return True
+        return (
+            record['content_hash'] != content_hash(content, comments)
+            or record['comments_count'] != len(comments or [])
+        )
+
+    def record_classification(self, link, title, is_issue, reply_count=None):
+        """분류 결과 기록 (다음 실행에서 분류 API 호출 생략용)"""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self.conn:
+            self.conn.execute("""
+                INSERT INTO posts (post_id, link, title, is_issue, reply_count, first_seen_at, last_crawled_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(post_id) DO UPDATE SET
+                    title = excluded.title,
+                    is_issue = excluded.is_issue,
+                    reply_count = COALESCE(excluded.reply_count, posts.reply_count)
+            """, (post_id_from_link(link), link, title, is_issue, reply_count, now, None))
+
+    def record_crawl(self, link, title, content, comments, reply_count=None):
+        """게시글 수집 결과 기록"""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self.conn:
+            self.conn.execute("""
+                INSERT INTO posts (post_id, link, title, is_issue, reply_count, comments_count,
+                                   content_hash, first_seen_at, last_crawled_at)
+                VALUES (?, ?, ?, 'Y', ?, ?, ?, ?, ?)
+                ON CONFLICT(post_id) DO UPDATE SET
+                    title = excluded.title,
+                    reply_count = COALESCE(excluded.reply_count, posts.reply_count),
+                    comments_count = excluded.comments_count,
+                    content_hash = excluded.content_hash,
+                    last_crawled_at = excluded.last_crawled_at
+            """, (post_id_from_link(link), link, title, reply_count, len(comments or []),
+                  content_hash(content, comments), now, now))
+
+    def touch(self, link):
+        """변경 없는 게시글의 마지막 확인 시각만 갱신"""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE posts SET last_crawled_at = ? WHERE post_id = ?",
+                (now, post_id_from_link(link))
+            )
+
+    def close(self):
+        """DB 연결 종료"""
+        self.conn.close()
@@ -0,0 +1,834 @@
+#!/usr/bin/env python3
+"""
+QdrantStorage / OpenAIQdrantStorage가 함께 쓰는 도우미 함수
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time
+from itertools import islice
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    BinaryQuantization, BinaryQuantizationConfig, Distance, FieldCondition, Filter, FilterSelector, Fusion,
+    FusionQuery, HasIdCondition, HnswConfigDiff, IsEmptyCondition, MatchAny, MatchValue, Modifier, OptimizersConfigDiff,
+    PayloadField, PayloadSchemaType, Prefetch, QuantizationSearchParams, Range, ScalarQuantization,
+    ScalarQuantizationConfig, ScalarType, SearchParams, SparseVectorParams, VectorParams
+)
+from post_index import post_id_from_link
+
+logger = logging.getLogger(__name__)
+
+# 포인트 ID 생성용 네임스페이스 (값이 바뀌면 기존 포인트와 ID가 달라지므로 고정)
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://theqoo.net")
+
+# 변경 여부 판단에 사용하는 문서 필드
+HASHED_FIELDS = ("title", "link", "post_datetime", "content", "comments", "analysis")
+
+# 페이로드 구조가 바뀌면 올려서 기존 포인트도 한 번 다시 저장되도록 함
+PAYLOAD_SCHEMA_VERSION = 3
+
+# 서버에서 필터링할 페이로드 필드와 인덱스 타입
+PAYLOAD_INDEXES = {
+    "link": PayloadSchemaType.KEYWORD,
+    "collected_date": PayloadSchemaType.KEYWORD,
+    "post_timestamp": PayloadSchemaType.INTEGER,
+    "collected_timestamp": PayloadSchemaType.INTEGER,
+    "parent_id": PayloadSchemaType.KEYWORD
+}
+
+# 청크 포인트가 속한 게시글 포인트 ID (그룹 검색 기준)
+PARENT_ID_FIELD = "parent_id"
+
+# BM25 희소 벡터 이름 (dense 벡터는 이름 없는 기본 벡터)
+SPARSE_VECTOR_NAME = "text"
+
+# 검색 결과 표시/컨텍스트 생성에 필요한 페이로드 필드 (전문은 DocumentStore에서 조회)
+SEARCH_PAYLOAD_FIELDS = [
+    "id", "title", "link", "post_datetime", "collected_date", "comments_count",
+    "content_preview", "analysis_preview", "embedding_model", "parent_id", "chunk_kind", "chunk_text"
+]
+CONTENT_PREVIEW_CHARS = 300
+ANALYSIS_PREVIEW_CHARS = 500
+
+# "2025.07.21 10:30", "2024-01-15 14:30:00", "2024-12-01" 등 theqoo/수집 날짜 형식
+DATETIME_PATTERN = re.compile(
+    r"(\d{4})[.\-/](\d{1,2})[.\-/](\d{1,2})(?:[ T]+(\d{1,2}):(\d{2})(?::(\d{2}))?)?"
+)
+
+# 같은 설정의 클라이언트는 프로세스 안에서 재사용 (gRPC 채널/HTTP 연결 풀 공유)
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def parse_qdrant_url(qdrant_url, host=None, port=6333):
+    """QDRANT_URL에서 호스트와 포트 추출 (URL이 없으면 전달받은 값 사용)"""
+    if not qdrant_url:
+        return host or "localhost", port
+
+    if qdrant_url.startswith("http://"):
+        host = qdrant_url[7:]  # "http://" 제거
+    elif qdrant_url.startswith("https://"):
+        host = qdrant_url[8:]  # "https://" 제거
+    else:
+        host = qdrant_url
+    host = host.rstrip("/")
+
+    # 포트가 URL에 포함되어 있으면 추출
+    if ":" in host:
+        host, port_str = host.split(":", 1)
+        port = int(port_str)
+    return host, port
+
+
+def _env_flag(name):
+    """환경변수 값을 True/False로 해석"""
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "y")
+
+
+def get_qdrant_client(host=None, port=6333, prefer_grpc=None, grpc_port=None, location=None):
+    """
+    환경변수 설정으로 QdrantClient를 만들거나 이미 만든 클라이언트를 재사용
+
+    Args:
+        host (str): QDRANT_URL이 없을 때 사용할 호스트
+        port (int): QDRANT_URL에 포트가 없을 때 사용할 REST 포트
+        prefer_grpc (bool): gRPC 사용 여부 (None이면 QDRANT_PREFER_GRPC 환경변수)
+        grpc_port (int): gRPC 포트 (None이면 QDRANT_GRPC_PORT 환경변수, 기본 6334)
+        location (str): 서버 없이 쓰는 로컬 모드 저장 경로 또는 ":memory:"
+                        (None이면 QDRANT_LOCAL_PATH 환경변수, 빈 문자열이면 항상 서버에 연결)
+    """
+    if location is None:
+        location = os.getenv("QDRANT_LOCAL_PATH") or None
+    if location:
+        return _get_local_client(location)
+
+    host, port = parse_qdrant_url(os.getenv("QDRANT_URL"), host, port)
+    api_key = os.getenv("QDRANT_KEY") or None
+    if prefer_grpc is None:
+        prefer_grpc = _env_flag("QDRANT_PREFER_GRPC")
+    if grpc_port is None:
+        grpc_port = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+
+    key = (host, port, api_key, prefer_grpc, grpc_port)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            kwargs = {"host": host, "port": port}
+            if api_key:
+                kwargs["api_key"] = api_key
+            if prefer_grpc:
+                kwargs.update(prefer_grpc=True, grpc_port=grpc_port)
+            client = QdrantClient(**kwargs)
+            _clients[key] = client
+            logger.info(f"Qdrant 클라이언트 생성: {host}:{grpc_port if prefer_grpc else port} ({'gRPC' if prefer_grpc else 'REST'})")
+    return client
+
+
+def _get_local_client(location):
+    """
+    로컬 모드 클라이언트 (qdrant-client가 프로세스 안에서 직접 저장/검색)
+    같은 경로는 한 프로세스만 열 수 있으므로 경로마다 클라이언트 하나를 공유
+    """
+    key = ("local", location if location == ":memory:" else os.path.abspath(location))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if location == ":memory:":
+                client = QdrantClient(location=":memory:")
+            else:
+                client = QdrantClient(path=location)
+            _clients[key] = client
+            logger.info(f"Qdrant 로컬 모드 클라이언트 생성: {location}")
+    return client
+
+
+def is_local_client(client):
+    """로컬 모드 클라이언트인지 확인 (페이로드 인덱스/양자화/HNSW 설정은 무시됨)"""
+    return any(client is cached for key, cached in _clients.items() if key[0] == "local")
+
+
+def iter_batches(items, batch_size):
+    """리스트나 이터레이터를 batch_size개씩 리스트로 나눠서 반환"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def document_key(document):
+    """문서를 식별하는 안정적인 키 (게시글 번호 > 링크 > 문서 ID > 제목 순)"""
+    link = document.get('link')
+    if link:
+        return f"theqoo:{post_id_from_link(link)}"
+    return document.get('id') or document['title']
+
+
+def point_id_for_document(document):
+    """문서 URL 기반 UUIDv5 포인트 ID (프로세스/실행이 달라도 항상 같은 값)"""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, document_key(document)))
+
+
+def document_hash(document):
+    """임베딩/페이로드에 영향을 주는 필드의 해시"""
+    data = {field: document.get(field) for field in HASHED_FIELDS}
+    data["_schema"] = PAYLOAD_SCHEMA_VERSION
+    encoded = json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def to_epoch(value, end_of_day=False):
+    """
+    날짜/일시 값을 epoch 초(int)로 변환 (해석할 수 없으면 None)
+
+    Args:
+        value: 문자열, date, datetime 또는 epoch 숫자
+        end_of_day (bool): 시각이 없는 날짜는 그날 23:59:59로 해석 (범위 끝 값용)
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, date):
+        return int(datetime.combine(value, dt_time.max if end_of_day else dt_time.min).timestamp())
+
+    match = DATETIME_PATTERN.search(str(value))
+    if not match:
+        return None
+
+    year, month, day, hour, minute, second = match.groups()
+    try:
+        if hour is None:
+            parsed = datetime.combine(
+                date(int(year), int(month), int(day)),
+                dt_time.max if end_of_day else dt_time.min
+            )
+        else:
+            parsed = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second or 0))
+    except ValueError:
+        return None
+    return int(parsed.timestamp())
+
+
+def timestamp_fields(document):
+    """페이로드에 넣을 epoch 날짜 필드 (범위 필터용)"""
+    return {
+        "post_timestamp": to_epoch(document.get('post_datetime')),
+        "collected_timestamp": to_epoch(document.get('collected_date'))
+    }
+
+
+def search_text(doc):
+    """키워드(희소 벡터) 검색용 텍스트: 제목 + 본문 + 분석"""
+    return f"{doc['title']} {doc.get('content', '')} {doc.get('analysis', '')}"
+
+
+def build_payload(doc, lean=True):
+    """
+    포인트 페이로드 생성
+
+    Args:
+        lean (bool): True면 본문/분석은 미리보기만 넣고 댓글/전문은 빼서 DocumentStore에 따로 보관
+    """
+    payload = {
+        "title": doc['title'],
+        "link": doc['link'],
+        "post_datetime": doc.get('post_datetime', ''),
+        "comments_count": doc.get('comments_count', 0),
+        "collected_date": doc.get('collected_date', ''),
+        "id": doc.get('id', document_key(doc)),
+        "doc_hash": document_hash(doc),
+        **timestamp_fields(doc)
+    }
+
+    if lean:
+        payload["content_preview"] = (doc.get('content') or '')[:CONTENT_PREVIEW_CHARS]
+        payload["analysis_preview"] = (doc.get('analysis') or '')[:ANALYSIS_PREVIEW_CHARS]
+    else:
+        payload.update({
+            "content": doc.get('content', ''),
+            "comments": doc.get('comments', []),
+            "analysis": doc.get('analysis', ''),
+            "text_for_search": search_text(doc)
+        })
+    return payload
+
+
+def payload_preview(payload, field, max_chars):
+    """짧은 페이로드(content_preview)와 예전 전문 페이로드(content) 모두에서 미리보기 반환"""
+    return payload.get(f"{field}_preview") or (payload.get(field) or "")[:max_chars]
+
+
+def fetch_full_documents(client, collection_name, document_store, point_ids):
+    """
+    화면에 보여줄 문서의 본문/댓글/분석 전문 조회 ({포인트 ID: 문서})
+    DocumentStore에 없으면 (예전 전문 페이로드 포인트) Qdrant 페이로드에서 가져옴
+    """
+    ids = [str(point_id) for point_id in point_ids]
+    documents = document_store.get_many(ids) if document_store else {}
+
+    missing = [point_id for point_id in ids if point_id not in documents]
+    if missing:
+        try:
+            points = client.retrieve(
+                collection_name=collection_name,
+                ids=missing,
+                with_payload=["title", "link", "content", "comments", "analysis"],
+                with_vectors=False
+            )
+            for point in points:
+                documents[str(point.id)] = dict(point.payload or {})
+        except Exception as e:
+            logger.error(f"문서 전문 조회 실패: {e}")
+
+    missing = [point_id for point_id in ids if point_id not in documents]
+    if missing:
+        # 청크 컬렉션은 게시글 ID의 포인트가 없으므로 body 0번 청크 페이로드에서 가져옴
+        try:
+            points, _ = client.scroll(
+                collection_name=collection_name,
+                scroll_filter=Filter(must=[
+                    FieldCondition(key=PARENT_ID_FIELD, match=MatchAny(any=missing)),
+                    FieldCondition(key="chunk_kind", match=MatchValue(value="body")),
+                    FieldCondition(key="chunk_index", match=MatchValue(value=0))
+                ]),
+                limit=len(missing),
+                with_payload=["title", "link", "content", "comments", "analysis", PARENT_ID_FIELD],
+                with_vectors=False
+            )
+            for point in points:
+                payload = dict(point.payload or {})
+                documents[payload.pop(PARENT_ID_FIELD)] = payload
+        except Exception as e:
+            logger.error(f"청크 문서 전문 조회 실패: {e}")
+
+    return documents
+
+
+def ensure_payload_indexes(client, collection_name):
+    """필터에 쓰는 페이로드 필드 인덱스가 없으면 생성"""
+    if is_local_client(client):
+        # 로컬 모드는 필터를 전체 스캔으로 처리하므로 인덱스가 필요 없음
+        return
+    try:
+        existing = client.get_collection(collection_name).payload_schema or {}
+        for field_name, schema in PAYLOAD_INDEXES.items():
+            if field_name in existing:
+                continue
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=schema
+            )
+            logger.info(f"페이로드 인덱스 생성: {collection_name}.{field_name} ({schema})")
+    except Exception as e:
+        logger.error(f"페이로드 인덱스 생성 실패: {e}")
+
+
+def build_search_filter(date_from=None, date_to=None, links=None, date_field="post_timestamp"):
+    """
+    날짜 범위/링크 조건으로 Qdrant 필터 생성 (조건이 없으면 None)
+
+    Args:
+        date_from: 시작 날짜/일시 (포함)
+        date_to: 끝 날짜/일시 (포함, 날짜만 주면 그날 끝까지)
+        links (str | list): 이 링크의 게시글만 검색
+        date_field (str): 범위를 적용할 필드 (post_timestamp 또는 collected_timestamp)
+    """
+    conditions = []
+
+    gte = to_epoch(date_from)
+    lte = to_epoch(date_to, end_of_day=True)
+    if gte is not None or lte is not None:
+        conditions.append(FieldCondition(key=date_field, range=Range(gte=gte, lte=lte)))
+
+    if links:
+        if isinstance(links, str):
+            conditions.append(FieldCondition(key="link", match=MatchValue(value=links)))
+        else:
+            conditions.append(FieldCondition(key="link", match=MatchAny(any=list(links))))
+
+    return Filter(must=conditions) if conditions else None
+
+
+QUANTIZATION_TYPES = ("scalar", "binary")
+
+# 세그먼트가 이 크기(KB)를 넘으면 HNSW 인덱스 생성 (Qdrant 기본값)
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+
+def collection_params(vector_size, quantization=None, on_disk=False, hnsw_m=None, hnsw_ef_construct=None,
+                      sparse=False, bulk_load=False):
+    """
+    create_collection에 넘길 벡터/양자화/HNSW 설정
+
+    Args:
+        vector_size (int): 벡터 차원
+        quantization (str): None, "scalar"(int8, 약 4배 절약) 또는 "binary"(약 32배 절약)
+        on_disk (bool): 원본 float32 벡터를 디스크에 두고 양자화 벡터만 RAM에 유지
+        hnsw_m (int): HNSW 그래프 연결 수 (None이면 서버 기본값)
+        hnsw_ef_construct (int): HNSW 생성 시 탐색 폭 (None이면 서버 기본값)
+        sparse (bool): BM25 희소 벡터 추가 (IDF는 서버에서 계산)
+        bulk_load (bool): 대량 적재용으로 HNSW 인덱싱을 꺼 둠 (적재 후 finish_bulk_load 호출)
+    """
+    if quantization and quantization not in QUANTIZATION_TYPES:
+        raise ValueError(f"지원하지 않는 양자화 방식: {quantization} (가능: {', '.join(QUANTIZATION_TYPES)})")
+
+    params = {
+        "vectors_config": VectorParams(size=vector_size, distance=Distance.COSINE, on_disk=on_disk)
+    }
+
+    if sparse:
+        params["sparse_vectors_config"] = {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
+
+    if bulk_load:
+        params["optimizers_config"] = OptimizersConfigDiff(indexing_threshold=0)
+
+    if hnsw_m is not None or hnsw_ef_construct is not None:
+        params["hnsw_config"] = HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construct)
+
+    if quantization == "scalar":
+        params["quantization_config"] = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    elif quantization == "binary":
+        params["quantization_config"] = BinaryQuantization(
+            binary=BinaryQuantizationConfig(always_ram=True)
+        )
+
+    return params
+
+
+def wait_until_indexed(client, collection_name, timeout=600):
+    """컬렉션 최적화(인덱싱)가 끝날 때까지 대기"""
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        if str(client.get_collection(collection_name).status).lower().endswith("green"):
+            return True
+        time.sleep(1)
+    return False
+
+
+def finish_bulk_load(client, collection_name, indexing_threshold=DEFAULT_INDEXING_THRESHOLD, timeout=3600):
+    """bulk_load로 만든 컬렉션의 인덱싱을 다시 켜고 HNSW 생성이 끝날 때까지 대기"""
+    client.update_collection(
+        collection_name=collection_name,
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=indexing_threshold)
+    )
+    # 설정 변경 직후에는 최적화가 아직 시작 전이라 green일 수 있음
+    time.sleep(1)
+    return wait_until_indexed(client, collection_name, timeout)
+
+
+def resolve_alias(client, alias_name):
+    """별칭이 가리키는 실제 컬렉션 이름 (별칭이 아니면 None)"""
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == alias_name:
+            return alias.collection_name
+    return None
+
+
+def collection_exists(client, collection_name):
+    """컬렉션 또는 컬렉션 별칭이 있는지 확인 (get_collections에는 별칭이 나오지 않음)"""
+    if collection_name in [col.name for col in client.get_collections().collections]:
+        return True
+    return resolve_alias(client, collection_name) is not None
+
+
+def quantized_search_params(quantization=None, oversampling=2.0, hnsw_ef=None):
+    """양자화 컬렉션 검색 설정 (후보를 oversampling배 뽑아 원본 벡터로 다시 점수 계산)"""
+    if not quantization and hnsw_ef is None:
+        return None
+    return SearchParams(
+        hnsw_ef=hnsw_ef,
+        quantization=QuantizationSearchParams(rescore=True, oversampling=oversampling) if quantization else None
+    )
+
+
+def iter_scroll(client, collection_name, page_size=256, offset=None, with_payload=True,
+                with_vectors=False, scroll_filter=None):
+    """scroll을 페이지 단위로 반복하며 (포인트 리스트, 다음 offset)을 반환"""
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=page_size,
+            offset=offset,
+            scroll_filter=scroll_filter,
+            with_payload=with_payload,
+            with_vectors=with_vectors
+        )
+        if points:
+            yield points, offset
+        if offset is None:
+            return
+
+
+def documents_from_points(points, document_store=None):
+    """
+    scroll로 읽은 포인트를 저장할 때의 문서 형태로 복원 (다른 컬렉션/설정으로 다시 임베딩할 때 사용)
+    본문/댓글/분석 전문은 DocumentStore에서, 없으면 (예전 전문 페이로드 포인트) 페이로드에서 가져옴
+    청크 포인트는 게시글마다 body 0번 청크 하나만 문서로 복원 (전문은 parent_id로 조회)
+    """
+    points = [
+        point for point in points
+        if PARENT_ID_FIELD not in (point.payload or {})
+        or (point.payload.get("chunk_kind"), point.payload.get("chunk_index")) == ("body", 0)
+    ]
+    keys = [str((point.payload or {}).get(PARENT_ID_FIELD, point.id)) for point in points]
+    stored = document_store.get_many(keys) if document_store else {}
+    documents = []
+    for point, key in zip(points, keys):
+        payload = point.payload or {}
+        full = stored.get(key, payload)
+        documents.append({
+            "id": payload.get("id", ""),
+            "title": payload.get("title") or full.get("title", ""),
+            "link": payload.get("link") or full.get("link", ""),
+            "post_datetime": payload.get("post_datetime", ""),
+            "comments_count": payload.get("comments_count", 0),
+            "collected_date": payload.get("collected_date", ""),
+            "content": full.get("content", payload.get("content_preview", "")),
+            "comments": full.get("comments", []),
+            "analysis": full.get("analysis", payload.get("analysis_preview", ""))
+        })
+    return documents
+
+
+def count_points(client, collection_name, exact=True, count_filter=None):
+    """
+    포인트 수를 count API 한 번으로 조회 (vectors_count는 None일 수 있어 비었는지 판단에 쓰지 않음)
+
+    Args:
+        exact (bool): False면 인덱스 통계로 빠르게 근사
+        count_filter (Filter): 이 조건에 맞는 포인트만 셈
+    """
+    return client.count(collection_name=collection_name, count_filter=count_filter, exact=exact).count
+
+
+def count_documents(client, collection_name):
+    """게시글 수 (청크 컬렉션은 게시글마다 하나인 body 0번 청크만 세어 청크/일반 컬렉션을 비교할 수 있게 함)"""
+    return count_points(client, collection_name, count_filter=Filter(should=[
+        IsEmptyCondition(is_empty=PayloadField(key=PARENT_ID_FIELD)),
+        Filter(must=[
+            FieldCondition(key="chunk_kind", match=MatchValue(value="body")),
+            FieldCondition(key="chunk_index", match=MatchValue(value=0))
+        ])
+    ]))
+
+
+def scroll_partitions(partitions):
+    """
+    UUID 포인트 ID 공간을 나눈 (시작 offset, 끝 UUID 정수) 목록
+    scroll은 ID 순서로 진행하므로 구간마다 따로 scroll하면 겹치지 않게 병렬로 읽을 수 있음
+    첫 구간은 offset 없이 시작하여 숫자 ID 포인트도 포함
+    """
+    bounds = [index * (1 << 128) // partitions for index in range(partitions + 1)]
+    return [
+        (None if index == 0 else str(uuid.UUID(int=bounds[index])), bounds[index + 1])
+        for index in range(partitions)
+    ]
+
+
+def _point_id_order(point_id):
+    """scroll 정렬 순서 값 (숫자 ID는 모든 UUID보다 앞)"""
+    if isinstance(point_id, int):
+        return -1
+    return uuid.UUID(str(point_id)).int
+
+
+def iter_scroll_partition(client, collection_name, start, end, page_size=256, with_payload=True,
+                          with_vectors=False, scroll_filter=None):
+    """scroll_partitions의 한 구간만 페이지 단위로 읽음 (포인트 리스트 반환)"""
+    for points, _ in iter_scroll(client, collection_name, page_size=page_size, offset=start,
+                                 with_payload=with_payload, with_vectors=with_vectors,
+                                 scroll_filter=scroll_filter):
+        inside = [point for point in points if _point_id_order(point.id) < end]
+        if inside:
+            yield inside
+        if len(inside) < len(points):
+            return
+
+
+def has_sparse_vectors(collection_info):
+    """컬렉션에 BM25 희소 벡터 설정이 있는지 확인"""
+    sparse_vectors = getattr(collection_info.config.params, "sparse_vectors", None) or {}
+    return SPARSE_VECTOR_NAME in sparse_vectors
+
+
+def dense_vector_params(collection_info):
+    """
+    컬렉션의 기본 dense 벡터 설정 (VectorParams, 없으면 None)
+    이름 있는 벡터(dict)로 만든 컬렉션이면 ""(기본) 이름, 없으면 첫 번째 dense 벡터 사용
+    """
+    vectors = collection_info.config.params.vectors
+    if isinstance(vectors, dict):
+        return vectors.get("") or next(iter(vectors.values()), None)
+    return vectors
+
+
+def point_vector(dense_vector, sparse_vector=None):
+    """포인트 벡터 (희소 벡터가 있으면 기본 dense 벡터와 함께 이름 있는 벡터로 저장)"""
+    if sparse_vector is None:
+        return dense_vector
+    return {"": dense_vector, SPARSE_VECTOR_NAME: sparse_vector}
+
+
+def dense_vector(vector):
+    """조회한 포인트 벡터에서 기본 dense 벡터만 반환 (희소 벡터와 함께 저장된 경우 대비)"""
+    if isinstance(vector, dict):
+        return vector.get("")
+    return vector
+
+
+def hybrid_search(client, collection_name, dense_vector, sparse_vector, limit=5, query_filter=None,
+                  search_params=None, with_payload=True, prefetch_limit=None):
+    """
+    dense + 희소 벡터 검색 결과를 서버에서 RRF로 합쳐 한 번의 요청으로 반환
+
+    Args:
+        prefetch_limit (int): 각 검색에서 가져올 후보 수 (None이면 limit의 4배)
+    """
+    prefetch_limit = prefetch_limit or limit * 4
+    response = client.query_points(
+        collection_name=collection_name,
+        prefetch=[
+            Prefetch(query=dense_vector, filter=query_filter, params=search_params, limit=prefetch_limit),
+            Prefetch(query=sparse_vector, using=SPARSE_VECTOR_NAME, filter=query_filter, limit=prefetch_limit)
+        ],
+        query=FusionQuery(fusion=Fusion.RRF),
+        limit=limit,
+        with_payload=with_payload
+    )
+    return response.points
+
+
+def grouped_search(client, collection_name, dense_vector, sparse_vector=None, group_by=PARENT_ID_FIELD, limit=5,
+                   group_size=1, query_filter=None, search_params=None, with_payload=True, prefetch_limit=None):
+    """
+    group_by 필드 값(게시글)마다 점수가 높은 포인트 group_size개씩 한 번의 요청으로 검색
+    sparse_vector가 있으면 dense + 희소 벡터 결과를 RRF로 합친 뒤 묶음
+
+    Returns:
+        list: PointGroup 목록 (group.id = 그룹 값, group.hits = 점수 순 포인트)
+    """
+    if sparse_vector is None:
+        kwargs = {"query": dense_vector, "query_filter": query_filter, "search_params": search_params}
+    else:
+        # 한 게시글의 청크가 후보를 많이 차지하므로 후보를 넉넉히 가져옴
+        prefetch_limit = prefetch_limit or limit * group_size * 8
+        kwargs = {
+            "prefetch": [
+                Prefetch(query=dense_vector, filter=query_filter, params=search_params, limit=prefetch_limit),
+                Prefetch(query=sparse_vector, using=SPARSE_VECTOR_NAME, filter=query_filter, limit=prefetch_limit)
+            ],
+            "query": FusionQuery(fusion=Fusion.RRF)
+        }
+
+    response = client.query_points_groups(
+        collection_name=collection_name,
+        group_by=group_by,
+        limit=limit,
+        group_size=group_size,
+        with_payload=with_payload,
+        **kwargs
+    )
+    return response.groups
+
+
+def best_hit_per_group(groups):
+    """그룹마다 가장 점수가 높은 포인트 (ID는 게시글 포인트 ID로 바꿔 기존 검색 결과처럼 사용)"""
+    hits = []
+    for group in groups:
+        if group.hits:
+            best = group.hits[0]
+            best.id = group.id
+            hits.append(best)
+    return hits
+
+
+def best_chunk_hits(hits, limit):
+    """
+    청크 검색 결과를 게시글마다 점수가 가장 높은 것 하나로 줄임 (VectorIndex처럼 그룹 검색이 없는 경우)
+    ID는 게시글 포인트 ID로 바꿔 기존 검색 결과처럼 사용
+    """
+    results, seen = [], set()
+    for hit in hits:
+        parent_id = (hit.payload or {}).get(PARENT_ID_FIELD, hit.id)
+        if parent_id in seen:
+            continue
+        seen.add(parent_id)
+        results.append(hit._replace(id=parent_id))
+        if len(results) >= limit:
+            break
+    return results
+
+
+def has_chunk_points(client, collection_name):
+    """
+    parent_id가 있는 청크 포인트로 채워진 컬렉션인지 확인
+    근사 count는 인덱스 없는 필드에서 0이 아닐 수 있어 실제 포인트 하나를 scroll로 확인
+    """
+    points, _ = client.scroll(
+        collection_name=collection_name,
+        scroll_filter=Filter(must_not=[IsEmptyCondition(is_empty=PayloadField(key=PARENT_ID_FIELD))]),
+        limit=1,
+        with_payload=False,
+        with_vectors=False
+    )
+    return bool(points)
+
+
+def delete_document_chunks(client, collection_name, parent_ids, keep_ids=None):
+    """
+    게시글들의 청크 중 keep_ids에 없는 것 삭제 (수정되어 청크 수가 줄어든 경우 남는 청크 제거)
+    새 청크를 올린 뒤 keep_ids로 새 청크 ID를 넘기면 다시 저장하는 동안에도 게시글이 검색에서 빠지지 않음
+    """
+    if not parent_ids:
+        return
+    client.delete(
+        collection_name=collection_name,
+        points_selector=FilterSelector(filter=Filter(
+            must=[
+                FieldCondition(key=PARENT_ID_FIELD, match=MatchAny(any=[str(parent_id) for parent_id in parent_ids]))
+            ],
+            must_not=[HasIdCondition(has_id=list(keep_ids))] if keep_ids else None
+        )),
+        wait=True
+    )
+
+
+def dedupe_documents(documents):
+    """같은 게시글이 여러 번 들어오면 마지막 것만 남김 (입력 순서 유지)"""
+    latest = {}
+    for document in documents:
+        latest[point_id_for_document(document)] = document
+    return list(latest.values())
+
+
+def filter_unchanged_documents(client, collection_name, documents, batch_size=256, id_for_document=None,
+                               document_store=None):
+    """
+    이미 같은 내용으로 저장된 문서를 제외하고 새 문서/변경된 문서만 반환
+
+    Args:
+        id_for_document: doc_hash를 확인할 포인트 ID 함수 (None이면 게시글 포인트 ID)
+        document_store: 전문을 보관하는 DocumentStore (주면 여기에 전문이 없는 문서는 변경이 없어도 다시 저장)
+    """
+    stored_hashes = {}
+    ids = [(id_for_document or point_id_for_document)(doc) for doc in documents]
+
+    try:
+        for start in range(0, len(ids), batch_size):
+            points = client.retrieve(
+                collection_name=collection_name,
+                ids=ids[start:start + batch_size],
+                with_payload=["doc_hash"],
+                with_vectors=False
+            )
+            for point in points:
+                stored_hashes[str(point.id)] = (point.payload or {}).get("doc_hash")
+    except Exception as e:
+        logger.warning(f"기존 포인트 조회 실패, 전체 문서 저장: {e}")
+        return documents
+
+    # 페이로드에는 미리보기만 있어 문서 저장소 파일을 잃으면 전문을 복구할 곳이 없으므로 다시 저장
+    missing_documents = set()
+    if document_store is not None:
+        post_ids = {point_id_for_document(doc) for doc in documents}
+        missing_documents = post_ids - document_store.existing_ids(post_ids)
+
+    changed = [
+        doc for doc, point_id in zip(documents, ids)
+        if stored_hashes.get(point_id) != document_hash(doc) or point_id_for_document(doc) in missing_documents
+    ]
+    logger.info(f"변경 없는 문서 {len(documents) - len(changed)}개 건너뜀, 저장 대상 {len(changed)}개")
+    return changed
+
+
+class ChunkedUpserter:
+    def __init__(self, client, collection_name, chunk_size=256, parallel=4, max_retries=3):
+        """
+        포인트를 고정 크기 묶음으로 나눠 여러 개를 동시에 업서트 (wait=False)
+        finish()에서 마지막 묶음을 wait=True로 보내 이전 쓰기가 모두 반영되도록 함
+
+        Args:
+            client: QdrantClient
+            collection_name (str): 저장할 컬렉션
+            chunk_size (int): 업서트 한 번에 보낼 포인트 수
+            parallel (int): 동시에 보낼 업서트 요청 수
+            max_retries (int): 실패한 묶음 재시도 횟수
+        """
+        self.client = client
+        self.collection_name = collection_name
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+
+        self._executor = ThreadPoolExecutor(max_workers=parallel)
+        self._in_flight = threading.BoundedSemaphore(parallel * 2)  # 메모리에 쌓이는 묶음 수 제한
+        self._futures = []
+        self._buffer = []
+        self._started_at = time.monotonic()
+
+    def _upsert_with_retry(self, points, wait=False):
+        """묶음 하나 업서트 (실패 시 지수 백오프로 재시도, 저장된 포인트 수 반환)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=points,
+                    wait=wait
+                )
+                return len(points)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"업서트 실패 ({len(points)}개 포인트, {attempt + 1}회 시도): {e}")
+                    return 0
+                logger.warning(f"업서트 실패, 재시도 {attempt + 1}/{self.max_retries}: {e}")
+                time.sleep(0.5 * (2 ** attempt))
+
+    def _submit(self, points):
+        """묶음을 백그라운드 업서트로 전송"""
+        self._in_flight.acquire()
+        future = self._executor.submit(self._upsert_with_retry, points)
+        future.add_done_callback(lambda _: self._in_flight.release())
+        self._futures.append((future, len(points)))
+
+    def add(self, points):
+        """포인트 추가 (묶음이 차면 바로 전송, 마지막 묶음은 finish에서 전송)"""
+        self._buffer.extend(points)
+        while len(self._buffer) > self.chunk_size:
+            chunk, self._buffer = self._buffer[:self.chunk_size], self._buffer[self.chunk_size:]
+            self._submit(chunk)
+
+    def finish(self):
+        """남은 업서트를 모두 기다리고 마지막 묶음을 wait=True로 보내 일관성 확보"""
+        stored = sum(future.result() for future, _ in self._futures)
+        total = sum(size for _, size in self._futures) + len(self._buffer)
+
+        if self._buffer:
+            stored += self._upsert_with_retry(self._buffer, wait=True)
+            self._buffer = []
+        self._executor.shutdown(wait=True)
+
+        elapsed = time.monotonic() - self._started_at
+        result = {
+            "stored": stored,
+            "failed": total - stored,
+            "seconds": elapsed,
+            "points_per_sec": stored / elapsed if elapsed > 0 else 0.0
+        }
+        logger.info(
+            f"업서트 완료: {stored}개 저장, {result['failed']}개 실패, "
+            f"{elapsed:.1f}초 ({result['points_per_sec']:.1f} points/sec)"
+        )
+        return result
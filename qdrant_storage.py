@@ -1,11 +1,24 @@
 import json
 import os
+import numpy as np
 from datetime import datetime
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import PointStruct
 from sentence_transformers import SentenceTransformer
 import logging
 from dotenv import load_dotenv
+from comment_index import COMMENT_COLLECTION_SUFFIX, CommentIndex
+from document_chunker import chunk_payload, chunk_point_id, document_chunks, first_chunk_point_id
+from document_store import DocumentStore
+from embedding_cache import EmbeddingCache, query_vector_cache
+from qdrant_common import (
+    SEARCH_PAYLOAD_FIELDS, ChunkedUpserter, best_chunk_hits, best_hit_per_group, build_payload,
+    build_search_filter, collection_exists, collection_params, dedupe_documents, delete_document_chunks,
+    dense_vector, ensure_payload_indexes, fetch_full_documents, filter_unchanged_documents, get_qdrant_client,
+    grouped_search, has_chunk_points, has_sparse_vectors, hybrid_search, iter_batches, parse_qdrant_url,
+    point_id_for_document, point_vector, search_text
+)
+from sparse_encoder import SparseTextEncoder
+from vector_index import VectorIndex
 
 # 환경변수 로드
 load_dotenv()
@@ -13,62 +26,88 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 class QdrantStorage:
-    def __init__(self, collection_name="theqoo_documents", host=None, port=6333):
-        # 환경변수에서 Qdrant 설정 가져오기
-        self.qdrant_url = os.getenv("QDRANT_URL")
-        self.qdrant_key = os.getenv("QDRANT_KEY")
-        
+    def __init__(self, collection_name="theqoo_documents", host=None, port=6333, batch_size=64,
+                 embedding_cache_path="embedding_cache.db", prefer_grpc=None,
+                 document_store_path="document_store.db", hybrid=True, location=None,
+                 vector_index_path=None, chunked=False,
+                 index_comments=False):
         # URL에서 호스트와 포트 추출
-        if self.qdrant_url:
-            if self.qdrant_url.startswith("http://"):
-                host = self.qdrant_url[7:]  # "http://" 제거
-            elif self.qdrant_url.startswith("https://"):
-                host = self.qdrant_url[8:]  # "https://" 제거
-            else:
-                host = self.qdrant_url
-            
-            # 포트가 URL에 포함되어 있으면 추출
-            if ":" in host:
-                host, port_str = host.split(":", 1)
-                port = int(port_str)
-        else:
-            host = host or "localhost"
+        host, port = parse_qdrant_url(os.getenv("QDRANT_URL"), host, port)
         
         self.collection_name = collection_name
         self.host = host
         self.port = port
         
-        # Qdrant 클라이언트 초기화
-        if self.qdrant_key:
-            self.client = QdrantClient(host=host, port=port, api_key=self.qdrant_key)
-        else:
-            self.client = QdrantClient(host=host, port=port)
+        # Qdrant 클라이언트 초기화 (같은 설정이면 연결 재사용, prefer_grpc면 gRPC 사용)
+        # location(경로 또는 ":memory:")을 주면 서버 없이 로컬 모드로 동작
+        self.location = location
+        self.client = get_qdrant_client(host, port, prefer_grpc=prefer_grpc, location=location)
+        
+        self.model_name = 'sentence-transformers/all-MiniLM-L6-v2'
+        self.model = SentenceTransformer(self.model_name)
+        self.batch_size = batch_size  # 임베딩 배치 크기
         
-        self.model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        # 임베딩 디스크 캐시 (None이면 사용 안 함)
+        self.embedding_cache = EmbeddingCache(embedding_cache_path) if embedding_cache_path else None
+        self.query_cache = query_vector_cache
+        
+        # 본문/댓글 전문 저장소 (None이면 예전처럼 전문을 페이로드에 저장)
+        self.document_store = DocumentStore(document_store_path) if document_store_path else None
+        
+        # dense + BM25 희소 벡터 하이브리드 검색 (희소 벡터가 없는 기존 컬렉션이면 dense만 사용)
+        self.hybrid = hybrid
+        self.sparse_encoder = SparseTextEncoder()
+        
+        # 게시글을 겹치는 청크 여러 개로 저장하고 게시글 단위로 묶어 검색 (청크로 저장된 컬렉션이면 자동으로 켜짐)
+        self.chunked = chunked
         
         # 컬렉션이 없으면 생성
         self._create_collection_if_not_exists()
+        
+        # Qdrant 대신 검색할 NumPy 정확 검색 인덱스
+        # 다른 프로세스(스케줄러 등)의 저장은 반영되지 않으므로 포인트 수가 컬렉션과 다르면 다시 가져옴
+        self.vector_index = VectorIndex(vector_index_path) if vector_index_path else None
+        if self.vector_index is not None:
+            self.vector_index.sync_collection(self.client, self.collection_name)
+        
+        # 댓글 하나당 포인트 하나로 저장하는 댓글 컬렉션 (<컬렉션>_comments, 게시글 ID로 묶어 검색)
+        self.comment_index = None
+        if index_comments:
+            self.comment_index = CommentIndex(
+                self.client, f"{collection_name}{COMMENT_COLLECTION_SUFFIX}",
+                embed_texts=lambda texts: self._encode_texts(texts).tolist(), vector_size=384
+            )
     
     def _create_collection_if_not_exists(self):
         """컬렉션이 없으면 생성"""
         try:
-            collections = self.client.get_collections()
-            collection_names = [col.name for col in collections.collections]
-            
-            if self.collection_name not in collection_names:
+            # 재색인 후 읽기용 별칭도 있는 컬렉션으로 취급 (get_collections에는 별칭이 나오지 않음)
+            if not collection_exists(self.client, self.collection_name):
                 self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(size=384, distance=Distance.COSINE)
+                    **collection_params(384, sparse=self.hybrid)
                 )
-                logger.info(f"컬렉션 '{self.collection_name}' 생성됨")
+                logger.info(f"컬렉션 '{self.collection_name}' 생성됨 (하이브리드 검색: {self.hybrid})")
             else:
                 logger.info(f"컬렉션 '{self.collection_name}' 이미 존재함")
                 
+                if self.hybrid and not has_sparse_vectors(self.client.get_collection(self.collection_name)):
+                    logger.info("희소 벡터 설정이 없는 컬렉션이라 dense 검색만 사용합니다")
+                    self.hybrid = False
+            
+            # 날짜/링크 필터를 서버에서 처리하도록 페이로드 인덱스 생성
+            ensure_payload_indexes(self.client, self.collection_name)
+            
+            # parent_id 인덱스를 만든 뒤 청크 포인트가 실제로 있을 때만 청크 모드로 전환
+            if not self.chunked and has_chunk_points(self.client, self.collection_name):
+                logger.info("청크로 저장된 컬렉션이라 청크 단위로 저장/검색합니다")
+                self.chunked = True
+                
         except Exception as e:
             logger.error(f"컬렉션 생성/확인 실패: {e}")
     
-    def _create_document_vector(self, document):
-        """문서를 벡터로 변환"""
+    def _document_text(self, document):
+        """벡터화할 문서 텍스트 생성"""
         # 제목을 기본으로 사용
         text_for_vector = document['title']
         
@@ -90,69 +129,237 @@ class QdrantStorage:
                 comments_text = comments_text[:500]
             text_for_vector += f" {comments_text}"
         
-        # 벡터 생성
-        vector = self.model.encode(text_for_vector).tolist()
-        return vector
+        return text_for_vector
     
-    def store_documents(self, documents):
-        """문서들을 Qdrant에 저장"""
-        if not documents:
-            logger.warning("저장할 문서가 없습니다.")
-            return False
+    def _encode_texts(self, texts):
+        """여러 텍스트를 배치 단위로 임베딩 (정규화된 numpy 배열 반환, 캐시에 있으면 재사용)"""
+        cache_model = f"{self.model_name}:normalized"
+        vectors = self.embedding_cache.get_many(cache_model, texts) if self.embedding_cache else {}
+        
+        # 캐시에 없는 텍스트만 임베딩
+        missing = [idx for idx in range(len(texts)) if idx not in vectors]
+        if missing:
+            encoded = self.model.encode(
+                [texts[idx] for idx in missing],
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            ).astype(np.float32)
+            if self.embedding_cache:
+                self.embedding_cache.put_many(cache_model, [texts[idx] for idx in missing], encoded)
+            vectors.update(zip(missing, encoded))
+        
+        return np.array([vectors[idx] for idx in range(len(texts))], dtype=np.float32)
+    
+    def _create_document_vector(self, document):
+        """문서를 벡터로 변환"""
+        return self._encode_texts([self._document_text(document)])[0].tolist()
+    
+    def _sparse_document_vector(self, doc):
+        """키워드 검색용 BM25 희소 벡터 (하이브리드가 꺼져 있으면 None)"""
+        return self.sparse_encoder.encode_document(search_text(doc)) if self.hybrid else None
+    
+    def _build_payload(self, doc):
+        """문서 메타데이터 준비 (문서 저장소가 있으면 짧은 페이로드)"""
+        return build_payload(doc, lean=self.document_store is not None)
+    
+    def _chunk_points(self, docs):
+        """게시글들을 청크 포인트로 변환 (모든 게시글의 청크를 한 번에 배치 임베딩)"""
+        doc_chunks = [(doc, document_chunks(doc)) for doc in docs]
+        vectors = iter(self._encode_texts([chunk["text"] for _, chunks in doc_chunks for chunk in chunks]))
+        
+        points = []
+        for doc, chunks in doc_chunks:
+            parent_id = point_id_for_document(doc)
+            payload = self._build_payload(doc)
+            for chunk in chunks:
+                sparse_vector = self.sparse_encoder.encode_document(chunk["text"]) if self.hybrid else None
+                points.append(PointStruct(
+                    id=chunk_point_id(parent_id, chunk["kind"], chunk["index"]),
+                    vector=point_vector(next(vectors).tolist(), sparse_vector),
+                    payload=chunk_payload(payload, parent_id, chunk)
+                ))
+        return points
+    
+    def _remove_stale_chunks(self, docs, points):
+        """
+        새 청크를 올린 뒤 게시글의 더 이상 없는 청크만 삭제 (Qdrant와 NumPy 인덱스 모두)
+        새 청크 ID는 남기므로 다시 저장하는 동안에도 게시글이 검색에서 빠지지 않음
+        """
+        parent_ids = [point_id_for_document(doc) for doc in docs]
+        keep_ids = [point.id for point in points]
+        delete_document_chunks(self.client, self.collection_name, parent_ids, keep_ids=keep_ids)
+        if self.vector_index is not None:
+            keep = {str(point_id) for point_id in keep_ids}
+            self.vector_index.delete(
+                point_id for point_id in self.vector_index.point_ids_for_parents(parent_ids) if point_id not in keep
+            )
+    
+    def store_documents(self, documents, skip_unchanged=True, chunk_size=512,
+                        upsert_chunk_size=256, upsert_parallel=4):
+        """
+        문서들을 Qdrant에 저장
+        
+        Args:
+            documents: 문서 리스트 또는 문서를 하나씩 내주는 이터레이터
+            skip_unchanged (bool): 내용이 같은 문서는 임베딩/저장 생략
+            chunk_size (int): 한 번에 임베딩할 문서 수 (메모리 사용량 상한)
+            upsert_chunk_size (int): 업서트 요청 한 번에 보낼 포인트 수
+            upsert_parallel (int): 동시에 보낼 업서트 요청 수
+        """
+        total_count = 0
+        stored_count = 0
+        failed_count = 0
         
         try:
-            points = []
+            # 업서트는 백그라운드에서 묶음 단위로 병렬 전송 (임베딩과 겹쳐서 진행)
+            upserter = ChunkedUpserter(
+                self.client, self.collection_name,
+                chunk_size=upsert_chunk_size, parallel=upsert_parallel
+            )
             
-            for doc in documents:
-                # 벡터 생성
-                vector = self._create_document_vector(doc)
+            # 문서를 chunk_size개씩 나눠서 임베딩 후 바로 저장하여 메모리 사용량을 제한
+            for chunk in iter_batches(documents, chunk_size):
+                total_count += len(chunk)
                 
-                # 메타데이터 준비
-                payload = {
-                    "title": doc['title'],
-                    "link": doc['link'],
-                    "post_datetime": doc.get('post_datetime', ''),
-                    "content": doc.get('content', ''),
-                    "comments": doc.get('comments', []),  # comments 필드 추가
-                    "comments_count": doc.get('comments_count', 0),
-                    "analysis": doc.get('analysis', ''),
-                    "collected_date": doc.get('collected_date', ''),
-                    "id": doc.get('id', f"doc_{hash(doc['title'])}"),
-                    "text_for_search": f"{doc['title']} {doc.get('content', '')} {doc.get('analysis', '')}"
-                }
+                # 같은 게시글은 하나만 남기고, 이미 같은 내용으로 저장된 문서는 건너뜀
+                chunk = dedupe_documents(chunk)
+                if skip_unchanged:
+                    # 청크 모드는 게시글마다 항상 있는 body 0번 청크의 doc_hash로 비교
+                    chunk = filter_unchanged_documents(
+                        self.client, self.collection_name, chunk,
+                        id_for_document=first_chunk_point_id if self.chunked else None,
+                        document_store=self.document_store
+                    )
+                if not chunk:
+                    continue
                 
-                # Point 생성
-                doc_id = doc.get('id', f"doc_{hash(doc['title'])}")
-                point = PointStruct(
-                    id=hash(doc_id) % (2**63),  # 64비트 정수로 변환
-                    vector=vector,
-                    payload=payload
-                )
-                points.append(point)
+                if self.chunked:
+                    points = self._chunk_points(chunk)
+                else:
+                    # 벡터 일괄 생성
+                    vectors = self._encode_texts([self._document_text(doc) for doc in chunk])
+                    
+                    # Point 생성 (게시글 URL 기반 UUID라 재저장 시 같은 포인트를 덮어씀)
+                    points = [
+                        PointStruct(
+                            id=point_id_for_document(doc),
+                            vector=point_vector(vector.tolist(), self._sparse_document_vector(doc)),
+                            payload=self._build_payload(doc)
+                        )
+                        for doc, vector in zip(chunk, vectors)
+                    ]
+                
+                # 댓글 포인트를 먼저 저장 (실패하면 게시글 포인트도 쓰지 않아 doc_hash가 남지 않고 다음에 재시도)
+                if self.comment_index is not None and self.comment_index.store_documents(chunk) < 0:
+                    logger.error(f"댓글 저장 실패로 문서 {len(chunk)}개 저장 생략")
+                    failed_count += len(chunk)
+                    continue
+                
+                # 본문/댓글 전문은 게시글 포인트 ID로 문서 저장소에 보관 (페이로드에는 미리보기만)
+                if self.document_store:
+                    self.document_store.put_many((point_id_for_document(doc), doc) for doc in chunk)
+                
+                # 벡터 저장
+                upserter.add(points)
+                if self.vector_index is not None:
+                    self.vector_index.upsert((point.id, dense_vector(point.vector), point.payload) for point in points)
+                if self.chunked:
+                    # 수정되어 청크 수가 줄어든 글의 남는 청크 정리 (임베딩/업서트 요청 뒤에 실행)
+                    self._remove_stale_chunks(chunk, points)
+                stored_count += len(chunk)
+                logger.info(f"{stored_count}개 문서 저장 진행 중 (입력 {total_count}개)")
             
-            # 벡터 저장
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points
-            )
+            # 남은 업서트 완료 대기 (마지막 묶음은 wait=True로 일관성 확보)
+            upsert_result = upserter.finish()
+            
+            if total_count == 0:
+                logger.warning("저장할 문서가 없습니다.")
+                return False
+            
+            if self.embedding_cache:
+                stats = self.embedding_cache.stats()
+                logger.info(f"임베딩 캐시 적중률: {stats['hit_rate']:.1%} (적중 {stats['hits']}, 미스 {stats['misses']})")
             
-            logger.info(f"{len(points)}개 문서를 Qdrant에 저장 완료")
+            if upsert_result['failed']:
+                logger.error(f"Qdrant 저장 일부 실패: {upsert_result['failed']}개")
+                return False
+            
+            if failed_count:
+                logger.error(f"문서 {failed_count}개 저장 실패 ({stored_count}개 저장됨)")
+                return False
+            
+            if stored_count == 0:
+                logger.info("새로 저장할 문서가 없습니다 (모두 변경 없음).")
+            else:
+                logger.info(f"{stored_count}개 문서를 Qdrant에 저장 완료 ({upsert_result['points_per_sec']:.1f} points/sec)")
             return True
             
         except Exception as e:
             logger.error(f"Qdrant 저장 실패: {e}")
             return False
     
-    def search_similar_documents(self, query, limit=5):
-        """유사한 문서 검색"""
+    @property
+    def score_label(self):
+        """검색 결과 점수 이름 (하이브리드 검색은 RRF 순위 점수라 코사인 유사도가 아님)"""
+        return "순위 점수" if self.hybrid and self.vector_index is None else "유사도 점수"
+    
+    def search_similar_documents(self, query, limit=5, date_from=None, date_to=None, links=None,
+                                 date_field="post_timestamp", with_payload=SEARCH_PAYLOAD_FIELDS):
+        """
+        유사한 문서 검색
+        
+        Args:
+            date_from, date_to: 작성일시(또는 date_field) 범위, 양 끝 포함
+            links (str | list): 이 링크의 게시글만 검색
+            with_payload: 가져올 페이로드 필드 (전문은 get_full_documents로 따로 조회, True면 전체)
+        """
         try:
-            # 쿼리를 벡터로 변환
-            query_vector = self.model.encode(query).tolist()
+            # 쿼리를 벡터로 변환 (같은 질문은 공유 캐시에서 재사용)
+            query_vector = self.query_cache.get_or_compute(
+                self.model_name, query, lambda text: self.model.encode(text).tolist()
+            )
+            
+            # NumPy 인덱스가 있으면 Qdrant 대신 정확 검색 (dense만, 같은 날짜/링크 조건)
+            if self.vector_index is not None:
+                if self.chunked:
+                    # 한 게시글의 청크가 여러 개 나올 수 있어 넉넉히 뽑은 뒤 게시글마다 하나만 남김
+                    hits = self.vector_index.search(
+                        query_vector, limit * 8, date_from=date_from, date_to=date_to, links=links,
+                        date_field=date_field, with_payload=with_payload
+                    )
+                    return best_chunk_hits(hits, limit)
+                return self.vector_index.search(
+                    query_vector, limit, date_from=date_from, date_to=date_to, links=links,
+                    date_field=date_field, with_payload=with_payload
+                )
             
-            # 유사도 검색
+            query_filter = build_search_filter(date_from, date_to, links, date_field=date_field)
+            
+            # 청크 모드: 게시글(parent_id)마다 가장 잘 맞는 청크 하나씩 (하이브리드면 RRF로 합친 뒤 묶음)
+            if self.chunked:
+                groups = grouped_search(
+                    self.client, self.collection_name, query_vector,
+                    self.sparse_encoder.encode_query(query) if self.hybrid else None,
+                    limit=limit, query_filter=query_filter, with_payload=with_payload
+                )
+                return best_hit_per_group(groups)
+            
+            # 하이브리드: dense + 키워드 검색 결과를 서버에서 RRF로 합침
+            if self.hybrid:
+                return hybrid_search(
+                    self.client, self.collection_name, query_vector,
+                    self.sparse_encoder.encode_query(query),
+                    limit=limit, query_filter=query_filter, with_payload=with_payload
+                )
+            
+            # 유사도 검색 (날짜/링크 조건은 Qdrant에서 인덱스로 필터링)
             search_result = self.client.search(
                 collection_name=self.collection_name,
                 query_vector=query_vector,
+                query_filter=query_filter,
+                with_payload=with_payload,
                 limit=limit
             )
             
@@ -162,6 +369,33 @@ class QdrantStorage:
             logger.error(f"검색 실패: {e}")
             return []
     
+    def search_comments(self, query, limit=5, comments_per_post=3, date_from=None, date_to=None, links=None,
+                        date_field="post_timestamp"):
+        """
+        댓글 컬렉션에서 게시글마다 질문과 맞는 댓글 검색 (index_comments=True일 때만)
+        
+        Returns:
+            list: PointGroup 목록 (group.id = 게시글 포인트 ID, group.hits = 점수 순 댓글)
+        """
+        if self.comment_index is None:
+            return []
+        
+        try:
+            # 게시글 검색과 같은 임베딩이라 쿼리 벡터는 공유 캐시에서 재사용
+            query_vector = self.query_cache.get_or_compute(
+                self.model_name, query, lambda text: self.model.encode(text).tolist()
+            )
+        except Exception as e:
+            logger.error(f"댓글 검색 실패: {e}")
+            return []
+        
+        query_filter = build_search_filter(date_from, date_to, links, date_field=date_field)
+        return self.comment_index.search(query_vector, limit, comments_per_post, query_filter=query_filter)
+    
+    def get_full_documents(self, point_ids):
+        """화면에 보여줄 문서의 본문/댓글/분석 전문 조회 ({포인트 ID: 문서})"""
+        return fetch_full_documents(self.client, self.collection_name, self.document_store, point_ids)
+    
     def get_collection_info(self):
         """컬렉션 정보 조회"""
         try:
@@ -208,7 +442,7 @@ def main():
         # 컬렉션 정보 출력
         info = storage.get_collection_info()
         if info:
-            print(f"컬렉션 벡터 수: {info.vectors_count}")
+            print(f"컬렉션 포인트 수: {info.points_count}")
         
         # 검색 테스트
         print("\n=== 검색 테스트 ===")
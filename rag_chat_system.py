@@ -8,6 +8,7 @@ import os
 import logging
 from datetime import datetime
 from qdrant_storage import QdrantStorage, load_documents_from_json
+from qdrant_common import ANALYSIS_PREVIEW_CHARS, CONTENT_PREVIEW_CHARS, payload_preview
 from sentence_transformers import SentenceTransformer
 import requests
 from dotenv import load_dotenv
@@ -55,17 +56,19 @@ class RAGChatSystem:
             # 컬렉션 정보 출력
             info = self.storage.get_collection_info()
             if info:
-                print(f"📊 컬렉션 벡터 수: {info.vectors_count}")
+                print(f"📊 컬렉션 포인트 수: {info.points_count}")
             
             return True
         else:
             print("❌ Qdrant 저장 실패!")
             return False
     
-    def search_relevant_documents(self, query, limit=5):
-        """쿼리와 관련된 문서 검색"""
+    def search_relevant_documents(self, query, limit=5, date_from=None, date_to=None, links=None):
+        """쿼리와 관련된 문서 검색 (작성일 범위/링크 조건은 Qdrant에서 필터링)"""
         try:
-            results = self.storage.search_similar_documents(query, limit=limit)
+            results = self.storage.search_similar_documents(
+                query, limit=limit, date_from=date_from, date_to=date_to, links=links
+            )
             return results
         except Exception as e:
             logger.error(f"문서 검색 실패: {e}")
@@ -77,17 +80,20 @@ class RAGChatSystem:
             return ""
         
         context_parts = []
+        score_label = self.storage.score_label
         for i, result in enumerate(search_results, 1):
             payload = result.payload
+            # 청크로 검색된 게시글이면 질문과 가장 잘 맞은 부분을 함께 전달
+            chunk_line = f"관련 부분: {payload['chunk_text']}\n" if payload.get('chunk_text') else ""
             context_parts.append(f"""
-문서 {i} (유사도 점수: {result.score:.3f}):
+문서 {i} ({score_label}: {result.score:.3f}):
 제목: {payload['title']}
 링크: {payload['link']}
 작성일시: {payload.get('post_datetime', 'N/A')}
-내용: {payload.get('content', '')[:300]}...
-분석: {payload['analysis'][:500]}...
+내용: {payload_preview(payload, 'content', CONTENT_PREVIEW_CHARS)}...
+분석: {payload_preview(payload, 'analysis', ANALYSIS_PREVIEW_CHARS)}...
 댓글 수: {payload.get('comments_count', 0)}개
----""")
+{chunk_line}---""")
         
         return "\n".join(context_parts)
     
@@ -147,12 +153,14 @@ class RAGChatSystem:
             logger.error(f"Perplexity API 호출 실패: {e}")
             return f"응답 생성 중 오류가 발생했습니다: {e}"
     
-    def chat(self, query, max_documents=5):
-        """채팅 기능"""
+    def chat(self, query, max_documents=5, date_from=None, date_to=None, links=None):
+        """채팅 기능 (date_from/date_to: 작성일 범위, links: 특정 게시글만 참고)"""
         print(f"\n🔍 관련 문서 검색 중: '{query}'")
         
         # 관련 문서 검색
-        search_results = self.search_relevant_documents(query, limit=max_documents)
+        search_results = self.search_relevant_documents(
+            query, limit=max_documents, date_from=date_from, date_to=date_to, links=links
+        )
         
         if not search_results:
             return "죄송합니다. 관련된 문서를 찾을 수 없습니다."
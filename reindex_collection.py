@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+별칭(alias)을 이용한 무중단 재색인 스크립트
+새 버전 컬렉션(<별칭>_vYYYYMMDD_HHMMSS)을 만들어 인덱싱을 끈 채 대량 적재하고, HNSW 생성이 끝나면
+읽기용 별칭을 한 번의 요청으로 새 컬렉션으로 바꿈 (이전 컬렉션은 롤백용으로 남겨 둠)
+스키마/차원/양자화를 바꿀 때도 Streamlit 채팅은 계속 이전 컬렉션에서 검색함
+적재 중에 수집기가 이전 컬렉션에 저장한 문서는 별칭을 바꾸기 직전 따라잡기 단계에서 다시 옮김
+(따라잡기와 별칭 변경 사이 몇 초 동안 저장된 문서는 빠질 수 있으므로 수집 작업 중에는 돌리지 않는 것이 안전)
+"""
+
+import argparse
+import logging
+from datetime import datetime
+from itertools import chain
+from qdrant_client.models import (
+    CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation, FieldCondition, Filter, Range
+)
+from dotenv import load_dotenv
+from openai_qdrant_storage import FULL_EMBEDDING_DIMENSIONS, OpenAIQdrantStorage, load_documents_from_json
+from qdrant_common import (
+    QUANTIZATION_TYPES, collection_params, count_documents, count_points, documents_from_points, ensure_payload_indexes,
+    finish_bulk_load, get_qdrant_client, iter_scroll, resolve_alias, to_epoch
+)
+
+# 환경변수 로드
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def list_versions(client, alias_name):
+    """별칭 이름으로 시작하는 버전 컬렉션 목록 (오래된 것부터)"""
+    prefix = f"{alias_name}_v"
+    return sorted(col.name for col in client.get_collections().collections if col.name.startswith(prefix))
+
+
+def switch_alias(client, alias_name, collection_name):
+    """별칭을 collection_name으로 바꿈 (삭제+생성을 한 요청으로 보내 중간에 비는 순간이 없음)"""
+    operations = []
+    if resolve_alias(client, alias_name):
+        operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias_name)))
+    operations.append(CreateAliasOperation(
+        create_alias=CreateAlias(collection_name=collection_name, alias_name=alias_name)
+    ))
+    client.update_collection_aliases(change_aliases_operations=operations)
+    logger.info(f"별칭 '{alias_name}' -> '{collection_name}'")
+
+
+def iter_source_documents(client, source_name, document_store, page_size=256, scroll_filter=None):
+    """기존 컬렉션의 포인트를 문서로 복원하며 하나씩 반환 (재수집 없이 다시 임베딩)"""
+    for points, _ in iter_scroll(client, source_name, page_size=page_size, with_payload=True,
+                                 scroll_filter=scroll_filter):
+        yield from documents_from_points(points, document_store)
+
+
+def collected_since_filter(started_at):
+    """started_at 날짜 이후 수집된 문서 필터 (collected_timestamp는 날짜 단위라 그날 0시부터)"""
+    return Filter(must=[
+        FieldCondition(key="collected_timestamp", range=Range(gte=to_epoch(started_at.date())))
+    ])
+
+
+def reindex_collection(alias_name="theqoo_documents_openai", json_files=None, dimensions=FULL_EMBEDDING_DIMENSIONS,
+                       quantization=None, on_disk=False, hnsw_m=None, hnsw_ef_construct=None, hybrid=True,
+                       document_store_path="document_store.db", upsert_chunk_size=512, upsert_parallel=8,
+                       replace_collection=False, chunked=False):
+    """
+    새 버전 컬렉션을 만들어 적재한 뒤 별칭을 바꿈
+
+    Args:
+        alias_name (str): 검색/저장 코드가 사용하는 이름 (별칭)
+        json_files (list): 문서를 읽을 JSON 파일 (None이면 지금 별칭이 가리키는 컬렉션에서 복원)
+        dimensions, quantization, on_disk, hnsw_m, hnsw_ef_construct, hybrid: 새 컬렉션 설정
+        replace_collection (bool): alias_name이 별칭이 아닌 실제 컬렉션이면 적재/검증 후 삭제하고 별칭으로 바꿈
+                                   (처음 한 번만 필요, 이 컬렉션은 롤백할 수 없음)
+        chunked (bool): 게시글을 겹치는 청크 여러 개로 저장 (검색 시 게시글 단위로 묶음)
+
+    Returns:
+        str: 새 컬렉션 이름 (실패하면 None)
+    """
+    client = get_qdrant_client()
+
+    try:
+        current = resolve_alias(client, alias_name)
+        legacy = current is None and alias_name in [col.name for col in client.get_collections().collections]
+        if legacy and not replace_collection:
+            logger.error(
+                f"'{alias_name}'은 별칭이 아닌 컬렉션입니다. 처음 한 번은 --replace-collection으로 "
+                f"적재 후 이 컬렉션을 삭제하고 별칭으로 바꿔야 합니다"
+            )
+            return None
+        source_name = current or (alias_name if legacy else None)
+        started_at = datetime.now()
+
+        new_name = f"{alias_name}_v{datetime.now():%Y%m%d_%H%M%S}"
+        logger.info(f"새 컬렉션 '{new_name}' 생성 (원본: {source_name or '없음'}, {dimensions}차원, 양자화: {quantization or '없음'})")
+
+        # 대량 적재 중에는 HNSW 인덱싱을 끄고 적재 후 한 번에 생성
+        client.create_collection(
+            collection_name=new_name,
+            **collection_params(
+                dimensions,
+                quantization=quantization,
+                on_disk=on_disk,
+                hnsw_m=hnsw_m,
+                hnsw_ef_construct=hnsw_ef_construct,
+                sparse=hybrid,
+                bulk_load=True
+            )
+        )
+        ensure_payload_indexes(client, new_name)
+
+        storage = OpenAIQdrantStorage(
+            collection_name=new_name,
+            embedding_dimensions=dimensions,
+            quantization=quantization,
+            on_disk_vectors=on_disk,
+            hybrid=hybrid,
+            document_store_path=document_store_path,
+            chunked=chunked
+        )
+
+        if json_files:
+            documents = chain.from_iterable(load_documents_from_json(filename) for filename in json_files)
+        elif source_name:
+            documents = iter_source_documents(client, source_name, storage.document_store)
+        else:
+            logger.error("문서를 가져올 JSON 파일이나 기존 컬렉션이 없습니다")
+            return None
+
+        # 새 컬렉션은 비어 있으므로 변경 여부 확인 없이 모두 저장
+        if not storage.store_documents(
+            documents, skip_unchanged=False,
+            upsert_chunk_size=upsert_chunk_size, upsert_parallel=upsert_parallel
+        ):
+            logger.error(f"'{new_name}' 적재 실패, 별칭은 그대로 둡니다 (컬렉션은 확인용으로 남김)")
+            return None
+
+        logger.info("적재 완료, HNSW 인덱스 생성 대기 중...")
+        if not finish_bulk_load(client, new_name):
+            logger.warning("인덱스 생성이 시간 안에 끝나지 않았습니다 (검색은 가능하지만 느릴 수 있음)")
+
+        source_count = None
+        if source_name:
+            # 적재하는 동안 수집기가 기존 컬렉션에 저장한 문서 따라잡기 (이미 옮긴 문서는 doc_hash로 건너뜀)
+            since_filter = collected_since_filter(started_at)
+            recent_count = count_points(client, source_name, count_filter=since_filter)
+            logger.info(f"{started_at:%Y-%m-%d} 이후 수집된 포인트 {recent_count}개 따라잡기")
+            if recent_count and not storage.store_documents(
+                iter_source_documents(client, source_name, storage.document_store, scroll_filter=since_filter),
+                skip_unchanged=True, upsert_chunk_size=upsert_chunk_size, upsert_parallel=upsert_parallel
+            ):
+                logger.error(f"'{new_name}' 따라잡기 실패, 별칭은 그대로 둡니다")
+                return None
+
+            source_count = count_documents(client, source_name)
+            new_count = count_documents(client, new_name)
+            logger.info(f"게시글 수: 기존 {source_count}개 -> 새 컬렉션 {new_count}개")
+            if new_count < source_count:
+                logger.warning(f"새 컬렉션의 게시글이 {source_count - new_count}개 적습니다")
+
+        if legacy:
+            return replace_legacy_collection(client, alias_name, new_name, source_count)
+
+        switch_alias(client, alias_name, new_name)
+        return new_name
+
+    except Exception as e:
+        logger.error(f"재색인 실패: {e}")
+        return None
+
+
+def replace_legacy_collection(client, alias_name, new_name, source_count):
+    """
+    별칭과 같은 이름의 기존 컬렉션을 삭제하고 그 이름의 별칭을 새 컬렉션에 만듦
+    같은 이름의 컬렉션과 별칭은 함께 있을 수 없어 한 요청으로 바꿀 수 없으므로,
+    새 컬렉션에 기존 게시글이 모두 있는지 확인한 뒤에만 삭제하고 실패하면 복구 명령을 남김
+    """
+    new_count = count_documents(client, new_name)
+    if new_count < source_count:
+        logger.error(
+            f"새 컬렉션 '{new_name}'의 게시글({new_count}개)이 기존 '{alias_name}'({source_count}개)보다 적어 "
+            f"기존 컬렉션을 삭제하지 않습니다"
+        )
+        return None
+
+    recovery = f"python reindex_collection.py --alias {alias_name} --rollback {new_name}"
+    logger.info(f"기존 컬렉션 '{alias_name}' 삭제 후 별칭 생성 (중간에 실패하면 복구: {recovery})")
+    client.delete_collection(alias_name)
+    logger.info(f"기존 컬렉션 '{alias_name}' 삭제")
+
+    try:
+        switch_alias(client, alias_name, new_name)
+    except Exception as e:
+        logger.error(
+            f"별칭 생성 실패: {e} - 데이터는 '{new_name}'에 그대로 있으니 다음 명령으로 별칭을 만드세요: {recovery}"
+        )
+        return None
+    return new_name
+
+
+def rollback(alias_name, target=None):
+    """별칭을 이전 버전(또는 target) 컬렉션으로 되돌림"""
+    client = get_qdrant_client()
+
+    try:
+        current = resolve_alias(client, alias_name)
+        versions = list_versions(client, alias_name)
+        if target is None:
+            older = [name for name in versions if current is None or name < current]
+            if not older:
+                logger.error("되돌릴 이전 버전이 없습니다")
+                return False
+            target = older[-1]
+        elif target not in versions:
+            logger.error(f"'{target}'은 '{alias_name}'의 버전 컬렉션이 아닙니다")
+            return False
+
+        switch_alias(client, alias_name, target)
+        return True
+
+    except Exception as e:
+        logger.error(f"롤백 실패: {e}")
+        return False
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='별칭을 이용한 무중단 재색인')
+    parser.add_argument('--alias', default='theqoo_documents_openai', help='검색/저장에 쓰는 별칭 이름')
+    parser.add_argument('--json', nargs='+', default=None, help='문서를 읽을 JSON 파일 (기본: 현재 컬렉션에서 복원)')
+    parser.add_argument('--dimensions', type=int, default=FULL_EMBEDDING_DIMENSIONS, help='임베딩 차원')
+    parser.add_argument('--quantization', choices=QUANTIZATION_TYPES, default=None, help='양자화 방식')
+    parser.add_argument('--on-disk', action='store_true', help='원본 벡터를 디스크에 저장')
+    parser.add_argument('--hnsw-m', type=int, default=None, help='HNSW m')
+    parser.add_argument('--hnsw-ef-construct', type=int, default=None, help='HNSW ef_construct')
+    parser.add_argument('--no-hybrid', action='store_true', help='BM25 희소 벡터 없이 생성')
+    parser.add_argument('--chunked', action='store_true', help='게시글을 본문/분석/댓글 청크 여러 개로 저장')
+    parser.add_argument('--replace-collection', action='store_true',
+                        help='별칭 이름이 실제 컬렉션이면 적재 후 삭제하고 별칭으로 바꿈 (처음 한 번)')
+    parser.add_argument('--list', action='store_true', help='버전 컬렉션과 현재 별칭 대상 출력')
+    parser.add_argument('--rollback', nargs='?', const='', default=None,
+                        help='별칭을 이전 버전(또는 지정한 컬렉션)으로 되돌림')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.list:
+        client = get_qdrant_client()
+        current = resolve_alias(client, args.alias)
+        print(f"별칭 '{args.alias}' -> {current or '없음'}")
+        for name in list_versions(client, args.alias):
+            print(f"{'*' if name == current else ' '} {name}")
+        return
+
+    if args.rollback is not None:
+        if rollback(args.alias, args.rollback or None):
+            print(f"✅ 롤백 완료: '{args.alias}' -> '{resolve_alias(get_qdrant_client(), args.alias)}'")
+        else:
+            print("❌ 롤백 실패!")
+        return
+
+    new_name = reindex_collection(
+        args.alias,
+        json_files=args.json,
+        dimensions=args.dimensions,
+        quantization=args.quantization,
+        on_disk=args.on_disk,
+        hnsw_m=args.hnsw_m,
+        hnsw_ef_construct=args.hnsw_ef_construct,
+        hybrid=not args.no_hybrid,
+        replace_collection=args.replace_collection,
+        chunked=args.chunked
+    )
+
+    if new_name:
+        print(f"\n✅ 재색인 완료: '{args.alias}' -> '{new_name}' (이전 컬렉션은 롤백용으로 유지)")
+    else:
+        print("\n❌ 재색인 실패! 별칭은 바뀌지 않았습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,9 +22,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class TheqooScheduler:
-    def __init__(self):
+    def __init__(self, qdrant_location=None):
         self.workflow = TheqooWorkflow()
-        self.storage = QdrantStorage()
+        self.storage = QdrantStorage(location=qdrant_location)
         
     def daily_job(self):
         """하루에 한 번 실행되는 작업"""
@@ -35,9 +35,13 @@ class TheqooScheduler:
             logger.info("1단계: 워크플로우 실행")
             documents = self.workflow.run_workflow(page_num=2, start_idx=5, end_idx=15)
             
-            if not documents:
-                logger.error("문서 생성 실패")
+            # 수집/분류 실패는 None, 이미 처리한 게시글만 있어 새 문서가 없으면 []
+            if documents is None:
+                logger.error("워크플로우 실행 실패")
                 return False
+            if not documents:
+                logger.info("새로 수집되었거나 변경된 문서가 없습니다.")
+                return True
             
             # 2. JSON 파일로 저장
             logger.info("2단계: JSON 파일 저장")
@@ -52,12 +56,14 @@ class TheqooScheduler:
             success = self.storage.store_documents(documents)
             
             if success:
-                logger.info(f"=== 작업 완료: {len(documents)}개 문서 처리됨 ===")
+                # 저장이 끝난 게시글만 기록 (실패하면 다음 실행에서 다시 수집/저장)
+                recorded = self.workflow.commit_pending_crawls()
+                logger.info(f"=== 작업 완료: {len(documents)}개 문서 처리됨 (게시글 기록 {recorded}개) ===")
                 
                 # 컬렉션 정보 출력
                 info = self.storage.get_collection_info()
                 if info:
-                    logger.info(f"Qdrant 컬렉션 벡터 수: {info.vectors_count}")
+                    logger.info(f"Qdrant 컬렉션 포인트 수: {info.points_count}")
                 
                 return True
             else:
@@ -76,13 +82,20 @@ class TheqooScheduler:
             # 적은 수의 문서로 테스트
             documents = self.workflow.run_workflow(page_num=2, start_idx=5, end_idx=8)
             
-            if documents:
-                saved_file = self.workflow.save_documents(documents, "test_documents.json")
-                success = self.storage.store_documents(documents)
-                
-                if success:
-                    logger.info(f"테스트 완료: {len(documents)}개 문서")
-                    return True
+            if documents is None:
+                logger.error("테스트 워크플로우 실행 실패")
+                return False
+            if not documents:
+                logger.info("테스트 완료: 새로 수집되었거나 변경된 문서 없음")
+                return True
+            
+            saved_file = self.workflow.save_documents(documents, "test_documents.json")
+            success = self.storage.store_documents(documents)
+            
+            if success:
+                self.workflow.commit_pending_crawls()
+                logger.info(f"테스트 완료: {len(documents)}개 문서")
+                return True
             
             return False
             
@@ -113,9 +126,9 @@ class TheqooScheduler:
         except KeyboardInterrupt:
             logger.info("스케줄러 종료됨")
 
-def manual_run():
+def manual_run(qdrant_location=None):
     """수동 실행 함수"""
-    scheduler = TheqooScheduler()
+    scheduler = TheqooScheduler(qdrant_location)
     success = scheduler.daily_job()
     
     if success:
@@ -123,16 +136,16 @@ def manual_run():
     else:
         print("수동 실행 실패!")
 
-def check_qdrant_status():
+def check_qdrant_status(qdrant_location=None):
     """Qdrant 상태 확인"""
     try:
-        storage = QdrantStorage()
+        storage = QdrantStorage(location=qdrant_location)
         info = storage.get_collection_info()
         
         if info:
             print(f"Qdrant 컬렉션 정보:")
             print(f"- 이름: {info.name}")
-            print(f"- 벡터 수: {info.vectors_count}")
+            print(f"- 포인트 수: {info.points_count}")
             print(f"- 상태: {info.status}")
         else:
             print("Qdrant 연결 실패")
@@ -140,11 +153,11 @@ def check_qdrant_status():
     except Exception as e:
         print(f"Qdrant 상태 확인 실패: {e}")
 
-def search_documents(query, limit=5):
-    """문서 검색"""
+def search_documents(query, limit=5, date_from=None, date_to=None, qdrant_location=None):
+    """문서 검색 (date_from/date_to: 작성일 범위, 예: 2025-07-01)"""
     try:
-        storage = QdrantStorage()
-        results = storage.search_similar_documents(query, limit)
+        storage = QdrantStorage(location=qdrant_location)
+        results = storage.search_similar_documents(query, limit, date_from=date_from, date_to=date_to)
         
         print(f"\n'{query}' 검색 결과:")
         for i, result in enumerate(results, 1):
@@ -165,24 +178,29 @@ def main():
                        default='manual', help='실행 모드')
     parser.add_argument('--query', type=str, help='검색 쿼리 (search 모드에서 사용)')
     parser.add_argument('--limit', type=int, default=5, help='검색 결과 수 (search 모드에서 사용)')
+    parser.add_argument('--date-from', type=str, help='작성일 범위 시작, 예: 2025-07-01 (search 모드에서 사용)')
+    parser.add_argument('--date-to', type=str, help='작성일 범위 끝, 예: 2025-07-31 (search 모드에서 사용)')
+    parser.add_argument('--qdrant-path', type=str, default=None,
+                       help='Qdrant 서버 대신 로컬 모드 사용: 저장 경로 또는 :memory: (기본: QDRANT_LOCAL_PATH 환경변수)')
     
     args = parser.parse_args()
     
     if args.mode == 'scheduler':
-        scheduler = TheqooScheduler()
+        scheduler = TheqooScheduler(args.qdrant_path)
         scheduler.run_scheduler()
     elif args.mode == 'manual':
-        manual_run()
+        manual_run(args.qdrant_path)
     elif args.mode == 'test':
-        scheduler = TheqooScheduler()
+        scheduler = TheqooScheduler(args.qdrant_path)
         scheduler.run_scheduler(test_mode=True)
     elif args.mode == 'status':
-        check_qdrant_status()
+        check_qdrant_status(args.qdrant_path)
     elif args.mode == 'search':
         if not args.query:
             print("검색 쿼리를 입력해주세요: --query '검색어'")
             return
-        search_documents(args.query, args.limit)
+        search_documents(args.query, args.limit, date_from=args.date_from, date_to=args.date_to,
+                         qdrant_location=args.qdrant_path)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
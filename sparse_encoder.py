@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+한국어 게시글용 BM25 희소 벡터 인코더
+형태소 분석기 없이 단어 안의 글자 n-gram을 토큰으로 사용하여 이름/신조어도 부분 일치로 찾을 수 있게 함
+IDF는 Qdrant 컬렉션의 Modifier.IDF로 서버에서 계산하고, 여기서는 BM25의 TF 부분만 계산
+"""
+
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+from qdrant_client.models import SparseVector
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def char_ngrams(text, ngram_range=(2, 3)):
+    """단어마다 글자 n-gram 생성 (n보다 짧은 단어는 단어 그대로 사용)"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    min_n, max_n = ngram_range
+    tokens = []
+
+    for word in WORD_PATTERN.findall(text):
+        if len(word) < min_n:
+            tokens.append(word)
+            continue
+        for n in range(min_n, min(max_n, len(word)) + 1):
+            tokens.extend(word[i:i + n] for i in range(len(word) - n + 1))
+
+    return tokens
+
+
+def token_index(token):
+    """토큰을 희소 벡터 인덱스(uint32)로 변환 (프로세스가 달라도 같은 값)"""
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+class SparseTextEncoder:
+    def __init__(self, k1=1.2, b=0.75, avg_len=256, ngram_range=(2, 3)):
+        """
+        Args:
+            k1 (float): BM25 단어 빈도 포화 정도
+            b (float): BM25 문서 길이 정규화 정도
+            avg_len (int): 평균 문서 토큰 수 (BM25 길이 정규화 기준값)
+            ngram_range (tuple): 글자 n-gram 길이 범위
+        """
+        self.k1 = k1
+        self.b = b
+        self.avg_len = avg_len
+        self.ngram_range = ngram_range
+
+    def _counts(self, text):
+        """인덱스별 토큰 수 (해시 충돌은 합산)"""
+        tokens = char_ngrams(text, self.ngram_range)
+        counts = Counter()
+        for token, count in Counter(tokens).items():
+            counts[token_index(token)] += count
+        return counts, len(tokens)
+
+    def encode_document(self, text):
+        """문서용 희소 벡터 (BM25 TF 가중치)"""
+        counts, doc_len = self._counts(text)
+        norm = self.k1 * (1 - self.b + self.b * doc_len / self.avg_len)
+        indices = sorted(counts)
+        values = [counts[idx] * (self.k1 + 1) / (counts[idx] + norm) for idx in indices]
+        return SparseVector(indices=indices, values=values)
+
+    def encode_query(self, text):
+        """쿼리용 희소 벡터 (토큰마다 1, IDF는 Qdrant가 곱함)"""
+        counts, _ = self._counts(text)
+        indices = sorted(counts)
+        return SparseVector(indices=indices, values=[1.0] * len(indices))
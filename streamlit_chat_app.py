@@ -8,8 +8,10 @@ import streamlit as st
 import json
 import os
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from qdrant_storage import QdrantStorage, load_documents_from_json
+from qdrant_common import ANALYSIS_PREVIEW_CHARS, CONTENT_PREVIEW_CHARS, payload_preview
+from embedding_cache import query_vector_cache
 from sentence_transformers import SentenceTransformer
 import requests
 from dotenv import load_dotenv
@@ -22,14 +24,14 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class StreamlitRAGChat:
-    def __init__(self, collection_name="theqoo_documents"):
-        """Streamlit RAG 채팅 시스템 초기화"""
+    def __init__(self, collection_name="theqoo_documents", qdrant_location=None):
+        """Streamlit RAG 채팅 시스템 초기화 (qdrant_location: 로컬 모드 경로 또는 ":memory:")"""
         self.collection_name = collection_name
         self.perplexity_api_key = os.getenv('PERPLEXITY_API_KEY')
         
         # Qdrant 스토리지 초기화
         try:
-            self.storage = QdrantStorage(collection_name=collection_name)
+            self.storage = QdrantStorage(collection_name=collection_name, location=qdrant_location)
             st.success("✅ Qdrant 연결 성공!")
         except Exception as e:
             st.error(f"❌ Qdrant 연결 실패: {e}")
@@ -60,7 +62,7 @@ class StreamlitRAGChat:
                 # 컬렉션 정보 출력
                 info = self.storage.get_collection_info()
                 if info:
-                    st.info(f"📊 컬렉션 벡터 수: {info.vectors_count}")
+                    st.info(f"📊 컬렉션 포인트 수: {info.points_count}")
                 
                 return True
             else:
@@ -71,13 +73,15 @@ class StreamlitRAGChat:
             st.error(f"❌ 파일 처리 중 오류: {e}")
             return False
     
-    def search_relevant_documents(self, query, limit=5):
-        """쿼리와 관련된 문서 검색"""
+    def search_relevant_documents(self, query, limit=5, date_from=None, date_to=None, links=None):
+        """쿼리와 관련된 문서 검색 (작성일 범위/링크 조건은 Qdrant에서 필터링)"""
         if not self.storage:
             return []
         
         try:
-            results = self.storage.search_similar_documents(query, limit=limit)
+            results = self.storage.search_similar_documents(
+                query, limit=limit, date_from=date_from, date_to=date_to, links=links
+            )
             return results
         except Exception as e:
             logger.error(f"문서 검색 실패: {e}")
@@ -89,17 +93,20 @@ class StreamlitRAGChat:
             return ""
         
         context_parts = []
+        score_label = self.storage.score_label
         for i, result in enumerate(search_results, 1):
             payload = result.payload
+            # 청크로 검색된 게시글이면 질문과 가장 잘 맞은 부분을 함께 전달
+            chunk_line = f"관련 부분: {payload['chunk_text']}\n" if payload.get('chunk_text') else ""
             context_parts.append(f"""
-문서 {i} (유사도 점수: {result.score:.3f}):
+문서 {i} ({score_label}: {result.score:.3f}):
 제목: {payload['title']}
 링크: {payload['link']}
 작성일시: {payload.get('post_datetime', 'N/A')}
-내용: {payload.get('content', '')[:300]}...
-분석: {payload['analysis'][:500]}...
+내용: {payload_preview(payload, 'content', CONTENT_PREVIEW_CHARS)}...
+분석: {payload_preview(payload, 'analysis', ANALYSIS_PREVIEW_CHARS)}...
 댓글 수: {payload.get('comments_count', 0)}개
----""")
+{chunk_line}---""")
         
         return "\n".join(context_parts)
     
@@ -159,13 +166,15 @@ class StreamlitRAGChat:
             logger.error(f"Perplexity API 호출 실패: {e}")
             return f"응답 생성 중 오류가 발생했습니다: {e}"
     
-    def chat(self, query, max_documents=5):
-        """채팅 기능"""
+    def chat(self, query, max_documents=5, date_from=None, date_to=None, links=None):
+        """채팅 기능 (date_from/date_to: 작성일 범위, links: 특정 게시글만 참고)"""
         if not self.storage:
             return "Qdrant 연결이 설정되지 않았습니다."
         
         # 관련 문서 검색
-        search_results = self.search_relevant_documents(query, limit=max_documents)
+        search_results = self.search_relevant_documents(
+            query, limit=max_documents, date_from=date_from, date_to=date_to, links=links
+        )
         
         if not search_results:
             return "죄송합니다. 관련된 문서를 찾을 수 없습니다."
@@ -193,6 +202,15 @@ def main():
     with st.sidebar:
         st.header("⚙️ 설정")
         
+        # Qdrant 백엔드 (로컬 모드는 서버 없이 이 프로세스 안에서 저장/검색)
+        backends = ["서버 (QDRANT_URL)", "로컬 파일", "메모리"]
+        backend = st.radio("Qdrant 백엔드", backends, index=1 if os.getenv("QDRANT_LOCAL_PATH") else 0)
+        qdrant_location = ""
+        if backend == "로컬 파일":
+            qdrant_location = st.text_input("로컬 저장 경로", os.getenv("QDRANT_LOCAL_PATH") or "qdrant_local")
+        elif backend == "메모리":
+            qdrant_location = ":memory:"
+        
         # JSON 파일 선택
         json_files = []
         for file in os.listdir('.'):
@@ -207,7 +225,7 @@ def main():
             )
             
             if st.button("📁 데이터 로드 및 저장"):
-                rag_system = StreamlitRAGChat()
+                rag_system = StreamlitRAGChat(qdrant_location=qdrant_location)
                 success = rag_system.load_and_store_json(selected_file)
                 
                 if success:
@@ -220,12 +238,25 @@ def main():
         st.header("🔍 검색 설정")
         max_documents = st.slider("최대 검색 문서 수", 1, 10, 5)
         
+        # 작성일 범위 필터 (Qdrant 페이로드 인덱스로 서버에서 필터링)
+        date_from, date_to = None, None
+        if st.checkbox("작성일 범위로 검색", value=False):
+            today = datetime.now().date()
+            date_range = st.date_input("작성일 범위", (today - timedelta(days=7), today))
+            if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
+                date_from, date_to = date_range
+        
         # API 키 상태 확인
         st.header("🔑 API 상태")
         if os.getenv('PERPLEXITY_API_KEY'):
             st.success("✅ Perplexity API 키 설정됨")
         else:
             st.error("❌ Perplexity API 키가 설정되지 않음")
+        
+        # 쿼리 임베딩 캐시 상태 (모든 세션 공유)
+        st.header("⚡ 쿼리 캐시")
+        cache_stats = query_vector_cache.stats()
+        st.caption(f"적중률 {cache_stats['hit_rate']:.1%} (적중 {cache_stats['hits']}회, 미스 {cache_stats['misses']}회, {cache_stats['size']}개 보관)")
     
     # 메인 채팅 인터페이스
     if 'messages' not in st.session_state:
@@ -265,23 +296,34 @@ def main():
             # 응답 생성
             with st.chat_message("assistant"):
                 with st.spinner("🤖 응답 생성 중..."):
-                    response, search_results = st.session_state.rag_system.chat(prompt, max_documents)
+                    response, search_results = st.session_state.rag_system.chat(
+                        prompt, max_documents, date_from=date_from, date_to=date_to
+                    )
                     st.markdown(response)
                 
                 # 검색 결과 표시 (접을 수 있는 섹션)
                 if search_results:
                     with st.expander(f"🔍 관련 문서 ({len(search_results)}개)"):
+                        # 본문 전문은 화면에 보여줄 문서만 문서 저장소에서 조회
+                        full_documents = st.session_state.rag_system.storage.get_full_documents(
+                            [result.id for result in search_results]
+                        )
+                        score_label = st.session_state.rag_system.storage.score_label
                         for i, result in enumerate(search_results, 1):
                             payload = result.payload
+                            full_document = full_documents.get(str(result.id), {})
                             st.markdown(f"""
-                            **문서 {i}** (유사도: {result.score:.3f})
+                            **문서 {i}** ({score_label}: {result.score:.3f})
                             - **제목**: {payload['title']}
                             - **링크**: {payload['link']}
                             - **작성일시**: {payload.get('post_datetime', 'N/A')}
                             - **댓글 수**: {payload.get('comments_count', 0)}개
                             """)
-                            st.markdown(f"**내용 미리보기**: {payload.get('content', '')[:200]}...")
-                            st.markdown(f"**분석**: {payload['analysis'][:300]}...")
+                            # 전문을 가져오지 못한 문서는 페이로드 미리보기로 표시
+                            content = full_document.get('content') or payload_preview(payload, 'content', CONTENT_PREVIEW_CHARS)
+                            analysis = full_document.get('analysis') or payload_preview(payload, 'analysis', ANALYSIS_PREVIEW_CHARS)
+                            st.markdown(f"**내용**: {content}")
+                            st.markdown(f"**분석**: {analysis}")
                             st.divider()
             
             # 어시스턴트 메시지 추가
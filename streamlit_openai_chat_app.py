@@ -8,8 +8,11 @@ import streamlit as st
 import json
 import os
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from comment_index import comment_context
 from openai_qdrant_storage import OpenAIQdrantStorage, load_documents_from_json
+from qdrant_common import ANALYSIS_PREVIEW_CHARS, CONTENT_PREVIEW_CHARS, count_points, payload_preview
+from embedding_cache import query_vector_cache
 import requests
 from dotenv import load_dotenv
 
@@ -21,10 +24,14 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class StreamlitOpenAIRAGChat:
-    def __init__(self, collection_name="theqoo_documents_openai"):
-        """Streamlit OpenAI RAG 채팅 시스템 초기화"""
+    def __init__(self, collection_name="theqoo_documents_openai", qdrant_location=None, index_comments=False):
+        """
+        Streamlit OpenAI RAG 채팅 시스템 초기화 (qdrant_location: 로컬 모드 경로 또는 ":memory:")
+        index_comments면 댓글 단위 컬렉션도 저장/검색하여 답변에 관련 댓글을 인용
+        """
         self.collection_name = collection_name
         self.perplexity_api_key = os.getenv('PERPLEXITY_API_KEY')
+        self.last_comment_groups = []
         
         # OpenAI API 키 확인
         if not os.getenv('OPENAI_API_KEY'):
@@ -34,7 +41,9 @@ class StreamlitOpenAIRAGChat:
         
         # OpenAI Qdrant 스토리지 초기화
         try:
-            self.storage = OpenAIQdrantStorage(collection_name=collection_name)
+            self.storage = OpenAIQdrantStorage(
+                collection_name=collection_name, location=qdrant_location, index_comments=index_comments
+            )
             st.success("✅ OpenAI Qdrant 연결 성공! (text-embedding-3-small)")
         except Exception as e:
             st.error(f"❌ OpenAI Qdrant 연결 실패: {e}")
@@ -65,7 +74,7 @@ class StreamlitOpenAIRAGChat:
                 # 컬렉션 정보 출력
                 info = self.storage.get_collection_info()
                 if info:
-                    st.info(f"📊 컬렉션 벡터 수: {info.vectors_count}")
+                    st.info(f"📊 컬렉션 포인트 수: {info.points_count}")
                 
                 return True
             else:
@@ -76,13 +85,15 @@ class StreamlitOpenAIRAGChat:
             st.error(f"❌ 파일 처리 중 오류: {e}")
             return False
     
-    def search_relevant_documents(self, query, limit=5):
-        """쿼리와 관련된 문서 검색"""
+    def search_relevant_documents(self, query, limit=5, date_from=None, date_to=None, links=None):
+        """쿼리와 관련된 문서 검색 (작성일 범위/링크 조건은 Qdrant에서 필터링)"""
         if not self.storage:
             return []
         
         try:
-            results = self.storage.search_similar_documents(query, limit=limit)
+            results = self.storage.search_similar_documents(
+                query, limit=limit, date_from=date_from, date_to=date_to, links=links
+            )
             return results
         except Exception as e:
             logger.error(f"문서 검색 실패: {e}")
@@ -94,20 +105,23 @@ class StreamlitOpenAIRAGChat:
             return ""
         
         context_parts = []
+        score_label = self.storage.score_label
         for i, result in enumerate(search_results, 1):
             payload = result.payload
-            content_preview = payload.get('content', '')[:300] if payload.get('content') else '내용 없음'
-            analysis_preview = payload.get('analysis', '')[:500] if payload.get('analysis') else '분석 없음'
+            # 청크로 검색된 게시글이면 질문과 가장 잘 맞은 부분을 함께 전달
+            chunk_line = f"관련 부분: {payload['chunk_text']}\n" if payload.get('chunk_text') else ""
+            content_preview = payload_preview(payload, 'content', CONTENT_PREVIEW_CHARS) or '내용 없음'
+            analysis_preview = payload_preview(payload, 'analysis', ANALYSIS_PREVIEW_CHARS) or '분석 없음'
             
             context_parts.append(f"""
-문서 {i} (유사도 점수: {result.score:.3f}):
+문서 {i} ({score_label}: {result.score:.3f}):
 제목: {payload['title']}
 링크: {payload['link']}
 작성일시: {payload.get('post_datetime', 'N/A')}
 내용: {content_preview}...
 분석: {analysis_preview}...
 댓글 수: {payload.get('comments_count', 0)}개
----""")
+{chunk_line}---""")
         
         return "\n".join(context_parts)
     
@@ -167,13 +181,15 @@ class StreamlitOpenAIRAGChat:
             logger.error(f"Perplexity API 호출 실패: {e}")
             return f"응답 생성 중 오류가 발생했습니다: {e}"
     
-    def chat(self, query, max_documents=5):
-        """채팅 기능"""
+    def chat(self, query, max_documents=5, date_from=None, date_to=None, links=None):
+        """채팅 기능 (date_from/date_to: 작성일 범위, links: 특정 게시글만 참고)"""
         if not self.storage:
             return "OpenAI Qdrant 연결이 설정되지 않았습니다.", []
         
         # 관련 문서 검색
-        search_results = self.search_relevant_documents(query, limit=max_documents)
+        search_results = self.search_relevant_documents(
+            query, limit=max_documents, date_from=date_from, date_to=date_to, links=links
+        )
         
         if not search_results:
             return "죄송합니다. 관련된 문서를 찾을 수 없습니다.", []
@@ -181,6 +197,13 @@ class StreamlitOpenAIRAGChat:
         # 컨텍스트 생성
         context = self.create_context_from_documents(search_results)
         
+        # 댓글 단위 검색: 게시글마다 질문과 맞는 댓글을 원문 그대로 인용하도록 전달
+        self.last_comment_groups = self.storage.search_comments(
+            query, limit=max_documents, date_from=date_from, date_to=date_to, links=links
+        )
+        if self.last_comment_groups:
+            context += f"\n\n=== 관련 댓글 (번호와 원문을 인용) ===\n{comment_context(self.last_comment_groups)}"
+        
         # 응답 생성
         response = self.generate_response_with_perplexity(query, context)
         
@@ -192,42 +215,14 @@ class StreamlitOpenAIRAGChat:
             return False, 0
         
         try:
-            # 컬렉션 정보 확인
-            info = self.storage.get_collection_info()
-            if not info:
-                logger.error("컬렉션 정보를 가져올 수 없습니다.")
-                return False, 0
-            
-            # points_count 확인 (vectors_count가 None이어도 points_count로 판단)
-            if hasattr(info, 'points_count') and info.points_count is not None and info.points_count > 0:
-                logger.info(f"컬렉션에 {info.points_count}개의 포인트가 있습니다.")
-                return True, info.points_count
+            # count API 한 번으로 정확한 포인트 수 확인 (vectors_count는 None일 수 있음)
+            points_count = count_points(self.storage.client, self.collection_name)
+            if points_count > 0:
+                logger.info(f"컬렉션에 {points_count}개의 포인트가 있습니다.")
+                return True, points_count
             
-            # vectors_count 확인 (백업)
-            if hasattr(info, 'vectors_count') and info.vectors_count is not None and info.vectors_count > 0:
-                logger.info(f"vectors_count로 판단: {info.vectors_count}개")
-                return True, info.vectors_count
-            
-            # 실제 데이터가 있는지 확인 (scroll로 실제 포인트 조회)
-            try:
-                points = self.storage.client.scroll(
-                    collection_name=self.collection_name,
-                    limit=1,
-                    with_payload=False,
-                    with_vectors=False
-                )
-                actual_points = len(points[0]) if points and len(points) > 0 else 0
-                
-                if actual_points > 0:
-                    logger.info(f"컬렉션에 {actual_points}개의 실제 포인트가 있습니다.")
-                    return True, actual_points
-                else:
-                    logger.warning("컬렉션에 실제 포인트가 없습니다.")
-                    return False, 0
-                    
-            except Exception as scroll_error:
-                logger.error(f"포인트 조회 실패: {scroll_error}")
-                return False, 0
+            logger.warning("컬렉션에 실제 포인트가 없습니다.")
+            return False, 0
                     
         except Exception as e:
             logger.error(f"컬렉션 데이터 확인 실패: {e}")
@@ -248,6 +243,15 @@ def main():
     with st.sidebar:
         st.header("⚙️ 설정")
         
+        # Qdrant 백엔드 (로컬 모드는 서버 없이 이 프로세스 안에서 저장/검색)
+        backends = ["서버 (QDRANT_URL)", "로컬 파일", "메모리"]
+        backend = st.radio("Qdrant 백엔드", backends, index=1 if os.getenv("QDRANT_LOCAL_PATH") else 0)
+        qdrant_location = ""
+        if backend == "로컬 파일":
+            qdrant_location = st.text_input("로컬 저장 경로", os.getenv("QDRANT_LOCAL_PATH") or "qdrant_local")
+        elif backend == "메모리":
+            qdrant_location = ":memory:"
+        
         # 컬렉션 선택
         collection_name = st.selectbox(
             "컬렉션 선택",
@@ -255,6 +259,12 @@ def main():
             index=0
         )
         
+        # 댓글 단위 컬렉션(<컬렉션>_comments)도 저장/검색하여 답변에 관련 댓글 인용
+        index_comments = st.checkbox(
+            "💬 댓글 단위 검색", value=False,
+            help="기존 데이터는 python comment_index.py로 한 번 색인해야 합니다"
+        )
+        
         # JSON 파일 선택
         json_files = []
         for file in os.listdir('.'):
@@ -269,7 +279,9 @@ def main():
             )
             
             if st.button("📁 OpenAI Qdrant에 데이터 로드"):
-                rag_system = StreamlitOpenAIRAGChat(collection_name=collection_name)
+                rag_system = StreamlitOpenAIRAGChat(
+                    collection_name=collection_name, qdrant_location=qdrant_location, index_comments=index_comments
+                )
                 success = rag_system.load_and_store_json(selected_file)
                 
                 if success:
@@ -279,7 +291,9 @@ def main():
             # 기존 데이터가 있는지 확인하고 바로 검색 가능하도록 설정
             if st.button("🔍 기존 데이터로 검색 시작"):
                 st.info(f"🔍 컬렉션 '{collection_name}'에서 데이터 확인 중...")
-                rag_system = StreamlitOpenAIRAGChat(collection_name=collection_name)
+                rag_system = StreamlitOpenAIRAGChat(
+                    collection_name=collection_name, qdrant_location=qdrant_location, index_comments=index_comments
+                )
                 if rag_system.storage:
                     # 안전한 컬렉션 데이터 확인
                     has_data, vector_count = rag_system.check_collection_has_data()
@@ -298,6 +312,14 @@ def main():
         st.header("🔍 검색 설정")
         max_documents = st.slider("최대 검색 문서 수", 1, 10, 5)
         
+        # 작성일 범위 필터 (Qdrant 페이로드 인덱스로 서버에서 필터링)
+        date_from, date_to = None, None
+        if st.checkbox("작성일 범위로 검색", value=False):
+            today = datetime.now().date()
+            date_range = st.date_input("작성일 범위", (today - timedelta(days=7), today))
+            if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
+                date_from, date_to = date_range
+        
         # API 키 상태 확인
         st.header("🔑 API 상태")
         if os.getenv('OPENAI_API_KEY'):
@@ -309,6 +331,11 @@ def main():
             st.success("✅ Perplexity API 키 설정됨")
         else:
             st.error("❌ Perplexity API 키가 설정되지 않음")
+        
+        # 쿼리 임베딩 캐시 상태 (모든 세션 공유)
+        st.header("⚡ 쿼리 캐시")
+        cache_stats = query_vector_cache.stats()
+        st.caption(f"적중률 {cache_stats['hit_rate']:.1%} (적중 {cache_stats['hits']}회, 미스 {cache_stats['misses']}회, {cache_stats['size']}개 보관)")
     
     # 세션 상태 초기화
     if 'messages' not in st.session_state:
@@ -351,32 +378,57 @@ def main():
             # 응답 생성
             with st.chat_message("assistant"):
                 with st.spinner("🤖 text-embedding-3-small으로 응답 생성 중..."):
-                    response, search_results = st.session_state.rag_system.chat(prompt, max_documents)
+                    response, search_results = st.session_state.rag_system.chat(
+                        prompt, max_documents, date_from=date_from, date_to=date_to
+                    )
                     st.markdown(response)
                 
                 # 검색 결과 표시 (접을 수 있는 섹션)
                 if search_results:
                     with st.expander(f"🔍 관련 문서 ({len(search_results)}개) - text-embedding-3-small"):
+                        # 본문/댓글 전문은 화면에 보여줄 문서만 문서 저장소에서 조회
+                        full_documents = st.session_state.rag_system.storage.get_full_documents(
+                            [result.id for result in search_results]
+                        )
+                        score_label = st.session_state.rag_system.storage.score_label
                         for i, result in enumerate(search_results, 1):
                             payload = result.payload
+                            full_document = full_documents.get(str(result.id), {})
                             st.markdown(f"""
-                            **문서 {i}** (유사도: {result.score:.3f})
+                            **문서 {i}** ({score_label}: {result.score:.3f})
                             - **제목**: {payload['title']}
                             - **링크**: {payload['link']}
                             - **작성일시**: {payload.get('post_datetime', 'N/A')}
                             - **댓글 수**: {payload.get('comments_count', 0)}개
                             - **임베딩 모델**: {payload.get('embedding_model', 'text-embedding-3-small')}
                             """)
-                            if payload.get('content'):
-                                st.markdown(f"**내용 미리보기**: {payload.get('content', '')[:200]}...")
-                            if payload.get('analysis'):
-                                st.markdown(f"**분석**: {payload['analysis'][:300]}...")
-                            if payload.get('comments'):
-                                comments_preview = ", ".join(payload['comments'][:3])
+                            # 전문을 가져오지 못한 문서는 페이로드 미리보기로 표시
+                            content = full_document.get('content') or payload_preview(payload, 'content', CONTENT_PREVIEW_CHARS)
+                            analysis = full_document.get('analysis') or payload_preview(payload, 'analysis', ANALYSIS_PREVIEW_CHARS)
+                            if content:
+                                st.markdown(f"**내용**: {content}")
+                            if analysis:
+                                st.markdown(f"**분석**: {analysis}")
+                            if full_document.get('comments'):
+                                comments_preview = ", ".join(full_document['comments'][:3])
                                 if len(comments_preview) > 200:
                                     comments_preview = comments_preview[:200] + "..."
                                 st.markdown(f"**댓글 미리보기**: {comments_preview}")
                             st.divider()
+                
+                # 댓글 단위 검색 결과 (게시글별로 질문과 맞는 댓글과 위치)
+                comment_groups = st.session_state.rag_system.last_comment_groups
+                if comment_groups:
+                    with st.expander(f"💬 관련 댓글 ({sum(len(group.hits) for group in comment_groups)}개)"):
+                        for group in comment_groups:
+                            if not group.hits:
+                                continue
+                            st.markdown(f"**{group.hits[0].payload['title']}** ({group.hits[0].payload['link']})")
+                            for hit in group.hits:
+                                st.markdown(
+                                    f"- 댓글 #{hit.payload['position'] + 1} (유사도: {hit.score:.3f}): {hit.payload['text']}"
+                                )
+                            st.divider()
             
             # 어시스턴트 메시지 추가
             st.session_state.messages.append({"role": "assistant", "content": response})
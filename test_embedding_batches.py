@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+OpenAI 임베딩 묶음 요청 구성 테스트 스크립트 (API 호출 없음)
+"""
+
+from openai_qdrant_storage import (
+    MAX_TOKENS_PER_INPUT, OpenAIQdrantStorage, estimate_tokens, truncate_for_embedding
+)
+
+
+def make_storage(max_inputs_per_request=256, max_tokens_per_request=100000,
+                 max_tokens_per_input=MAX_TOKENS_PER_INPUT):
+    """API 키/Qdrant 연결 없이 묶음 구성에 필요한 설정만 가진 스토리지"""
+    storage = object.__new__(OpenAIQdrantStorage)
+    storage.max_inputs_per_request = max_inputs_per_request
+    storage.max_tokens_per_request = max_tokens_per_request
+    storage.max_tokens_per_input = max_tokens_per_input
+    return storage
+
+
+def test_truncate_for_embedding():
+    """입력당 토큰 한도를 넘는 텍스트만 UTF-8 글자 경계에서 자름"""
+    short_text = "짧은 글"
+    assert truncate_for_embedding(short_text, 100) is short_text
+
+    long_text = "댓글" * 10000
+    truncated = truncate_for_embedding(long_text, MAX_TOKENS_PER_INPUT)
+    assert len(truncated.encode("utf-8")) <= MAX_TOKENS_PER_INPUT
+    assert long_text.startswith(truncated)
+    print("✅ 긴 입력 자르기")
+
+
+def test_long_input_does_not_fill_batch():
+    """아주 긴 게시글 하나가 있어도 각 입력은 한도 안으로 잘려 다른 입력과 같은 요청에 들어감"""
+    storage = make_storage(max_tokens_per_request=20000)
+    texts = ["짧은 글 하나", "본문과 댓글이 아주 긴 글 " * 5000, "짧은 글 둘"]
+
+    batches = storage._pack_embedding_batches(texts)
+    packed = [item for batch in batches for item in batch]
+
+    assert [idx for idx, _ in packed] == [0, 1, 2]
+    for batch in batches:
+        assert sum(estimate_tokens(text) for _, text in batch) <= storage.max_tokens_per_request
+    assert len(packed[1][1].encode("utf-8")) <= MAX_TOKENS_PER_INPUT
+    assert len(batches) == 1
+    print("✅ 긴 입력이 묶음 한도를 넘지 않음")
+
+
+if __name__ == "__main__":
+    test_truncate_for_embedding()
+    test_long_input_does_not_fill_batch()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+컬렉션 마이그레이션 페이지 처리 테스트 스크립트
+"""
+
+from types import SimpleNamespace
+from document_store import DocumentStore
+from migrate_collection import migrate_page
+from qdrant_common import PARENT_ID_FIELD
+
+
+class RecordingStorage:
+    """store_documents 호출만 기록하는 대상 스토리지"""
+
+    def __init__(self):
+        self.stored = []
+
+    def store_documents(self, documents, skip_unchanged=True):
+        self.stored.append(documents)
+        return bool(documents)
+
+
+def chunk_point(point_id, parent_id, chunk_kind, chunk_index):
+    """청크 컬렉션에서 scroll로 읽은 것과 같은 모양의 포인트"""
+    return SimpleNamespace(id=point_id, payload={
+        PARENT_ID_FIELD: parent_id,
+        "chunk_kind": chunk_kind,
+        "chunk_index": chunk_index,
+        "title": "제목",
+        "link": f"https://theqoo.net/hot/{parent_id}"
+    })
+
+
+def test_migrate_page_without_first_chunks():
+    """body 0번 청크가 없는 페이지는 저장할 문서가 없어도 성공으로 처리"""
+    storage = RecordingStorage()
+    points = [
+        chunk_point("c1", "p1", "body", 1),
+        chunk_point("c2", "p1", "comments", 0),
+        chunk_point("c3", "p2", "analysis", 2)
+    ]
+
+    assert migrate_page(storage, DocumentStore(":memory:"), points)
+    assert storage.stored == []
+    print("✅ 0번 청크 없는 페이지 성공 처리")
+
+
+def test_migrate_page_with_first_chunk():
+    """body 0번 청크가 있으면 게시글 하나로 복원해서 저장"""
+    storage = RecordingStorage()
+    points = [chunk_point("c0", "p1", "body", 0), chunk_point("c1", "p1", "body", 1)]
+
+    assert migrate_page(storage, DocumentStore(":memory:"), points)
+    assert len(storage.stored) == 1 and len(storage.stored[0]) == 1
+    print("✅ 0번 청크로 게시글 복원")
+
+
+if __name__ == "__main__":
+    test_migrate_page_without_first_chunks()
+    test_migrate_page_with_first_chunk()
@@ -59,19 +59,20 @@ def test_workflow_with_3_titles():
         from datetime import datetime
         current_date = datetime.now().strftime("%Y-%m-%d")
         
-        for idx, item in enumerate(issue_titles[:3], 1):  # 최대 3개만
-            print(f"\n--- 처리 중: {idx}/{min(3, len(issue_titles))} ---")
+        # 최대 3개만, 상세 정보는 동시에 수집 (댓글 10개만)
+        target_titles = issue_titles[:3]
+        posts = workflow.get_posts_details([item['link'] for item in target_titles], max_comments=10)
+        
+        for idx, (item, post_data) in enumerate(zip(target_titles, posts), 1):
+            print(f"\n--- 처리 중: {idx}/{len(target_titles)} ---")
             print(f"제목: {item['title'][:50]}...")
             
+            if not post_data:
+                print("  ❌ 게시글 수집 실패")
+                continue
+            
             try:
-                # 작성일시 추출
-                print("  - 작성일시 추출 중...")
-                post_datetime = workflow.get_post_datetime(item['link'])
-                print(f"    작성일시: {post_datetime}")
-                
-                # 게시글 내용과 댓글 수집
-                print("  - 게시글 내용 및 댓글 수집 중...")
-                post_data = workflow.get_post_content_and_comments(item['link'], max_comments=10)  # 댓글 10개만
+                print(f"    작성일시: {post_data['post_datetime']}")
                 print(f"    댓글 수: {len(post_data['comments'])}개")
                 
                 # Perplexity 분석
@@ -87,7 +88,7 @@ def test_workflow_with_3_titles():
                 document = {
                     "title": item['title'],
                     "link": item['link'],
-                    "post_datetime": post_datetime,
+                    "post_datetime": post_data['post_datetime'],
                     "content": post_data['content'],
                     "comments": post_data['comments'],
                     "comments_count": len(post_data['comments']),
@@ -99,10 +100,6 @@ def test_workflow_with_3_titles():
                 documents.append(document)
                 print(f"  ✅ 문서 생성 완료: {document['id']}")
                 
-                # API 호출 간격 조절
-                import time
-                time.sleep(2)
-                
             except Exception as e:
                 logger.error(f"문서 처리 실패: {e}")
                 print(f"  ❌ 오류: {e}")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+브라우저 없이 requests + lxml로 theqoo 페이지를 수집/파싱하는 모듈
+핫 게시판 목록과 게시글 페이지는 서버에서 렌더링되므로 대부분 이 경로로 충분함
+"""
+
+import logging
+import re
+import requests
+from urllib.parse import urljoin
+from lxml import html as lxml_html
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://theqoo.net"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"
+)
+
+# 게시판 댓글 목록 페이지 (XE 댓글 페이지 번호 cpage로 페이지 단위 조회)
+COMMENT_LIST_URL = BASE_URL + "/index.php?mid={mid}&document_srl={document_srl}&cpage={cpage}"
+POST_URL_PATTERN = re.compile(r"theqoo\.net/(?P<mid>[A-Za-z_]\w*)/(?P<document_srl>\d+)")
+
+
+def _has_class(class_name):
+    """XPath에서 CSS 클래스 일치 여부를 검사하는 조건식"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def _element_text(element):
+    """Selenium의 .text와 비슷하게 줄바꿈을 살린 텍스트 추출"""
+    for br in element.iter("br"):
+        br.tail = "\n" + (br.tail or "")
+    for bad in element.xpath(".//script | .//style"):
+        bad.drop_tree()
+
+    lines = [line.strip() for line in element.text_content().splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def parse_hot_titles(page_html, base_url=BASE_URL):
+    """핫 게시판 목록 HTML에서 hide_notice 아래의 제목/링크 추출"""
+    tree = lxml_html.fromstring(page_html)
+    result = []
+
+    for tr in tree.xpath(f"//*[{_has_class('hide_notice')}]//tr"):
+        a_tags = tr.xpath(f".//*[{_has_class('title')}]//a[@href][not({_has_class('replyNum')})]")
+        if not a_tags:
+            continue
+
+        a_tag = a_tags[0]
+        title = _element_text(a_tag)
+        if not title:
+            continue
+
+        item = {"title": title, "link": urljoin(base_url, a_tag.get("href"))}
+
+        # 목록에 보이는 댓글 수 (증분 수집 시 변경 여부 판단용)
+        reply_nums = tr.xpath(f".//*[{_has_class('replyNum')}]")
+        if reply_nums:
+            reply_text = re.sub(r"\D", "", reply_nums[0].text_content())
+            item['reply_count'] = int(reply_text) if reply_text else 0
+
+        result.append(item)
+
+    return result
+
+
+def comment_page_url(post_url, cpage):
+    """게시글 URL에서 댓글 목록 N페이지 URL 생성 (파싱 실패 시 None)"""
+    match = POST_URL_PATTERN.search(post_url)
+    if not match:
+        return None
+    return COMMENT_LIST_URL.format(cpage=cpage, **match.groupdict())
+
+
+def parse_comments(page_html):
+    """HTML에서 ul.fdb_lst_ul > li 댓글을 (댓글 ID, 텍스트) 리스트로 추출"""
+    tree = page_html if not isinstance(page_html, str) else lxml_html.fromstring(page_html)
+    comments = []
+
+    for idx, li in enumerate(tree.xpath(f"//ul[{_has_class('fdb_lst_ul')}]/li")):
+        comment_divs = li.xpath(f".//div[{_has_class('xe_content')}]")
+        if not comment_divs:
+            continue
+        comment_text = _element_text(comment_divs[0])
+        if comment_text and "비회원" not in comment_text:
+            comments.append((li.get("id") or f"{idx}:{comment_text}", comment_text))
+
+    return comments
+
+
+def has_more_comments(page_html):
+    """댓글 더보기(show_more) 버튼이 있는지 확인"""
+    tree = lxml_html.fromstring(page_html)
+    return bool(tree.xpath(f"//*[{_has_class('show_more')}]"))
+
+
+class CommentPager:
+    def __init__(self, post_url, max_pages=50):
+        """
+        댓글 목록 페이지 순회 상태 (페이지 URL 생성과 중복 제거만 담당, HTML 조회는 동기/비동기 클라이언트가 각자 수행)
+
+        Args:
+            post_url (str): 게시글 URL
+            max_pages (int): 최대로 조회할 댓글 페이지 수
+        """
+        self.post_url = post_url
+        self.max_pages = max_pages
+        self.seen_ids = set()
+        self.finished = False
+
+    def __iter__(self):
+        """(페이지 번호, 댓글 목록 URL)을 차례로 반환 (새 댓글이 없는 페이지를 받으면 종료)"""
+        for cpage in range(1, self.max_pages + 1):
+            page_url = comment_page_url(self.post_url, cpage)
+            if not page_url:
+                logger.debug(f"댓글 목록 URL 생성 실패: {self.post_url}")
+                return
+            yield cpage, page_url
+            if self.finished:
+                return
+
+    def add_page(self, page_html):
+        """한 페이지에서 처음 보는 댓글 텍스트 목록 반환"""
+        # 범위를 넘는 페이지는 마지막 페이지를 다시 주므로 새 댓글이 없으면 종료
+        new_comments = [(cid, text) for cid, text in parse_comments(page_html) if cid not in self.seen_ids]
+        if not new_comments:
+            self.finished = True
+        self.seen_ids.update(comment_id for comment_id, _ in new_comments)
+        return [comment_text for _, comment_text in new_comments]
+
+
+def parse_post(page_html, max_comments=30):
+    """게시글 HTML에서 작성일시, 제목, 본문, 댓글 추출"""
+    tree = lxml_html.fromstring(page_html)
+    post_data = {
+        "post_datetime": None,
+        "title": "",
+        "content": "",
+        "comments": []
+    }
+
+    # 작성일시: div.side.fr 안의 첫 번째 span
+    spans = tree.xpath(f"//div[{_has_class('side')} and {_has_class('fr')}]//span")
+    if spans:
+        post_data['post_datetime'] = _element_text(spans[0]) or None
+
+    # 제목: span.title
+    titles = tree.xpath(f"//span[{_has_class('title')}]")
+    if titles:
+        post_data['title'] = _element_text(titles[0])
+
+    # 댓글: ul.fdb_lst_ul > li 안의 div.xe_content
+    post_data['comments'] = [text for _, text in parse_comments(tree)][:max(max_comments, 0)]
+
+    # 본문: 댓글 영역이 아닌 첫 번째 xe_content
+    contents = tree.xpath(
+        f"//*[{_has_class('xe_content')}][not(ancestor::ul[{_has_class('fdb_lst_ul')}])]"
+    )
+    if contents:
+        post_data['content'] = _element_text(contents[0])
+
+    return post_data
+
+
+class TheqooHttpClient:
+    def __init__(self, timeout=10, session=None):
+        """연결을 재사용하는 requests 세션 기반 theqoo 클라이언트"""
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept-Language": "ko-KR,ko;q=0.9"
+        })
+
+    def fetch_html(self, url):
+        """페이지 HTML 가져오기"""
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def get_hot_titles(self, page_num=2):
+        """핫 게시판 목록 페이지의 모든 제목 수집 (실패 시 빈 리스트)"""
+        url = f"{BASE_URL}/hot?filter_mode=normal&page={page_num}"
+        try:
+            return parse_hot_titles(self.fetch_html(url), base_url=url)
+        except Exception as e:
+            logger.warning(f"HTTP 핫타이틀 수집 실패: {e}")
+            return []
+
+    def iter_comments(self, url, max_pages=50):
+        """댓글 목록을 페이지 단위로 직접 조회하며 댓글을 하나씩 반환"""
+        pager = CommentPager(url, max_pages)
+        for cpage, page_url in pager:
+            try:
+                comments = pager.add_page(self.fetch_html(page_url))
+            except Exception as e:
+                logger.warning(f"댓글 {cpage}페이지 수집 실패: {e}")
+                return
+            yield from comments
+
+    def get_comments(self, url, max_comments=30):
+        """댓글을 max_comments개까지 수집"""
+        comments = []
+        if max_comments <= 0:
+            return comments
+
+        for comment_text in self.iter_comments(url):
+            comments.append(comment_text)
+            if len(comments) >= max_comments:
+                break
+        return comments
+
+    def get_post_details(self, url, max_comments=30):
+        """게시글 상세 정보 수집 (실패 시 None)"""
+        try:
+            page_html = self.fetch_html(url)
+            post_data = parse_post(page_html, max_comments=max_comments)
+        except Exception as e:
+            logger.warning(f"HTTP 게시글 수집 실패: {e}")
+            return None
+
+        # 본문 페이지에 보이는 댓글보다 더 필요하면 댓글 목록을 페이지 단위로 조회
+        if len(post_data['comments']) < max_comments and has_more_comments(page_html):
+            comments = self.get_comments(url, max_comments=max_comments)
+            if len(comments) > len(post_data['comments']):
+                post_data['comments'] = comments
+
+        return post_data
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Qdrant 없이 쓰는 NumPy brute-force 벡터 인덱스
+정규화한 float32 벡터를 .npy 파일에 두고 메모리 맵으로 열어 시작이 즉시 끝나며,
+쿼리 한 번에 행렬-벡터 곱 한 번과 argpartition으로 정확한 top-k를 구함
+포인트 ID/페이로드는 SQLite 사이드카에 보관하고 검색 결과에 필요한 행만 조회
+벡터 파일은 여유 행을 두고 두 배씩 늘려 대량 적재 중 전체 복사는 로그 횟수만 일어남 (디스크는 최대 두 배 사용)
+수만~수십만 게시글 규모에서는 밀리초 단위 정확 검색이 가능하고, Qdrant 설정의 recall 측정 기준(정답)으로도 사용
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+from dotenv import load_dotenv
+from qdrant_common import (
+    PARENT_ID_FIELD, SEARCH_PAYLOAD_FIELDS, count_points, dense_vector, get_qdrant_client, iter_scroll, quantized_search_params,
+    to_epoch
+)
+
+# 환경변수 로드
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Qdrant ScoredPoint처럼 id/score/payload로 접근
+VectorHit = namedtuple("VectorHit", ["id", "score", "payload"])
+
+# 날짜 범위 필터에 쓸 수 있는 필드 (페이로드의 epoch 초)
+TIMESTAMP_FIELDS = ("post_timestamp", "collected_timestamp")
+
+# 벡터 파일을 처음 만들 때 잡는 최소 행 수
+MIN_CAPACITY = 1024
+
+
+def normalize(vectors):
+    """코사인 유사도를 내적으로 계산하도록 L2 정규화 (float32)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def top_k_rows(scores, k):
+    """점수 높은 순 상위 k개 행 번호 (전체 정렬 없이 argpartition 후 k개만 정렬)"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class VectorIndex:
+    def __init__(self, index_dir="vector_index"):
+        """
+        Args:
+            index_dir (str): vectors.npy(벡터)와 points.db(ID/페이로드)를 저장할 디렉터리
+        """
+        self.index_dir = index_dir
+        self.vectors_path = os.path.join(index_dir, "vectors.npy")
+        os.makedirs(index_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(index_dir, "points.db"), check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS points (
+                    row INTEGER PRIMARY KEY,
+                    point_id TEXT NOT NULL UNIQUE,
+                    link TEXT,
+                    post_timestamp INTEGER,
+                    collected_timestamp INTEGER,
+                    payload TEXT
+                )
+            """)
+
+        self.vectors = None
+        self._writable = None
+        self._load()
+
+    def _load(self):
+        """벡터 파일을 메모리 맵으로 열고 필터용 컬럼을 메모리에 올림 (열 때 한 번만)"""
+        self.vectors = np.load(self.vectors_path, mmap_mode="r") if os.path.exists(self.vectors_path) else None
+        self._writable = None
+
+        rows = self.conn.execute(
+            "SELECT row, point_id, link, post_timestamp, collected_timestamp FROM points ORDER BY row"
+        ).fetchall()
+        # 사이드카에 기록된 행까지만 유효 (벡터 파일 끝의 여유 행은 무시)
+        count = rows[-1][0] + 1 if rows else 0
+        capacity = 0 if self.vectors is None else len(self.vectors)
+        if count > capacity:
+            logger.warning(f"벡터 인덱스 행 수 불일치: 벡터 {capacity}개, 포인트 {count}개 (앞쪽만 사용)")
+            rows = [row for row in rows if row[0] < capacity]
+            count = capacity
+
+        self.ids = [None] * count
+        self._links = [""] * count
+        # 날짜가 없는 포인트는 NaN이라 범위 필터에서 빠짐 (Qdrant Range와 동일)
+        self._timestamps = {field: [np.nan] * count for field in TIMESTAMP_FIELDS}
+        for row, point_id, link, post_timestamp, collected_timestamp in rows:
+            self._set_row(row, point_id, link, (post_timestamp, collected_timestamp))
+        self.row_by_id = {point_id: row for row, point_id in enumerate(self.ids) if point_id is not None}
+        # 삭제로 비어 있는 행 (다음 upsert에서 재사용)
+        self._free_rows = [row for row, point_id in enumerate(self.ids) if point_id is None]
+        self._columns = None
+
+    def _set_row(self, row, point_id, link, timestamps):
+        """메모리의 ID/필터 컬럼 한 행 갱신 (row가 끝이면 추가)"""
+        if row == len(self.ids):
+            self.ids.append(None)
+            self._links.append("")
+            for values in self._timestamps.values():
+                values.append(np.nan)
+        self.ids[row] = point_id
+        self._links[row] = link or ""
+        for field, value in zip(TIMESTAMP_FIELDS, timestamps):
+            self._timestamps[field][row] = np.nan if value is None else value
+
+    def _filter_columns(self):
+        """필터용 NumPy 컬럼과 삭제되지 않은 행 마스크 (저장/삭제 후 처음 검색할 때만 다시 만듦)"""
+        if self._columns is None:
+            alive = np.array([point_id is not None for point_id in self.ids], dtype=bool) if self._free_rows else None
+            self._columns = (
+                np.array(self._links, dtype=object),
+                {field: np.array(values, dtype=np.float64) for field, values in self._timestamps.items()},
+                alive
+            )
+        return self._columns
+
+    def __len__(self):
+        return len(self.row_by_id)
+
+    @property
+    def dim(self):
+        return None if self.vectors is None else self.vectors.shape[1]
+
+    def upsert(self, points):
+        """
+        (포인트 ID, 벡터, 페이로드) 목록 저장 (같은 ID는 같은 행을 덮어씀)
+
+        Returns:
+            int: 저장한 포인트 수
+        """
+        points = [(str(point_id), vector, payload or {}) for point_id, vector, payload in points]
+        if not points:
+            return 0
+
+        vectors = normalize([vector for _, vector, _ in points])
+        if self.dim is not None and vectors.shape[1] != self.dim:
+            raise ValueError(f"벡터 차원이 인덱스와 다릅니다: {vectors.shape[1]} != {self.dim}")
+
+        with self._lock:
+            # 같은 배치 안의 중복 ID는 마지막 값 사용
+            latest = {}
+            for idx, (point_id, _, _) in enumerate(points):
+                latest[point_id] = idx
+
+            rows = {}
+            next_row = len(self.ids)
+            for point_id in latest:
+                if point_id in self.row_by_id:
+                    rows[point_id] = self.row_by_id[point_id]
+                elif self._free_rows:
+                    rows[point_id] = self._free_rows.pop()
+                else:
+                    rows[point_id] = next_row
+                    next_row += 1
+
+            # 벡터를 먼저 쓰고 사이드카를 커밋 (중간에 끊겨도 사이드카에 없는 행은 무시됨)
+            self._ensure_capacity(next_row, vectors.shape[1])
+            writable = self._writable_vectors()
+            for point_id, idx in latest.items():
+                writable[rows[point_id]] = vectors[idx]
+            writable.flush()
+
+            with self.conn:
+                self.conn.executemany("""
+                    INSERT OR REPLACE INTO points (row, point_id, link, post_timestamp, collected_timestamp, payload)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        rows[point_id],
+                        point_id,
+                        points[idx][2].get("link", ""),
+                        points[idx][2].get("post_timestamp"),
+                        points[idx][2].get("collected_timestamp"),
+                        json.dumps(points[idx][2], ensure_ascii=False)
+                    )
+                    for point_id, idx in latest.items()
+                ])
+
+            # 전체를 다시 읽지 않고 바뀐 행만 메모리에 반영
+            for point_id, idx in sorted(latest.items(), key=lambda item: rows[item[0]]):
+                payload = points[idx][2]
+                self._set_row(
+                    rows[point_id], point_id, payload.get("link", ""),
+                    tuple(payload.get(field) for field in TIMESTAMP_FIELDS)
+                )
+                self.row_by_id[point_id] = rows[point_id]
+            self._columns = None
+
+        return len(latest)
+
+    def delete(self, point_ids):
+        """
+        포인트 삭제 (비운 행은 검색에서 빠지고 다음 upsert에서 재사용)
+
+        Returns:
+            int: 삭제한 포인트 수
+        """
+        with self._lock:
+            rows = [self.row_by_id.pop(str(point_id)) for point_id in point_ids if str(point_id) in self.row_by_id]
+            if not rows:
+                return 0
+            with self.conn:
+                self.conn.executemany("DELETE FROM points WHERE row = ?", [(row,) for row in rows])
+            for row in rows:
+                self._set_row(row, None, "", (None, None))
+            self._free_rows.extend(rows)
+            self._columns = None
+        return len(rows)
+
+    def point_ids_for_parents(self, parent_ids):
+        """페이로드의 parent_id가 parent_ids 중 하나인 포인트 ID (청크 포인트 정리용)"""
+        parent_ids = [str(parent_id) for parent_id in parent_ids]
+        if not parent_ids:
+            return []
+        placeholders = ",".join("?" * len(parent_ids))
+        with self._lock:
+            found = self.conn.execute(
+                f"SELECT point_id FROM points WHERE json_extract(payload, '$.{PARENT_ID_FIELD}') IN ({placeholders})",
+                parent_ids
+            ).fetchall()
+        return [row[0] for row in found]
+
+    def _writable_vectors(self):
+        """쓰기용 메모리 맵 (한 번 열어 재사용)"""
+        if self._writable is None:
+            self._writable = np.load(self.vectors_path, mmap_mode="r+")
+        return self._writable
+
+    def _ensure_capacity(self, needed, dim):
+        """벡터 파일 행 수가 needed보다 작으면 두 배 이상으로 늘린 파일을 새로 써서 교체"""
+        capacity = 0 if self.vectors is None else len(self.vectors)
+        if needed <= capacity:
+            return
+
+        new_capacity = max(needed, capacity * 2, MIN_CAPACITY)
+        used = len(self.ids)
+        temp_path = self.vectors_path + ".tmp.npy"
+        grown = np.lib.format.open_memmap(temp_path, mode="w+", dtype=np.float32, shape=(new_capacity, dim))
+        # 큰 인덱스도 메모리를 많이 쓰지 않도록 나눠서 복사
+        for block in range(0, used, 65536):
+            grown[block:min(block + 65536, used)] = self.vectors[block:min(block + 65536, used)]
+        grown.flush()
+        del grown
+
+        # 열려 있는 메모리 맵을 닫은 뒤 교체 (Windows는 열린 파일을 덮어쓸 수 없음)
+        self.vectors = None
+        self._writable = None
+        os.replace(temp_path, self.vectors_path)
+        self.vectors = np.load(self.vectors_path, mmap_mode="r")
+        logger.debug(f"벡터 인덱스 용량 {capacity} -> {new_capacity}행")
+
+    def _candidate_rows(self, columns, count, date_from=None, date_to=None, links=None, date_field="post_timestamp"):
+        """날짜/링크 조건에 맞는 행 번호 (조건이 없으면 None = 전체)"""
+        links_column, timestamps_columns, alive = columns
+        # 삭제된 행이 있으면 항상 빼고 검색
+        mask = None if alive is None else alive[:count].copy()
+
+        gte = to_epoch(date_from)
+        lte = to_epoch(date_to, end_of_day=True)
+        if gte is not None or lte is not None:
+            timestamps = timestamps_columns[date_field][:count]
+            mask = ~np.isnan(timestamps) if mask is None else mask & ~np.isnan(timestamps)
+            if gte is not None:
+                mask &= timestamps >= gte
+            if lte is not None:
+                mask &= timestamps <= lte
+
+        if links:
+            link_mask = np.isin(links_column[:count], [links] if isinstance(links, str) else list(links))
+            mask = link_mask if mask is None else mask & link_mask
+
+        return None if mask is None else np.flatnonzero(mask)
+
+    def search(self, query_vector, limit=5, date_from=None, date_to=None, links=None,
+               date_field="post_timestamp", with_payload=SEARCH_PAYLOAD_FIELDS):
+        """
+        코사인 유사도 정확 검색 (search_similar_documents와 같은 조건 인자)
+
+        Args:
+            with_payload: 가져올 페이로드 필드 목록 (True면 전체, False면 없음)
+        Returns:
+            list[VectorHit]: 점수 높은 순
+        """
+        with self._lock:
+            vectors, count, columns = self.vectors, len(self.ids), self._filter_columns()
+        if vectors is None or count == 0:
+            return []
+
+        query = normalize(query_vector)
+        rows = self._candidate_rows(columns, count, date_from, date_to, links, date_field)
+        if rows is None:
+            scores = vectors[:count] @ query
+            top = top_k_rows(scores, limit)
+        else:
+            scores = vectors[rows] @ query if len(rows) else np.empty(0, dtype=np.float32)
+            picked = top_k_rows(scores, limit)
+            top, scores = rows[picked], scores[picked]
+            scores = dict(zip(top.tolist(), scores.tolist()))
+
+        payloads = self._payloads(top.tolist(), with_payload)
+        return [
+            VectorHit(self.ids[row], float(scores[row]), payloads.get(row))
+            for row in top.tolist()
+        ]
+
+    def _payloads(self, rows, with_payload):
+        """검색 결과 행의 페이로드만 사이드카에서 조회"""
+        if not with_payload or not rows:
+            return {}
+
+        placeholders = ",".join("?" * len(rows))
+        with self._lock:
+            found = self.conn.execute(
+                f"SELECT row, payload FROM points WHERE row IN ({placeholders})", rows
+            ).fetchall()
+
+        payloads = {}
+        for row, payload in found:
+            payload = json.loads(payload or "{}")
+            if with_payload is not True:
+                payload = {field: payload[field] for field in with_payload if field in payload}
+            payloads[row] = payload
+        return payloads
+
+    def import_collection(self, client, collection_name, page_size=256):
+        """Qdrant 컬렉션의 dense 벡터와 페이로드를 모두 가져와 인덱스 구성 (이어서 실행해도 같은 결과)"""
+        imported = 0
+        started = time.perf_counter()
+        for points, _ in iter_scroll(client, collection_name, page_size=page_size, with_vectors=True):
+            batch = [
+                (point.id, dense_vector(point.vector), point.payload)
+                for point in points
+                if dense_vector(point.vector) is not None
+            ]
+            imported += self.upsert(batch)
+            logger.info(f"벡터 인덱스로 {imported}개 포인트 가져오는 중...")
+
+        logger.info(f"'{collection_name}'에서 {imported}개 포인트 가져오기 완료 ({time.perf_counter() - started:.1f}초)")
+        return imported
+
+    def clear(self):
+        """인덱스 비우기 (벡터 파일 삭제, 사이드카 행 삭제)"""
+        with self._lock:
+            self.vectors = None
+            self._writable = None
+            if os.path.exists(self.vectors_path):
+                os.remove(self.vectors_path)
+            with self.conn:
+                self.conn.execute("DELETE FROM points")
+            self._load()
+
+    def sync_collection(self, client, collection_name):
+        """
+        포인트 수가 Qdrant 컬렉션과 다르면 컬렉션에서 다시 구성
+        (vector_index_path 없이 저장하는 스케줄러 등 다른 쓰기는 인덱스에 반영되지 않으므로 열 때 확인)
+        같은 ID의 벡터만 바뀐 경우는 수로 알 수 없으므로 재임베딩 뒤에는 --rebuild로 다시 만들어야 함
+
+        Returns:
+            int: 다시 가져온 포인트 수 (최신이면 0)
+        """
+        expected = count_points(client, collection_name)
+        if expected == len(self):
+            return 0
+
+        logger.warning(f"벡터 인덱스가 '{collection_name}'과 다릅니다 (인덱스 {len(self)}개, 컬렉션 {expected}개) - 다시 가져옵니다")
+        self.clear()
+        return self.import_collection(client, collection_name)
+
+    def close(self):
+        """DB 연결과 메모리 맵 종료"""
+        self.vectors = None
+        self._writable = None
+        self.conn.close()
+
+
+def measure_recall(client, collection_name, index, queries, k=10, search_params=None):
+    """
+    Qdrant 검색 결과의 recall@k (VectorIndex의 정확 검색을 정답으로 사용)
+
+    Returns:
+        dict: recall, Qdrant/인덱스 검색 p50 지연 시간(ms)
+    """
+    recalls, qdrant_ms, exact_ms = [], [], []
+    for query in queries:
+        started = time.perf_counter()
+        expected = {str(hit.id) for hit in index.search(query, limit=k, with_payload=False)}
+        exact_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        results = client.search(
+            collection_name=collection_name,
+            query_vector=query.tolist(),
+            limit=k,
+            search_params=search_params,
+            with_payload=False
+        )
+        qdrant_ms.append((time.perf_counter() - started) * 1000)
+
+        found = {str(result.id) for result in results}
+        recalls.append(len(found & expected) / max(len(expected), 1))
+
+    return {
+        "recall": float(np.mean(recalls)) if recalls else 0.0,
+        "qdrant_p50_ms": float(np.percentile(qdrant_ms, 50)) if qdrant_ms else 0.0,
+        "exact_p50_ms": float(np.percentile(exact_ms, 50)) if exact_ms else 0.0
+    }
+
+
+def main():
+    """메인 함수: 컬렉션으로 인덱스를 만들고 Qdrant 검색의 recall@k 측정"""
+    from benchmark_quantization import make_queries
+
+    parser = argparse.ArgumentParser(description='NumPy 벡터 인덱스 생성 및 Qdrant recall 측정')
+    parser.add_argument('--collection', default='theqoo_documents_openai', help='벡터를 가져올 컬렉션')
+    parser.add_argument('--dir', default=None, help='인덱스 디렉터리 (기본: vector_index/<컬렉션>)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='인덱스를 비우고 컬렉션에서 다시 가져옴 (재임베딩 등 포인트 수가 같은 변경 후 필요)')
+    parser.add_argument('--queries', type=int, default=200, help='recall 측정 쿼리 수 (0이면 측정 안 함)')
+    parser.add_argument('--k', type=int, default=10, help='recall@k의 k')
+    parser.add_argument('--quantization', choices=['scalar', 'binary'], default=None,
+                        help='컬렉션 양자화 방식 (재채점 검색 설정에 사용)')
+    parser.add_argument('--hnsw-ef', type=int, default=None, help='검색 시 HNSW ef')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    client = get_qdrant_client()
+    index = VectorIndex(args.dir or os.path.join("vector_index", args.collection))
+
+    if args.rebuild:
+        print(f"=== 컬렉션 '{args.collection}'에서 인덱스 다시 생성 중 ===")
+        index.clear()
+        index.import_collection(client, args.collection)
+    else:
+        # 포인트 수가 다르면 (다른 곳에서 저장/삭제됨) 다시 가져옴
+        index.sync_collection(client, args.collection)
+    print(f"✅ 인덱스: {len(index)}개 포인트, {index.dim}차원 ({index.index_dir})")
+
+    if args.queries <= 0 or len(index) <= args.k:
+        return
+
+    queries = make_queries(np.asarray(index.vectors[:len(index.ids)]), args.queries)
+    result = measure_recall(
+        client, args.collection, index, queries, k=args.k,
+        search_params=quantized_search_params(args.quantization, hnsw_ef=args.hnsw_ef)
+    )
+    print(f"recall@{args.k}: {result['recall']:.3f}")
+    print(f"검색 p50: Qdrant {result['qdrant_p50_ms']:.2f}ms / NumPy 정확 검색 {result['exact_p50_ms']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Selenium WebDriver 풀
+크롬 세션을 미리 띄워두고 빌려 쓰고 반납하는 방식으로 재사용
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import weakref
+from contextlib import contextmanager
+import psutil
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+# 아직 닫지 않은 풀 (약한 참조라 모듈 전역 풀이 아니면 종료 전에도 정리될 수 있음)
+_open_pools = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_pools():
+    """프로세스 종료 시 남은 풀의 드라이버 종료 (atexit는 모듈에서 한 번만 등록)"""
+    for pool in list(_open_pools):
+        pool.close_all()
+
+
+def get_chromedriver_path():
+    """ChromeDriverManager로 드라이버 경로를 프로세스당 한 번만 조회"""
+    global _driver_path
+
+    if _driver_path is None:
+        with _driver_path_lock:
+            if _driver_path is None:
+                _driver_path = ChromeDriverManager().install()
+                logger.info(f"크롬 드라이버 경로: {_driver_path}")
+
+    return _driver_path
+
+
+def default_chrome_options():
+    """기본 헤드리스 크롬 옵션"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--window-size=1920,1080")
+    return chrome_options
+
+
+class WebDriverPool:
+    def __init__(self, chrome_options=None, max_size=2, max_pages_per_driver=50,
+                 max_memory_mb=1024, driver_path=None):
+        """
+        Args:
+            chrome_options: 크롬 옵션 (없으면 기본 헤드리스 옵션)
+            max_size (int): 동시에 띄울 수 있는 최대 드라이버 수
+            max_pages_per_driver (int): 이 횟수만큼 사용하면 드라이버 재생성
+            max_memory_mb (int): 브라우저 메모리가 이 값을 넘으면 드라이버 재생성
+            driver_path (str): 크롬 드라이버 경로 (없으면 webdriver-manager로 조회)
+        """
+        self.chrome_options = chrome_options or default_chrome_options()
+        self.max_size = max_size
+        self.max_pages_per_driver = max_pages_per_driver
+        self.max_memory_mb = max_memory_mb
+        self.driver_path = driver_path
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._page_counts = {}
+        self._closed = False
+
+        _open_pools.add(self)
+
+    def _create_driver(self):
+        """새 크롬 드라이버 생성"""
+        service = Service(self.driver_path or get_chromedriver_path())
+        driver = webdriver.Chrome(service=service, options=self.chrome_options)
+        with self._lock:
+            self._page_counts[id(driver)] = 0
+        logger.debug("새 크롬 드라이버 생성")
+        return driver
+
+    def _quit_driver(self, driver):
+        """드라이버 종료"""
+        with self._lock:
+            self._page_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"드라이버 종료 실패: {e}")
+
+    def _memory_mb(self, driver):
+        """드라이버가 띄운 브라우저 프로세스들의 메모리 사용량(MB)"""
+        try:
+            process = psutil.Process(driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+        except Exception as e:
+            logger.debug(f"메모리 사용량 조회 실패: {e}")
+            return 0
+
+    def _needs_recycle(self, driver):
+        """드라이버 재생성 필요 여부"""
+        with self._lock:
+            page_count = self._page_counts.get(id(driver), 0)
+
+        if page_count >= self.max_pages_per_driver:
+            logger.info(f"드라이버 사용 횟수 초과로 재생성: {page_count}회")
+            return True
+
+        memory_mb = self._memory_mb(driver)
+        if self.max_memory_mb and memory_mb > self.max_memory_mb:
+            logger.info(f"드라이버 메모리 초과로 재생성: {memory_mb:.0f}MB")
+            return True
+
+        return False
+
+    def _reset_driver(self, driver):
+        """다음 사용을 위해 쿠키, 스토리지, 열린 탭 정리"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        driver.delete_all_cookies()
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            pass
+        driver.get("about:blank")
+
+    def acquire(self):
+        """드라이버 대여"""
+        if self._closed:
+            raise RuntimeError("이미 종료된 드라이버 풀입니다.")
+
+        self._slots.acquire()
+        try:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._create_driver()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._page_counts[id(driver)] = self._page_counts.get(id(driver), 0) + 1
+        return driver
+
+    def release(self, driver, discard=False):
+        """드라이버 반납 (문제가 있거나 재생성 대상이면 종료)"""
+        try:
+            if discard or self._closed or self._needs_recycle(driver):
+                self._quit_driver(driver)
+                return
+
+            try:
+                self._reset_driver(driver)
+            except Exception as e:
+                logger.warning(f"드라이버 상태 초기화 실패, 재생성 예정: {e}")
+                self._quit_driver(driver)
+                return
+
+            self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self):
+        """with 문으로 드라이버를 빌리고 자동 반납"""
+        driver = self.acquire()
+        discard = False
+        try:
+            yield driver
+        except Exception:
+            discard = True
+            raise
+        finally:
+            self.release(driver, discard=discard)
+
+    def close_all(self):
+        """대기 중인 모든 드라이버 종료"""
+        self._closed = True
+        _open_pools.discard(self)
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit_driver(driver)